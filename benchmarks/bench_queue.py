@@ -0,0 +1,59 @@
+'''
+Benchmark queue reordering on large tables
+
+Compares insert_row and move_row against rebuilding the table,
+rendering after every change like a bot refreshing a queue message.
+'''
+from timeit import timeit
+
+from dappertable import DapperTable, Column, Columns, PaginationLength
+
+QUEUE_SIZES = [10_000, 50_000]
+REPEAT = 20
+
+
+def build_table(size: int) -> DapperTable:
+    '''
+    Build queue table with given number of rows
+    '''
+    table = DapperTable(
+        columns=Columns([
+            Column('Pos', 5, zero_pad=True),
+            Column('Title', 40),
+            Column('Uploader', 20),
+        ]),
+        pagination_options=PaginationLength(2000),
+        enclosure_start='```\n',
+        enclosure_end='\n```',
+    )
+    for i in range(size):
+        table.add_row([str(i), f'Song title number {i}', f'Uploader {i % 50}'])
+    return table
+
+
+def main():
+    '''
+    Run benchmarks
+    '''
+    for size in QUEUE_SIZES:
+        table = build_table(size)
+        table.render()
+        move_time = timeit(lambda t=table: (t.move_row(40, 2), t.get_pages()), number=REPEAT)
+        insert_time = timeit(lambda t=table: (t.insert_row(2, ['2', 'Inserted song', 'Someone']), t.get_pages()), number=REPEAT)
+        remove_time = timeit(lambda t=table: (t.remove_row(2), t.get_pages()), number=REPEAT)
+        rows = [row.input_values for row in table._rows] # pylint: disable=protected-access
+
+        def rebuild(rows=rows):
+            new_table = build_table(0)
+            for row in rows:
+                new_table.add_row(row)
+            new_table.get_pages()
+        rebuild_time = timeit(rebuild, number=1)
+        print(f'{size} rows: move_row {move_time / REPEAT * 1000:.2f}ms, '
+              f'insert_row {insert_time / REPEAT * 1000:.2f}ms, '
+              f'remove_row {remove_time / REPEAT * 1000:.2f}ms, '
+              f'rebuild {rebuild_time * 1000:.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
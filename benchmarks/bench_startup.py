@@ -0,0 +1,66 @@
+'''
+Benchmark import and table construction time
+
+Import time is measured in a fresh interpreter with -X importtime and only
+printed, since it depends on the machine. The script exits with an error if
+importing dappertable loads any of DEFERRED_MODULES, which are only needed once
+non ascii text is measured or rows are bulk loaded, so it can be tracked in CI.
+'''
+import subprocess # nosec B404
+import sys
+from timeit import timeit
+from typing import List
+
+from dappertable import DapperTable, Column, Columns, PaginationLength
+
+DEFERRED_MODULES = ('wcwidth', 'unicodedata', 'numpy')
+IMPORT_RUNS = 5
+CONSTRUCT_REPEAT = 10_000
+
+
+def import_time_ms() -> float:
+    '''
+    Get cumulative import time of dappertable in a fresh interpreter
+    '''
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import dappertable'], # nosec B603
+                            capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        # Format is "import time: self [us] | cumulative | imported package"
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == 'dappertable':
+            return int(parts[1]) / 1000
+    raise ValueError('Could not find dappertable in import time output')
+
+
+def deferred_imports() -> List[str]:
+    '''
+    Get deferred modules loaded by importing dappertable in a fresh interpreter
+    '''
+    code = 'import sys\nimport dappertable\nprint("\\n".join(sys.modules))'
+    result = subprocess.run([sys.executable, '-c', code], # nosec B603
+                            capture_output=True, text=True, check=True)
+    return sorted(name for name in result.stdout.splitlines() if name.split('.')[0] in DEFERRED_MODULES)
+
+
+def main():
+    '''
+    Run benchmarks
+    '''
+    import_ms = min(import_time_ms() for _ in range(IMPORT_RUNS))
+    columns = Columns([
+        Column('Pos', 3, zero_pad=True),
+        Column('Title', 40),
+        Column('Uploader', 20),
+    ])
+    construct = timeit(lambda: DapperTable(columns=columns, pagination_options=PaginationLength(2000),
+                                           prefix='Queue\n', enclosure_start='```\n', enclosure_end='\n```'),
+                       number=CONSTRUCT_REPEAT)
+    loaded = deferred_imports()
+    print(f'import dappertable: {import_ms:.2f}ms')
+    print(f'DapperTable(): {construct / CONSTRUCT_REPEAT * 1_000_000:.2f}us')
+    if loaded:
+        sys.exit(f'Importing dappertable loaded deferred modules: {", ".join(loaded)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+'''
+Benchmark overhead of table stats
+
+Times building and rendering a table with stats disabled, with stats
+enabled on the table and with a module wide stats hook.
+'''
+from timeit import timeit
+
+from dappertable import DapperTable, Column, Columns, PaginationLength
+from dappertable import add_stats_hook, remove_stats_hook
+
+ROWS = 5_000
+REPEAT = 5
+
+
+def build_and_render(stats: bool = False) -> DapperTable:
+    '''
+    Build table and render it
+    '''
+    table = DapperTable(
+        columns=Columns([
+            Column('Pos', 4, zero_pad=True),
+            Column('Title', 40),
+            Column('Uploader', 20),
+        ]),
+        pagination_options=PaginationLength(2000),
+        stats=stats,
+    )
+    for i in range(ROWS):
+        table.add_row([str(i), f'Song title number {i}', f'Uploader {i % 50}'])
+    table.render()
+    return table
+
+
+def main():
+    '''
+    Run benchmarks
+    '''
+    disabled = timeit(build_and_render, number=REPEAT) / REPEAT
+    enabled = timeit(lambda: build_and_render(stats=True), number=REPEAT) / REPEAT
+
+    def hook(_table, _name, _count, _seconds):
+        return None
+    add_stats_hook(hook)
+    hooked = timeit(build_and_render, number=REPEAT) / REPEAT
+    remove_stats_hook(hook)
+
+    print(f'{ROWS} rows: stats disabled {disabled * 1000:.2f}ms, '
+          f'stats enabled {enabled * 1000:.2f}ms, stats hook {hooked * 1000:.2f}ms')
+    table = build_and_render(stats=True)
+    for name, count in sorted(table.stats.counts.items()):
+        print(f'  {name}: {count} calls, {table.stats.seconds[name] * 1000:.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,290 +2,102 @@
 Taken from https://medium.com/@gullevek/python-output-formatting-double-byte-characters-6d6d18d04be3
 Use these functions to get proper length of strings for formatting with wide characters
 '''
-from dataclasses import dataclass, field
-from enum import Enum
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
 from math import ceil
-from re import sub
-from typing import List
-from unicodedata import east_asian_width
-from wcwidth import wcswidth
-
-class DapperTableError(Exception):
-    '''
-    Generic error class
-    '''
-
-@dataclass
-class Column:
-    '''
-    Defines a single table column with a name and maximum display width.
-    '''
-    name: str
-    width: int
-    zero_pad: bool = False
-
-@dataclass
-class Columns:
-    '''
-    Collection of Column definitions with a column separator.
-    '''
-    headers: List[Column] | Column
-    separator: str = '||'
-
-    def __post_init__(self):
-        if isinstance(self.headers, Column):
-            self.headers = [self.headers]
-        if not self.headers:
-            raise DapperTableError('Must have at least one header')
-        for header in self.headers:
-            if not isinstance(header, Column):
-                raise DapperTableError('Header must be Column object')
-
-
-class PaginationType(Enum):
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+from weakref import WeakSet
+
+from dappertable import _batch, _width
+from dappertable._core import DapperTableError, Column, Columns, PaginationType, _PaginationBase
+from dappertable._core import PaginationRows, PaginationLength, PaginationTarget, DapperRow
+from dappertable._core import wcswidth, shorten_string, string_width, format_string_length
+from dappertable._core import _measure, _padded_length
+from dappertable._render import _PagedRenderer, _chunk_list_by_length
+from dappertable._stats import TableStats, MemoryUsage, add_stats_hook, remove_stats_hook, _deep_sizeof
+from dappertable._cache import PageCacheInfo, enable_page_cache, disable_page_cache, page_cache_info
+from dappertable._table_batch import DapperTableBatch
+from dappertable._view import DapperTableView
+from dappertable._target import DapperTableTarget
+
+def _fit_column(item: str, width: int) -> Tuple[str, int, int, bool]:
     '''
-    Pagination type
-    '''
-    ROWS = 'rows'
-    LENGTH = 'length'
+    Shorten column value to width, returning it with its display width, wide character count
+    and whether width is the sum of character widths
 
-@dataclass
-class _PaginationBase:
+    item    :   Column value
+    width   :   Column display width
     '''
-    Base pagination settings class
+    col_string = str(item)
+    measured = _measure(col_string)
+    if measured[0] > width:
+        col_string = shorten_string(col_string, width)
+        measured = _measure(col_string)
+    return (col_string,) + measured
+
+def _format_column(target_width: int, col_string: str, display_width: int, wide_count: int,
+                   is_last_column: bool = False) -> Tuple[str, int]:
     '''
-    pagination_type: PaginationType
-
-@dataclass
-class PaginationRows(_PaginationBase):
+    Format measured column string to target width, returning it with its display width
     '''
-    Pagination By Rows
+    if display_width < target_width:
+        col_length = _padded_length(len(col_string), display_width, wide_count, target_width)
+        return f'{col_string:{col_length}}', display_width + max(0, col_length - len(col_string))
+    # If last column, don't add spacing to save space
+    if is_last_column:
+        return col_string, display_width
+
+    # Use one regular space plus thin spaces for better readability
+    space_count = target_width - len(col_string)
+    return col_string + ' ' * space_count, display_width + max(0, space_count)
+
+@lru_cache(maxsize=256)
+def _header_strings(headers: Tuple[Tuple[str, int], ...], separator: str) -> Tuple[str, str]:
     '''
-    rows_per_message: int
-    pagination_type: PaginationType = field(default=PaginationType.ROWS, init=False)
+    Generate header row and divider row content, cached since tables are often built
+    with the same columns
 
-@dataclass
-class PaginationLength(_PaginationBase):
+    headers     :   Column names and widths
+    separator   :   Column separator
     '''
-    Pagination By Length
+    col_items = []
+    # Setup headers as first row
+    for i, (name, width) in enumerate(headers):
+        col_string, display_width, wide_count, _ = _fit_column(name, width)
+        is_last_column = i == len(headers) - 1
+        formatted_col, _ = _format_column(width, col_string, display_width, wide_count, is_last_column)
+        col_items.append(formatted_col)
+    row_string = separator.join(i for i in col_items)
+    row_string = row_string.rstrip(' ')
+    # Calculate total length based on actual display width
+    total_length = string_width(row_string)
+    # First row and then table formatter
+    return row_string, '-' * total_length
+
+def _changed_pages(old_pages: List[List[DapperRow]], new_pages: List[List[DapperRow]]) -> List[int]:
     '''
-    length_per_message: int
-    pagination_type: PaginationType = field(default=PaginationType.LENGTH, init=False)
-
-
-@dataclass
-class DapperRow:
+    Indexes of new pages that render differently, unchanged rows keep the same row objects
     '''
-    Instance of a row in a table
-    '''
-    content: str
-    input_values: List[str] | str
-    zero_padding_value: int | None = None
-
-    def edit(self, new_content: str) -> bool:
-        '''
-        Allow raw editing of row content
-        '''
-        self.content = new_content
-        self.input_values = new_content
-        return True
-
-    def __eq__(self, other):
-        '''
-        Override equals check
-        '''
-        return other.content == self.content
-
-    def __len__(self):
-        '''
-        Override length check
-        '''
-        return len(self.content)
-
-    def __getitem__(self, index: int):
-        '''
-        Override get item
-        '''
-        return self.content[index]
-
-def shorten_string(intput_string: str, width: int, placeholder: str = '..') -> str:
-    '''
-    Shorten a string with wide characters (e.g. East Asian characters)
-
-    intput_string (string): input string to shorten
-    width (int): character count to shorten too
-    placeholder (str, optional): cut of end characters if space is there. Defaults to '..'.
-    '''
-    # get the display width using wcwidth
-    string_display_width = string_width(str(intput_string))
-    # if display width is too big
-    if string_display_width > width:
-        # set current length and output string
-        out_string = ''
-        # loop through each character
-        for char in str(intput_string):
-            # Calculate what the width would be if we add this character
-            new_string = out_string + char
-            new_string_width = wcswidth(new_string)
-            # Handle non-printable characters - fall back to basic length
-            if new_string_width == -1:
-                new_string_width = len(new_string)
-
-            # if the new length is smaller than the output length to shorten too add the char
-            if new_string_width <= (width - wcswidth(placeholder)):
-                out_string += char
-            else:
-                break
-        # return string with new width and placeholder
-        return f"{out_string}{placeholder}"
-    return str(intput_string)
-
-def string_width(input_string: str) -> int:
-    '''
-    Get display width of a string (accounts for wide characters)
-
-    string (string): string to get display width for
-    '''
-    # Use wcwidth library for accurate display width calculation
-    width = wcswidth(input_string)
-    # wcswidth returns -1 if string contains non-printable characters
-    # Fall back to basic string length in that case
-    if width == -1:
-        return len(input_string)
-    return width
-
-def format_string_length(input_string: str, length: int) -> int:
-    '''
-    Returns length updated for string with wide characters
-    Calculate the padding width needed to achieve the desired display width
-    when using Python's string formatting with wide characters (e.g. East Asian)
-
-    input_string (string): string to calculate length of
-    length (int): desired display width for string
-    '''
-    display_width = string_width(input_string)
-    char_count = len(input_string)
-
-    # For proper separator alignment, we need consistent format widths
-    # When the display width meets or exceeds target, we use the target length
-    # to ensure all separators align at the same character position
-    if display_width >= length:
-        return length
-
-    # For strings shorter than target, calculate the needed padding
-    # Count actual wide East Asian characters (excluding fullwidth ASCII like ＂)
-    # to determine adjustment needed for terminals that don't render wide chars correctly
-    needed_padding = length - display_width
-
-    # Count only true wide characters (W width), not fullwidth ASCII variants (F width)
-    true_wide_count = sum(1 for c in input_string if east_asian_width(c) == 'W')
-    adjusted_padding = needed_padding + (ceil(true_wide_count / 4))
-
-    return char_count + adjusted_padding
-
-
-# https://stackoverflow.com/questions/312443/how-do-i-split-a-list-into-equally-sized-chunks
-def _chunk_list(input_list: List[object], chunk_size: int) -> List[List[object]]:
-    '''
-    Split list into equal sized chunks
-
-    input_list: Input list of any type
-    chunk_size: Chunk list into size bits
-    '''
-    size = max(1, chunk_size)
-    return [input_list[i:i+size] for i in range(0, len(input_list), size)]
-
-def _chunk_list_by_length(input_list: List[DapperRow], max_length: int,
-                          prefix: str = '', suffix: str = '') -> List[List[str]]:
-    # pylint: disable=too-many-locals,too-many-branches
-    '''
-    Split list by length, accounting for prefix on first chunk, suffix on last chunk,
-    and enclosure on all chunks
-    '''
-    new_rows = []
-    current_size = 0
-    current_rows = []
-    is_first_chunk = True
-
-    for current_item in input_list:
-        item_width = string_width(current_item.content)
-
-        # Check if item is too large for any page
-        if item_width > max_length:
-            raise DapperTableError(f'Length of input "{current_item.content}" is greater than max length {max_length}')
-
-        # Determine available space for current chunk
-        if is_first_chunk:
-            available_space = max_length - string_width(prefix)
-        else:
-            available_space = max_length
-
-        # Calculate the size this item will add to the chunk
-        # Include newline separator if this isn't the first row in the chunk
-        item_size_to_add = item_width
-        if current_rows:  # If there are already rows, we need a newline before this one
-            item_size_to_add += 1
-
-        # If first item doesn't fit with prefix, create empty chunk with just prefix
-        if is_first_chunk and item_size_to_add > available_space:
-            # Create empty chunk for prefix, then continue with normal chunking
-            new_rows.append([])
-            is_first_chunk = False
-            available_space = max_length
-            # Recalculate since we're now in a new chunk (first item, no newline needed)
-            item_size_to_add = item_width
-
-        if current_size + item_size_to_add > available_space:
-            # Current chunk is full, start new chunk
-            new_rows.append(current_rows)
-            current_rows = []
-            current_size = 0
-            is_first_chunk = False
-            available_space = max_length
-            # Recalculate since we're now in a new chunk (first item, no newline needed)
-            item_size_to_add = item_width
-
-        current_rows.append(current_item)
-        current_size += item_size_to_add
-
-    # Add the last chunk
-    if current_rows:
-        new_rows.append(current_rows)
-
-    # Adjust last chunk for suffix
-    if new_rows and suffix:
-        while new_rows:
-            last_chunk = new_rows[-1]
-            # Calculate total size including newlines between rows
-            last_chunk_size = sum(string_width(row.content) for row in last_chunk)
-            if len(last_chunk) > 1:
-                last_chunk_size += len(last_chunk) - 1  # Add newlines between rows
-
-            if last_chunk_size + string_width(suffix) <= max_length:
-                # Last chunk fits with suffix
-                break
-
-            # Need to move rows from last chunk
-            if len(last_chunk) == 1:
-                # Single row doesn't fit with suffix - create empty chunk for suffix
-                new_rows.append([])
-                break
-
-            # Move last row to a new chunk
-            moved_row = last_chunk.pop()
-            # Create new chunk with moved row
-            new_rows.append([moved_row])
-
-    return new_rows
-
-class DapperTable():
+    changed = set()
+    # Suffix moves from the old last page to the new one when the page count changes
+    if len(new_pages) != len(old_pages):
+        changed = {min(len(old_pages), len(new_pages)) - 1, len(new_pages) - 1} - {-1}
+    for (count, page) in enumerate(new_pages):
+        if count >= len(old_pages) or len(page) != len(old_pages[count]) or \
+                any(new is not old for (new, old) in zip(page, old_pages[count])):
+            changed.add(count)
+    return sorted(changed)
+
+class DapperTable(_PagedRenderer):
     '''
     Split large inputs into smaller messages, also supports formatting
     '''
     def __init__(self, columns: Columns = None,
                  pagination_options: _PaginationBase = None, collapse_newlines: bool = True,
                  prefix: str = '', suffix: str = '',
-                 enclosure_start: str = '', enclosure_end: str = ''):
+                 enclosure_start: str = '', enclosure_end: str = '', stats: bool = False,
+                 retain_input_values: bool = True, targets: Dict[str, PaginationTarget] = None):
         '''
         Init a dapper table
 
@@ -296,82 +108,88 @@ class DapperTable():
         suffix              :   String to append to last page of output
         enclosure_start     :   String to wrap before table content on each page
         enclosure_end       :   String to wrap after table content on each page
-        '''
-        self.collapse_newlines = collapse_newlines
-        self._prefix = prefix
-        self._suffix = suffix
-        self._enclosure_start = enclosure_start
-        self._enclosure_end = enclosure_end
+        stats               :   Collect call counts and timings in stats attribute
+        retain_input_values :   Keep row input values, needed for zero padding, auto width, cell updates and views
+                                that sort or filter, rows only keep their formatted content if false
+        targets             :   Extra paginations of the same formatted rows by name, see target()
+        '''
+        super().__init__(pagination_options=pagination_options, collapse_newlines=collapse_newlines,
+                         prefix=prefix, suffix=suffix,
+                         enclosure_start=enclosure_start, enclosure_end=enclosure_end, stats=stats)
         self._rows = []
         self._header_rows = []
-
-        self._rows_per_message = None
-        self._length_per_message = None
-        if pagination_options:
-            if pagination_options.pagination_type == PaginationType.ROWS:
-                self._rows_per_message = pagination_options.rows_per_message
-                if pagination_options.rows_per_message and pagination_options.rows_per_message < 1:
-                    raise DapperTableError(f'Invalid value for rows per message: {pagination_options.rows_per_message}')
-            if pagination_options.pagination_type == PaginationType.LENGTH:
-                # Make sure we take the enclosures into account
-                self._length_per_message = pagination_options.length_per_message - string_width(self._enclosure_start) - string_width(self._enclosure_end)
-                if self._length_per_message < 1:
-                    raise DapperTableError(f'Invalid value for length per message: {pagination_options.length_per_message}')
-                # Validate prefix/suffix don't exceed pagination length
-                if string_width(prefix) > pagination_options.length_per_message:
-                    raise DapperTableError(f'Prefix length ({string_width(prefix)}) exceeds pagination length ({pagination_options.length_per_message})')
-                if string_width(suffix) > pagination_options.length_per_message:
-                    raise DapperTableError(f'Suffix length ({string_width(suffix)}) exceeds pagination length ({pagination_options.length_per_message})')
+        self._retain_input_values = retain_input_values
+        # Views registered against this table, updated on row changes
+        self._views = WeakSet()
+        self._targets = {name: DapperTableTarget(self, target) for (name, target) in (targets or {}).items()}
 
         # Headers
+        self._columns = columns
         self._headers = None
         self._separator = None
-        # Track pad indexing
+        # Track pad indexing, width is the digit count of the row count
         self._contains_zero_pad = False
+        self._zero_pad_width = 1
+        # Display width used for each column, and value width counts for auto width columns
+        self._widths = []
+        self._width_counts = {}
 
         if columns:
             self._headers = columns.headers
             for header in self._headers:
+                if not retain_input_values and (header.zero_pad or header.auto_width):
+                    raise DapperTableError('Zero pad and auto width columns require retained input values')
                 if header.zero_pad:
                     self._contains_zero_pad = True
-                    break
             # Make sure we add a single space at the end
             self._separator = f'{columns.separator.replace(" ", "")} '
+            self._width_counts = {count: {} for (count, col) in enumerate(self._headers) if col.auto_width}
+            self._widths = [col.width for col in self._headers]
+            self._widths = self._auto_widths()
             # Init first headers
             self._header_rows = self._generate_headers()
 
-    def _generate_formatted_string(self, target_width: int, col_string: str, is_last_column: bool = False) -> str:
+    def _rows_changed(self, start: int, end: int, delta: int) -> None:
+        super()._rows_changed(start, end, delta)
+        for target in self._targets.values():
+            target._rows_changed(start, end, delta) # pylint: disable=protected-access
+
+    def _invalidate_pages(self) -> None:
+        super()._invalidate_pages()
+        for target in self._targets.values():
+            target._invalidate_pages() # pylint: disable=protected-access
+
+    def target(self, name: str) -> 'DapperTableTarget':
+        '''
+        Get pagination target, renders the rows of this table with the target pagination and layout
+
+        name    :   Name given in targets
+        '''
+        try:
+            return self._targets[name]
+        except KeyError as exc:
+            raise DapperTableError(f'Unknown pagination target {name}') from exc
+
+    @property
+    def targets(self) -> Dict[str, 'DapperTableTarget']:
         '''
-        Generate a properly formatted string with appropriate spacing for CJK characters.
+        Pagination targets by name
         '''
-        if string_width(col_string) < target_width:
-            col_length = format_string_length(col_string, target_width)
-            return f'{col_string:{col_length}}'
-        # If last column, don't add spacing to save space
-        if is_last_column:
-            return col_string
+        return dict(self._targets)
 
-        # Use one regular space plus thin spaces for better readability
-        space_count = target_width - len(col_string)
-        return col_string + ' ' * space_count
+    def render_targets(self) -> Dict[str, List[str] | str]:
+        '''
+        Render output of every pagination target, rows are formatted once for all of them
+        '''
+        return {name: target.render() for (name, target) in self._targets.items()}
 
-    def _generate_headers(self) -> List[str]:
+    def _generate_headers(self) -> List[DapperRow]:
         '''
         Generate header content, first two rows of table
         '''
-        col_items = []
-        # Setup headers as first row
-        for i, col in enumerate(self._headers):
-            col_string = shorten_string(col.name, col.width)
-            is_last_column = i == len(self._headers) - 1
-            formatted_col = self._generate_formatted_string(col.width, col_string, is_last_column)
-            col_items.append(formatted_col)
-        row_string = self._separator.join(i for i in col_items)
-        row_string = row_string.rstrip(' ')
-        # Calculate total length based on actual display width
-        total_length = string_width(row_string)
-        # First row and then table formatter
-        return [DapperRow(row_string, None), DapperRow('-' * total_length, None)]
+        header_string, divider_string = _header_strings(tuple((col.name, width) for (col, width) in zip(self._headers, self._widths)),
+                                                        self._separator)
+        return [DapperRow(header_string, None), DapperRow(divider_string, None)]
 
     def _validate_row(self, row: List[str] | str) -> bool:
         '''
@@ -389,49 +207,216 @@ class DapperTable():
         '''
         Check how many padded zeros should be added
         '''
-        return len(str(len(self._rows))) - len(str(new_value))
+        return self._zero_pad_width - len(str(new_value))
+
+    def _format_cell(self, count: int, item: str,
+                     fitted: Tuple[str, int, int, bool] | None = None) -> Tuple[str, int | None]:
+        '''
+        Shorten and pad one column value
 
-    def _format_row(self, row: List[str]) -> DapperRow:
+        count   :   Column index
+        item    :   Column value, zero padding already added
+        fitted  :   Shortened and measured column value from a batch
+
+        returns: formatted column string, and its display width or None if it has complex characters
+        '''
+        timed = self._timed()
+        if timed:
+            start = perf_counter()
+        if fitted:
+            col_string, display_width, wide_count, simple = fitted
+        else:
+            col_string, display_width, wide_count, simple = _fit_column(item, self._widths[count])
+        if timed:
+            shortened = perf_counter()
+        is_last_column = count == len(self._headers) - 1
+        formatted_col, col_width = _format_column(self._widths[count], col_string, display_width, wide_count, is_last_column)
+        if timed:
+            self._record('shorten_string', 1, shortened - start)
+            self._record('format_string_length', 1, perf_counter() - shortened)
+        return formatted_col, (col_width if simple else None)
+
+    def _join_segments(self, segments: List[Tuple[str, int | None]], row: List[str], padding: int | None) -> DapperRow:
+        '''
+        Build row from formatted column segments, segments are kept so single cells can be replaced
+
+        segments    :   Formatted column strings and their display widths
+        row         :   Row input values
+        padding     :   Zero padding added to row
+        '''
+        row_string = self._separator.join(segment for (segment, _) in segments)
+        stripped_string = row_string.rstrip(' ')
+        formatted_row = DapperRow(stripped_string, row, zero_padding_value=padding)
+        ends = []
+        end = -len(self._separator)
+        for (segment, _) in segments:
+            end += len(self._separator) + len(segment)
+            ends.append(end)
+        formatted_row._segments = tuple(ends) + tuple(width for (_, width) in segments) # pylint: disable=protected-access
+        # Row width is the sum of column widths while every part is measured without context
+        separator_width, _, simple = _measure(self._separator)
+        widths = [width for (_, width) in segments]
+        if simple and None not in widths:
+            formatted_row._width = sum(widths) + separator_width * (len(widths) - 1) - \
+                (len(row_string) - len(stripped_string)) # pylint: disable=protected-access
+        return formatted_row
+
+    def _split_segments(self, row_data: DapperRow) -> List[Tuple[str, int | None]]:
+        '''
+        Get formatted column strings and widths of row back from its content
+        '''
+        column_count = len(self._headers)
+        ends = row_data._segments[:column_count] # pylint: disable=protected-access
+        widths = row_data._segments[column_count:] # pylint: disable=protected-access
+        # Only spaces were stripped from the end of the content
+        content = row_data.content.ljust(ends[-1])
+        starts = [0] + [end + len(self._separator) for end in ends[:-1]]
+        return [(content[start:end], width) for (start, end, width) in zip(starts, ends, widths)]
+
+    def _format_row(self, row: List[str], fitted: List[Tuple[str, int, int, bool] | None] = None) -> DapperRow:
         '''
         Format row content to headers
+
+        row     :   Row input values
+        fitted  :   Shortened and measured column values from a batch, None for columns to measure here
         '''
+        timed = self._timed()
+        if timed:
+            row_start = perf_counter()
         padding = None
-        col_items = []
+        segments = []
         for (count, item) in enumerate(row):
             if self._headers[count].zero_pad:
                 padding = self._check_padding_zeros(item)
                 item = f'{"0" * padding}{item}'
-            col_string = shorten_string(item, self._headers[count].width)
-            is_last_column = count == len(self._headers) - 1
-            formatted_col = self._generate_formatted_string(self._headers[count].width, col_string, is_last_column)
-            col_items.append(formatted_col)
-        row_string = self._separator.join(i for i in col_items)
-        row_string = row_string.rstrip(' ')
-        return DapperRow(row_string, row, zero_padding_value=padding)
+            segments.append(self._format_cell(count, item, fitted[count] if fitted else None))
+        formatted_row = self._join_segments(segments, row, padding)
+        if timed:
+            self._record('format_row', 1, perf_counter() - row_start)
+        return formatted_row
+
+    def _format_rows(self, rows: List[List[str]]) -> List[DapperRow]:
+        '''
+        Format many rows, measuring each column in one batch when NumPy is installed
+        '''
+        if len(rows) < _batch.BATCH_MIN_ROWS or not _batch.numpy_module():
+            return [self._format_row(row) for row in rows]
+        timed = self._timed()
+        columns = []
+        for (count, header) in enumerate(self._headers):
+            values = [str(row[count]) for row in rows]
+            if header.zero_pad:
+                values = [f'{"0" * self._check_padding_zeros(value)}{value}' for value in values]
+            if timed:
+                start = perf_counter()
+            columns.append(_batch.fit_column(values, self._widths[count]))
+            if timed:
+                self._record('batch_measure', len(rows), perf_counter() - start)
+        return [self._format_row(row, fitted) for (row, fitted) in zip(rows, zip(*columns))]
 
-    def __reset_zero_pad(self, current_index: int) -> bool:
+    def _update_zero_pad(self, row_count: int) -> bool:
         '''
-        Reset zero pad on previous rows
+        Update zero pad width for new row count
+
+        row_count   :   Number of rows in table after the current change
+
+        returns: True if the width changed
         '''
         if not self._contains_zero_pad:
             return False
-        # Format previous rolls to make sure leading prefixes is set
-        padding_check = None
-        for idx in range(current_index - 1, -1, -1):
-            row = self._rows[idx]
-            if padding_check is None:
-                for (count, item) in enumerate(row.input_values):
-                    # If the padding is already fine, lets just return
-                    if self._headers[count].zero_pad:
-                        padding = self._check_padding_zeros(item)
-                        if padding == row.zero_padding_value:
-                            return True
-                        # Else lets keep going
-                        padding_check = False
-                        break
-            self._rows[idx] = self._format_row(row.input_values)
+        zero_pad_width = len(str(row_count))
+        if zero_pad_width == self._zero_pad_width:
+            return False
+        self._zero_pad_width = zero_pad_width
         return True
 
+    def _track_widths(self, row: List[str], change: int) -> None:
+        '''
+        Count value widths of auto width columns
+
+        row     :   Row input values
+        change  :   1 when row is added, -1 when row is removed
+        '''
+        for (count, width_counts) in self._width_counts.items():
+            # Anything wider than the max width gets truncated, count it as max width
+            width = min(string_width(str(row[count])), self._headers[count].width)
+            width_counts[width] = width_counts.get(width, 0) + change
+            if not width_counts[width]:
+                del width_counts[width]
+
+    def _auto_widths(self) -> List[int]:
+        '''
+        Get column widths, auto width columns use the percentile of their value widths
+        capped by the column width and the length pagination budget
+        '''
+        widths = list(self._widths)
+        for (count, width_counts) in self._width_counts.items():
+            col = self._headers[count]
+            # Keep space for the header name and zero padding
+            width = max(string_width(col.name), self._zero_pad_width if col.zero_pad else 0)
+            target = ceil(sum(width_counts.values()) * col.percentile / 100)
+            seen = 0
+            for value_width in sorted(width_counts):
+                seen += width_counts[value_width]
+                if seen >= target:
+                    width = max(width, value_width)
+                    break
+            widths[count] = min(width, col.width)
+        if not self._length_per_message or not self._width_counts:
+            return widths
+        # Shrink widest auto width columns until rows fit on a page
+        excess = sum(widths) + string_width(self._separator) * (len(widths) - 1) - self._length_per_message
+        while excess > 0:
+            count = max(self._width_counts, key=lambda i: widths[i])
+            if widths[count] <= 1:
+                break
+            widths[count] -= 1
+            excess -= 1
+        return widths
+
+    def _update_layout(self, row_count: int) -> bool:
+        '''
+        Update zero pad and auto widths, reformats existing rows once if either changed
+
+        row_count   :   Number of rows in table after the current change
+
+        returns: True if rows were reformatted
+        '''
+        changed = self._update_zero_pad(row_count)
+        if self._width_counts:
+            widths = self._auto_widths()
+            if widths != self._widths:
+                self._widths = widths
+                self._header_rows = self._generate_headers()
+                changed = True
+        if not changed:
+            return False
+        timed = self._timed()
+        if timed:
+            start = perf_counter()
+        self._rows = self._format_rows([row.input_values for row in self._rows])
+        if timed:
+            self._record('reformat', len(self._rows), perf_counter() - start)
+        self._invalidate_pages()
+        for view in self._views:
+            view._invalidate_pages() # pylint: disable=protected-access
+        return True
+
+    def _get_index(self, index: int, message: str, allow_end: bool = False) -> int:
+        '''
+        Validate row index
+
+        index       :   Index of row
+        message     :   Error message if index is invalid
+        allow_end   :   Allow index one past the last row
+        '''
+        if index < 0:
+            raise DapperTableError('Index must be positive number')
+        index = int(index)
+        if index > len(self._rows) or (index == len(self._rows) and not allow_end):
+            raise DapperTableError(f'{message} {index}')
+        return index
+
     def add_row(self, row: List[str] | str) -> int:
         '''
         Add row to table
@@ -442,12 +427,62 @@ class DapperTable():
         '''
         # If headers, add extra checks, else just accept input
         self._validate_row(row)
+        return self._insert_row(len(self._rows), row)
+
+    def add_rows(self, rows: List[List[str] | str]) -> int:
+        '''
+        Add many rows to table, formatting them once for the final row count
+
+        rows    :   Rows to add, each as given to add_row
+
+        returns: index of first new row
+        '''
+        rows = list(rows)
+        for row in rows:
+            self._validate_row(row)
+        index = len(self._rows)
+        if self._headers:
+            for row in rows:
+                self._track_widths(row, 1)
+            self._update_layout(index + len(rows))
+            self._rows.extend(self._stored_row(row_data) for row_data in self._format_rows(rows))
+        else:
+            self._rows.extend(self._stored_row(DapperRow(row, row)) for row in rows)
+        header_count = len(self._header_rows)
+        self._rows_changed(header_count + index, header_count + index + len(rows), len(rows))
+        for view in self._views:
+            for count in range(index, index + len(rows)):
+                view._row_inserted(count) # pylint: disable=protected-access
+        return index
+
+    def insert_row(self, index: int, row: List[str] | str) -> int:
+        '''
+        Insert row into table, rows at and after the index move down
+
+        index   :   Index to place row at, can be the table size to add at the end
+        row     :   List of items to go in row, assumes each item list is string representation
+
+        returns: index of new row
+        '''
+        index = self._get_index(index, 'Invalid insert index given', allow_end=True)
+        self._validate_row(row)
+        return self._insert_row(index, row)
+
+    def _insert_row(self, index: int, row: List[str] | str) -> int:
+        '''
+        Format and insert validated row
+        '''
         row_data = DapperRow(row, row)
         if self._headers:
+            self._track_widths(row, 1)
+            self._update_layout(len(self._rows) + 1)
             row_data = self._format_row(row)
-        self._rows.append(row_data)
-        self.__reset_zero_pad(len(self._rows) - 1)
-        return len(self._rows) - 1
+        self._rows.insert(index, self._stored_row(row_data))
+        header_count = len(self._header_rows)
+        self._rows_changed(header_count + index, header_count + index + 1, 1)
+        for view in self._views:
+            view._row_inserted(index) # pylint: disable=protected-access
+        return index
 
     def edit_row(self, index: int, row: List[str] | str) -> bool:
         '''
@@ -456,17 +491,132 @@ class DapperTable():
         index   :   Index of row to update
         row     :   List of items to go in row, assumes each item list is string representation
         '''
-        if index < 0:
-            raise DapperTableError('Index must be positive number')
-        try:
-            _current_value = self._rows[int(index)]
-        except IndexError as exc:
-            raise DapperTableError(f'Invalid edit index given {index}') from exc
+        index = self._get_index(index, 'Invalid edit index given')
         self._validate_row(row)
         row_data = DapperRow(row, row)
         if self._headers:
+            self._track_widths(self._rows[index].input_values, -1)
+            self._track_widths(row, 1)
+            self._update_layout(len(self._rows))
             row_data = self._format_row(row)
-        self._rows[int(index)] = row_data
+        self._rows[index] = self._stored_row(row_data)
+        header_count = len(self._header_rows)
+        self._rows_changed(header_count + index, header_count + index + 1, 0)
+        for view in self._views:
+            view._row_edited(index) # pylint: disable=protected-access
+        return True
+
+    def _column_index(self, column: int | str) -> int:
+        '''
+        Validate column given by index or name
+
+        column  :   Column index or name
+        '''
+        if not self._headers:
+            raise DapperTableError('Cell updates require columns')
+        for (count, header) in enumerate(self._headers):
+            if column in (count, header.name):
+                return count
+        raise DapperTableError(f'Invalid column given {column}')
+
+    def _format_cells(self, count: int, values: List[str]) -> List[Tuple[str, int | None]]:
+        '''
+        Format values of one column, measured in one batch when NumPy is installed
+        '''
+        if len(values) < _batch.BATCH_MIN_ROWS or not _batch.numpy_module():
+            return [self._format_cell(count, value) for value in values]
+        fitted = _batch.fit_column(values, self._widths[count])
+        return [self._format_cell(count, value, fit) for (value, fit) in zip(values, fitted)]
+
+    def _replace_cells(self, count: int, indexes: List[int], values: List[str]) -> None:
+        '''
+        Replace column value in rows, only the changed cells are formatted again
+
+        count   :   Column index, must not be a zero pad or auto width column
+        indexes :   Row indexes in ascending order
+        values  :   New column value for each row
+        '''
+        cells = self._format_cells(count, [str(value) for value in values])
+        for (index, value, cell) in zip(indexes, values, cells):
+            old_row = self._rows[index]
+            row = list(self._input_values(index))
+            row[count] = value
+            if old_row._segments is None: # pylint: disable=protected-access
+                # Rows restored from snapshots have no segments, format them fully
+                self._rows[index] = self._format_row(row)
+                continue
+            segments = self._split_segments(old_row)
+            segments[count] = cell
+            self._rows[index] = self._join_segments(segments, row, old_row.zero_padding_value)
+        if not indexes:
+            return
+        header_count = len(self._header_rows)
+        self._rows_changed(header_count + indexes[0], header_count + indexes[-1] + 1, 0)
+        for view in self._views:
+            for index in indexes:
+                view._row_edited(index) # pylint: disable=protected-access
+
+    def update_cell(self, index: int, column: int | str, value: str) -> bool:
+        '''
+        Update a single cell, other cells of the row are not formatted again
+
+        index   :   Index of row to update
+        column  :   Column index or name
+        value   :   New cell value, assumes string representation
+        '''
+        count = self._column_index(column)
+        index = self._get_index(index, 'Invalid edit index given')
+        header = self._headers[count]
+        if header.zero_pad or header.auto_width:
+            # Value width can change the layout of every row
+            row = list(self._input_values(index))
+            row[count] = value
+            return self.edit_row(index, row)
+        self._replace_cells(count, [index], [value])
+        return True
+
+    def update_column(self, column: int | str, values: List[str]) -> bool:
+        '''
+        Update one column of every row, only cells with new values are formatted again
+
+        column  :   Column index or name
+        values  :   New cell value for each row, assumes string representation
+        '''
+        count = self._column_index(column)
+        values = list(values)
+        if len(values) != len(self._rows):
+            raise DapperTableError('Column values must match number of rows')
+        indexes = [index for (index, value) in enumerate(values) if self._input_values(index)[count] != value]
+        header = self._headers[count]
+        if header.zero_pad or header.auto_width:
+            operations = []
+            for index in indexes:
+                row = list(self._input_values(index))
+                row[count] = values[index]
+                operations.append(('edit', index, row))
+            self._apply_batch(operations, track_pages=False)
+            return True
+        self._replace_cells(count, indexes, [values[index] for index in indexes])
+        return True
+
+    def move_row(self, source: int, destination: int) -> bool:
+        '''
+        Move row to a new position, rows in between shift to fill the gap
+
+        source      :   Index of row to move
+        destination :   Index the row should end up at
+        '''
+        source = self._get_index(source, 'Invalid move index given')
+        destination = self._get_index(destination, 'Invalid move index given')
+        if source == destination:
+            return True
+        self._rows.insert(destination, self._rows.pop(source))
+        header_count = len(self._header_rows)
+        self._rows_changed(header_count + min(source, destination),
+                           header_count + max(source, destination) + 1, 0)
+        for view in self._views:
+            view._row_removed(source) # pylint: disable=protected-access
+            view._row_inserted(destination) # pylint: disable=protected-access
         return True
 
     def remove_row(self, index: int) -> bool:
@@ -476,60 +626,150 @@ class DapperTable():
         index   :   Index of row, cannot remove headers
         '''
         try:
-            del self._rows[index]
+            removed = self._rows.pop(index)
         except IndexError as exc:
             raise DapperTableError('Invalid deletion index') from exc
+        # Negative indexes are allowed, views need the actual position
+        if index < 0:
+            index += len(self._rows) + 1
+        header_count = len(self._header_rows)
+        self._rows_changed(header_count + index, header_count + index, -1)
+        for view in self._views:
+            view._row_removed(index) # pylint: disable=protected-access
+        if self._headers:
+            self._track_widths(removed.input_values, -1)
+            self._update_layout(len(self._rows))
         return True
 
-    def get_pages(self) -> List[DapperRow]:
-        '''
-        Return list of rows based on pagination options
-        '''
-        # If no pagination options, return raw list
-        all_rows = self._header_rows + self._rows
-        if not (self._rows_per_message or self._length_per_message):
-            return all_rows
-        if self._rows_per_message:
-            return _chunk_list(all_rows, self._rows_per_message)
-        # Assume length per message
-        return _chunk_list_by_length(all_rows, self._length_per_message, self._prefix, self._suffix)
-
-    def format_page(self, row_list: List[DapperRow]) -> str:
-        '''
-        Join a list of DapperRow objects into a formatted string,
-        collapsing double newlines if set.
-        '''
-        combined = '\n'.join(i.content for i in row_list)
-        if not self.collapse_newlines:
-            return combined
-        combined = sub(r'\n{2,}', '\n', combined)
-        combined = combined.strip('\n')
-        return combined
-
-    def render(self) -> List[str] | str:
-        '''
-        Render table output. Returns a string if no pagination is set,
-        or a list of strings if paginated.
-        '''
-        # If no pagination options given
-        if not (self._rows_per_message or self._length_per_message):
-            output = self.format_page(self._header_rows + self._rows)
-            return f'{self._prefix}{self._enclosure_start}{output}{self._enclosure_end}{self._suffix}'
-
-        split_rows = self.get_pages()
-        split_output = []
-        for i, sr in enumerate(split_rows):
-            page_output = self.format_page(sr)
-            # Wrap content with enclosure
-            page_output = f'{self._enclosure_start}{page_output}{self._enclosure_end}'
-            # Add prefix to first page (before enclosure)
-            if i == 0 and self._prefix:
-                page_output = f'{self._prefix}{page_output}'
-            # Add suffix to last page (after enclosure)
-            if i == len(split_rows) - 1 and self._suffix:
-                page_output = f'{page_output}{self._suffix}'
-            split_output.append(page_output)
-        return split_output
+    def _stored_row(self, row_data: DapperRow) -> DapperRow:
+        '''
+        Drop input values and segments from formatted row if the table does not retain them
+        '''
+        if not self._retain_input_values:
+            row_data.input_values = None
+            row_data._segments = None # pylint: disable=protected-access
+        return row_data
+
+    def _input_values(self, index: int) -> List[str] | str:
+        '''
+        Input values of row, raises if the table does not retain them
+        '''
+        if not self._retain_input_values:
+            raise DapperTableError('Row input values are not retained')
+        return self._rows[index].input_values
+
+    def memory_usage(self) -> 'MemoryUsage':
+        '''
+        Approximate memory used by the table, objects shared between rows or parts are counted once
+
+        returns: bytes used by each part of the table
+        '''
+        seen = set()
+        usage = MemoryUsage()
+        usage.rows = _deep_sizeof(self._rows, seen, recurse=False)
+        for row in self._rows:
+            usage.rows += _deep_sizeof(row, seen, recurse=False)
+            usage.content += _deep_sizeof(row.content, seen)
+            usage.input_values += _deep_sizeof(row.input_values, seen)
+            usage.segments += _deep_sizeof(row._segments, seen) # pylint: disable=protected-access
+        usage.headers = _deep_sizeof(self._header_rows, seen, recurse=False)
+        for row in self._header_rows:
+            usage.headers += _deep_sizeof(row, seen, recurse=False) + _deep_sizeof(row.content, seen)
+        usage.caches = _deep_sizeof(self._widths, seen) + _deep_sizeof(self._width_counts, seen)
+        usage.pagination = _deep_sizeof(self._page_bounds, seen)
+        for target in self._targets.values():
+            usage.pagination += _deep_sizeof(target._page_bounds, seen) # pylint: disable=protected-access
+        return usage
+
+    def batch(self) -> 'DapperTableBatch':
+        '''
+        Queue row changes to apply together, use as a context manager to apply on exit
+
+        returns: batch for this table
+        '''
+        return DapperTableBatch(self)
+
+    def _apply_operation(self, action: str, index: int, row: List[str] | str) -> DapperRow | None:
+        '''
+        Apply one queued row change, new and edited rows hold their input values until formatted
+
+        returns: unformatted row if one was added
+        '''
+        header_count = len(self._header_rows)
+        if action == 'remove':
+            removed = self._rows.pop(index)
+            if self._headers:
+                self._track_widths(removed.input_values, -1)
+            self._rows_changed(header_count + index, header_count + index, -1)
+            for view in self._views:
+                view._row_removed(index) # pylint: disable=protected-access
+            return None
+        row_data = DapperRow(row, row)
+        if self._headers:
+            self._track_widths(row, 1)
+        if action == 'insert':
+            self._rows.insert(index, row_data)
+            self._rows_changed(header_count + index, header_count + index + 1, 1)
+            for view in self._views:
+                view._row_inserted(index) # pylint: disable=protected-access
+            return row_data
+        if self._headers:
+            self._track_widths(self._rows[index].input_values, -1)
+        self._rows[index] = row_data
+        self._rows_changed(header_count + index, header_count + index + 1, 0)
+        for view in self._views:
+            view._row_edited(index) # pylint: disable=protected-access
+        return row_data
+
+    def _apply_batch(self, operations: List[Tuple[str, int, List[str] | str]], track_pages: bool = True) -> List[int]:
+        '''
+        Apply queued row changes with one layout update and one pagination
+
+        operations  :   Action, row index and row input values for each change
+        track_pages :   Paginate before and after to find changed pages, otherwise nothing is paginated
+
+        returns: indexes of pages with changed output, empty if pages are not tracked
+        '''
+        old_pages = []
+        if track_pages:
+            try:
+                old_pages = self._page_lists()
+            except DapperTableError:
+                # Rows too long to paginate before the batch, every page after it is changed
+                pass
+        pending = [self._apply_operation(action, index, row) for (action, index, row) in operations]
+        pending = [row_data for row_data in pending if row_data is not None]
+        # Rows are only formatted here if the layout update did not reformat every row
+        if self._headers and not self._update_layout(len(self._rows)):
+            for (row_data, formatted_row) in zip(pending, self._format_rows([row_data.input_values for row_data in pending])):
+                row_data.content = formatted_row.content
+                row_data.zero_padding_value = formatted_row.zero_padding_value
+                row_data._width = formatted_row._width # pylint: disable=protected-access
+                row_data._segments = formatted_row._segments # pylint: disable=protected-access
+        for row_data in pending:
+            self._stored_row(row_data)
+        if not track_pages:
+            return []
+        return _changed_pages(old_pages, self._page_lists())
+
+    def _page_rows(self) -> List[DapperRow]:
+        '''
+        All rows to paginate, including headers
+        '''
+        return self._header_rows + self._rows
+
+    def _restore_rows(self, rows: List[DapperRow], zero_pad_width: int,
+                      widths: List[int] = None, width_counts: dict = None) -> None:
+        '''
+        Replace rows with already formatted rows, used when loading snapshots
+        '''
+        self._rows = rows
+        self._zero_pad_width = zero_pad_width
+        if widths:
+            self._widths = widths
+            self._width_counts = width_counts
+            self._header_rows = self._generate_headers()
+        self._invalidate_pages()
 
     @property
     def size(self) -> int:
@@ -540,3 +780,34 @@ class DapperTable():
 
     def __len__(self) -> int:
         return len(self._rows)
+
+
+def pack_tables(tables: List[_PagedRenderer], pagination_options: PaginationLength, joiner: str = '\n') -> List[str]:
+    '''
+    Pack pages of several tables into as few messages as possible.
+    Each table is paginated by the shared length with its own prefix, suffix and enclosure,
+    tables keep their order and pages are only placed together when the message stays within the length.
+
+    tables              :   Tables or views to pack
+    pagination_options  :   Length pagination shared by all messages
+    joiner              :   String placed between pages in the same message
+
+    returns: list of messages
+    '''
+    if not isinstance(pagination_options, PaginationLength):
+        raise DapperTableError('Packing tables requires length pagination')
+    max_length = pagination_options.length_per_message
+    # Measure each line, strings with newlines fall back to their character count
+    joiner_width = sum(string_width(line) for line in joiner.split('\n')) + joiner.count('\n')
+    messages = []
+    width = 0
+    for table in tables:
+        for (page, page_width) in table._render_at_length(max_length): # pylint: disable=protected-access
+            # Pages are kept in order, so filling each message before starting the next gives the fewest messages
+            if messages and width + joiner_width + page_width <= max_length:
+                messages[-1].append(page)
+                width += joiner_width + page_width
+                continue
+            messages.append([page])
+            width = page_width
+    return [joiner.join(pages) for pages in messages]
@@ -0,0 +1,114 @@
+'''
+Batch column measuring with NumPy
+
+Used for bulk inserts when NumPy is installed. A whole column of cells is encoded
+into one array of code points, widths and wide flags come from the code point lookup
+table, and per cell sums and truncation cut points are taken from cumulative sums.
+
+Cells with complex characters are left to the pure python path, so output is the same
+with or without NumPy.
+'''
+from functools import cache
+from typing import List, Tuple
+
+from dappertable import _width
+
+# Smallest batch worth the array setup
+BATCH_MIN_ROWS = 128
+
+
+@cache
+def numpy_module():
+    '''
+    Import NumPy if installed, None otherwise
+    '''
+    try:
+        import numpy # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return numpy
+
+
+class _Lookup:
+    '''
+    NumPy copy of the BMP lookup table, filled block by block as code points are seen
+    '''
+    def __init__(self, numpy):
+        self.table = numpy.zeros(0x10000, dtype=numpy.uint8)
+        self.filled = numpy.zeros(0x100, dtype=bool)
+
+    def values(self, numpy, codes):
+        '''
+        Get lookup values for code points
+        '''
+        values = numpy.empty(len(codes), dtype=numpy.uint8)
+        bmp = codes < 0x10000
+        bmp_codes = codes[bmp]
+        for index in numpy.unique(bmp_codes >> 8).tolist():
+            if not self.filled[index]:
+                self.table[index << 8:(index + 1) << 8] = numpy.frombuffer(_width.block_values(index), dtype=numpy.uint8)
+                self.filled[index] = True
+        values[bmp] = self.table[bmp_codes]
+        if not bmp.all():
+            astral_codes, inverse = numpy.unique(codes[~bmp], return_inverse=True)
+            astral_values = numpy.array([_width.astral_value(code) for code in astral_codes.tolist()], dtype=numpy.uint8)
+            values[~bmp] = astral_values[inverse]
+        return values
+
+
+@cache
+def _lookup() -> _Lookup:
+    '''
+    Shared lookup table
+    '''
+    return _Lookup(numpy_module())
+
+
+def fit_column(values: List[str], width: int, placeholder: str = '..') -> List[Tuple[str, int, int, bool] | None]:
+    # pylint: disable=too-many-locals
+    '''
+    Shorten column values to width, measuring them all at once
+
+    values      :   Column values as strings
+    width       :   Column display width
+    placeholder :   Placed at end of shortened values
+
+    returns: shortened value, display width, wide character count and True for each cell,
+             None for cells that need to be measured in python
+    '''
+    numpy = numpy_module()
+    placeholder_width, placeholder_wide = _width.measure(placeholder)
+    if placeholder_width is None:
+        return [None] * len(values)
+    lengths = numpy.fromiter((len(value) for value in values), dtype=numpy.int64, count=len(values))
+    ends = numpy.cumsum(lengths)
+    starts = ends - lengths
+    codes = numpy.frombuffer(''.join(values).encode('utf-32-le', 'surrogatepass'), dtype=numpy.uint32)
+    lookup = _lookup().values(numpy, codes)
+    char_widths = lookup & _width.WIDTH_MASK
+    # Cumulative sums with a leading zero, cell totals are differences between bounds
+    width_sums = numpy.concatenate(([0], numpy.cumsum(char_widths, dtype=numpy.int64)))
+    wide_sums = numpy.concatenate(([0], numpy.cumsum(lookup >> 2, dtype=numpy.int64)))
+    complex_sums = numpy.concatenate(([0], numpy.cumsum(char_widths == 0, dtype=numpy.int64)))
+    display_widths = width_sums[ends] - width_sums[starts]
+    wide_counts = wide_sums[ends] - wide_sums[starts]
+    simple = complex_sums[ends] == complex_sums[starts]
+    # Character widths are at least one in simple cells, so cumulative widths are sorted
+    # and the cut is the count of characters fitting in the width left for the placeholder
+    cuts = numpy.searchsorted(width_sums, width_sums[starts] + (width - placeholder_width), side='right') - starts - 1
+    cuts = numpy.clip(cuts, 0, lengths)
+    cut_widths = width_sums[starts + cuts] - width_sums[starts]
+    cut_wides = wide_sums[starts + cuts] - wide_sums[starts]
+
+    fitted = []
+    for (value, display_width, wide_count, is_simple, cut, cut_width, cut_wide) in zip(
+            values, display_widths.tolist(), wide_counts.tolist(), simple.tolist(),
+            cuts.tolist(), cut_widths.tolist(), cut_wides.tolist()):
+        if not is_simple:
+            fitted.append(None)
+        elif display_width <= width:
+            fitted.append((value, display_width, wide_count, True))
+        else:
+            fitted.append((f'{value[:cut]}{placeholder}', cut_width + placeholder_width,
+                           cut_wide + placeholder_wide, True))
+    return fitted
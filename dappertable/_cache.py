@@ -0,0 +1,84 @@
+'''
+Page cache shared by all tables
+'''
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from dappertable._core import DapperTableError
+
+@dataclass
+class PageCacheInfo:
+    '''
+    Hit and miss counts of the shared page cache
+    '''
+    hits: int = 0
+    misses: int = 0
+    size: int = 0
+    maxsize: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        '''
+        Share of lookups answered from the cache
+        '''
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+class _PageCache():
+    '''
+    Bounded least recently used cache of page output, keyed by page row contents and layout
+    '''
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> str | None:
+        '''
+        Get cached output, None if not cached
+        '''
+        output = self.entries.get(key)
+        if output is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return output
+
+    def put(self, key: tuple, output: str) -> None:
+        '''
+        Cache output, dropping least recently used entries over the size limit
+        '''
+        self.entries[key] = output
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+# Shared by every table once enabled
+PAGE_CACHE = None
+
+def enable_page_cache(maxsize: int = 1024) -> None:
+    '''
+    Cache page output across all tables, identical pages are only joined and wrapped once
+
+    maxsize :   Number of pages to keep
+    '''
+    global PAGE_CACHE # pylint: disable=global-statement
+    if maxsize < 1:
+        raise DapperTableError('Page cache size must be at least 1')
+    PAGE_CACHE = _PageCache(maxsize)
+
+def disable_page_cache() -> None:
+    '''
+    Stop caching page output and drop cached pages
+    '''
+    global PAGE_CACHE # pylint: disable=global-statement
+    PAGE_CACHE = None
+
+def page_cache_info() -> PageCacheInfo:
+    '''
+    Get hit and miss counts of the page cache, all zero if it is not enabled
+    '''
+    if PAGE_CACHE is None:
+        return PageCacheInfo()
+    return PageCacheInfo(PAGE_CACHE.hits, PAGE_CACHE.misses, len(PAGE_CACHE.entries), PAGE_CACHE.maxsize)
@@ -0,0 +1,264 @@
+'''
+Table settings, rows and display width
+
+Error type, column and pagination settings, the row type and the string width,
+shortening and padding functions used by every table.
+'''
+from dataclasses import dataclass, field
+from enum import Enum
+from math import ceil
+from typing import List, Tuple
+
+from dappertable import _width
+
+class DapperTableError(Exception):
+    '''
+    Generic error class
+    '''
+
+@dataclass
+class Column:
+    '''
+    Defines a single table column with a name and maximum display width.
+    Auto width columns fit their content instead, using width as the maximum.
+    '''
+    name: str
+    width: int
+    zero_pad: bool = False
+    auto_width: bool = False
+    percentile: int = 100
+
+    def __post_init__(self):
+        if not 0 < self.percentile <= 100:
+            raise DapperTableError(f'Invalid value for column percentile: {self.percentile}')
+
+@dataclass
+class Columns:
+    '''
+    Collection of Column definitions with a column separator.
+    '''
+    headers: List[Column] | Column
+    separator: str = '||'
+
+    def __post_init__(self):
+        if isinstance(self.headers, Column):
+            self.headers = [self.headers]
+        if not self.headers:
+            raise DapperTableError('Must have at least one header')
+        for header in self.headers:
+            if not isinstance(header, Column):
+                raise DapperTableError('Header must be Column object')
+
+
+class PaginationType(Enum):
+    '''
+    Pagination type
+    '''
+    ROWS = 'rows'
+    LENGTH = 'length'
+
+@dataclass
+class _PaginationBase:
+    '''
+    Base pagination settings class
+    '''
+    pagination_type: PaginationType
+
+@dataclass
+class PaginationRows(_PaginationBase):
+    '''
+    Pagination By Rows
+    '''
+    rows_per_message: int
+    pagination_type: PaginationType = field(default=PaginationType.ROWS, init=False)
+
+@dataclass
+class PaginationLength(_PaginationBase):
+    '''
+    Pagination By Length
+    '''
+    length_per_message: int
+    pagination_type: PaginationType = field(default=PaginationType.LENGTH, init=False)
+
+@dataclass
+class PaginationTarget:
+    '''
+    Extra pagination of a table for another destination, with its own page layout
+    '''
+    pagination_options: _PaginationBase
+    prefix: str = ''
+    suffix: str = ''
+    enclosure_start: str = ''
+    enclosure_end: str = ''
+
+
+# Count of raw edits made with DapperRow.edit(), cached page bounds are dropped when it changes
+ROW_EDITS = 0
+
+@dataclass(slots=True)
+class DapperRow:
+    '''
+    Instance of a row in a table
+    '''
+    content: str
+    input_values: List[str] | str
+    zero_padding_value: int | None = None
+    _width: int | None = field(default=None, init=False, repr=False)
+    # End offset of each formatted column in content before trailing spaces were stripped,
+    # followed by each column display width, used to replace single cells
+    _segments: Tuple[int | None, ...] | None = field(default=None, init=False, repr=False)
+
+    @property
+    def width(self) -> int:
+        '''
+        Display width of row content, cached until the content is edited
+        '''
+        if self._width is None:
+            self._width = string_width(self.content)
+        return self._width
+
+    def edit(self, new_content: str) -> bool:
+        '''
+        Allow raw editing of row content
+        '''
+        global ROW_EDITS # pylint: disable=global-statement
+        ROW_EDITS += 1
+        self.content = new_content
+        self.input_values = new_content
+        self._width = None
+        self._segments = None
+        return True
+
+    def __eq__(self, other):
+        '''
+        Override equals check
+        '''
+        return other.content == self.content
+
+    def __len__(self):
+        '''
+        Override length check
+        '''
+        return len(self.content)
+
+    def __getitem__(self, index: int):
+        '''
+        Override get item
+        '''
+        return self.content[index]
+
+def wcswidth(input_string: str) -> int:
+    '''
+    Display width of string from wcwidth, returns -1 for non-printable characters
+    '''
+    return _width.wcwidth_module().wcswidth(input_string)
+
+def _is_printable_ascii(input_string: str) -> bool:
+    '''
+    Printable ascii characters are all one column wide
+    '''
+    return input_string.isascii() and input_string.isprintable()
+
+def _measure(input_string: str) -> Tuple[int, int, bool]:
+    '''
+    Get display width, wide character count and whether width is the sum of character widths
+
+    input_string    :   String to measure
+    '''
+    if _is_printable_ascii(input_string):
+        return len(input_string), 0, True
+    width, wide_count = _width.measure(input_string)
+    if width is not None:
+        return width, wide_count, True
+    # Complex characters depend on their neighbours, use wcwidth for the whole string
+    width = wcswidth(input_string)
+    # wcswidth returns -1 if string contains non-printable characters
+    # Fall back to basic string length in that case
+    if width == -1:
+        return len(input_string), wide_count, False
+    return width, wide_count, False
+
+def shorten_string(intput_string: str, width: int, placeholder: str = '..') -> str:
+    '''
+    Shorten a string with wide characters (e.g. East Asian characters)
+
+    intput_string (string): input string to shorten
+    width (int): character count to shorten too
+    placeholder (str, optional): cut of end characters if space is there. Defaults to '..'.
+    '''
+    input_string = str(intput_string)
+    # get the display width using wcwidth
+    string_display_width, _, simple = _measure(input_string)
+    if string_display_width <= width:
+        return input_string
+    if simple:
+        placeholder_width, _, placeholder_simple = _measure(placeholder)
+        if not placeholder_simple:
+            placeholder_width = wcswidth(placeholder)
+        if _is_printable_ascii(input_string):
+            # Every character is one column wide, so cut directly
+            return f'{input_string[:max(0, width - placeholder_width)]}{placeholder}'
+        # Character widths add up, so cut at the last character that fits
+        return f'{input_string[:_width.cut_index(input_string, width - placeholder_width)]}{placeholder}'
+    # set current length and output string
+    out_string = ''
+    # loop through each character
+    for char in input_string:
+        # Calculate what the width would be if we add this character
+        new_string = out_string + char
+        new_string_width = wcswidth(new_string)
+        # Handle non-printable characters - fall back to basic length
+        if new_string_width == -1:
+            new_string_width = len(new_string)
+
+        # if the new length is smaller than the output length to shorten too add the char
+        if new_string_width <= (width - wcswidth(placeholder)):
+            out_string += char
+        else:
+            break
+    # return string with new width and placeholder
+    return f"{out_string}{placeholder}"
+
+def string_width(input_string: str) -> int:
+    '''
+    Get display width of a string (accounts for wide characters)
+
+    string (string): string to get display width for
+    '''
+    return _measure(input_string)[0]
+
+def _padded_length(char_count: int, display_width: int, wide_count: int, length: int) -> int:
+    '''
+    Get format length for string shorter than length from its measurements
+
+    char_count      :   Character count of string
+    display_width   :   Display width of string
+    wide_count      :   Count of East Asian wide characters in string
+    length          :   Desired display width for string
+    '''
+    # For strings shorter than target, calculate the needed padding
+    # Count actual wide East Asian characters (excluding fullwidth ASCII like ＂)
+    # to determine adjustment needed for terminals that don't render wide chars correctly
+    needed_padding = length - display_width
+    adjusted_padding = needed_padding + (ceil(wide_count / 4))
+    return char_count + adjusted_padding
+
+def format_string_length(input_string: str, length: int) -> int:
+    '''
+    Returns length updated for string with wide characters
+    Calculate the padding width needed to achieve the desired display width
+    when using Python's string formatting with wide characters (e.g. East Asian)
+
+    input_string (string): string to calculate length of
+    length (int): desired display width for string
+    '''
+    # Display width and count of true wide characters (W width, not fullwidth ASCII variants)
+    # come from the same pass over the string
+    display_width, wide_count, _ = _measure(input_string)
+
+    # For proper separator alignment, we need consistent format widths
+    # When the display width meets or exceeds target, we use the target length
+    # to ensure all separators align at the same character position
+    if display_width >= length:
+        return length
+    return _padded_length(len(input_string), display_width, wide_count, length)
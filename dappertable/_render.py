@@ -0,0 +1,572 @@
+'''
+Pagination and rendering shared by tables, views, targets and virtual tables
+'''
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from io import BufferedIOBase, RawIOBase
+from time import perf_counter
+from typing import BinaryIO, Callable, List, TextIO, Tuple
+
+from dappertable import _cache, _core, _stats
+from dappertable._core import DapperTableError, DapperRow, PaginationType, _PaginationBase, string_width
+from dappertable._stats import TableStats
+
+def _chunk_bounds(list_length: int, chunk_size: int) -> List[Tuple[int, int]]:
+    '''
+    Split list into equal sized chunks, returns (start, end) index pairs for each chunk
+
+    list_length: Length of list to split
+    chunk_size: Chunk list into size bits
+    '''
+    size = max(1, chunk_size)
+    return [(i, min(i + size, list_length)) for i in range(0, list_length, size)]
+
+def _chunk_bounds_by_length(input_list: List[DapperRow], max_length: int, prefix: str = '',
+                            start: int = 0, is_first_chunk: bool = True,
+                            resume: Callable[[int], List[Tuple[int, int]] | None] = None) -> List[Tuple[int, int]]:
+    # pylint: disable=too-many-locals
+    '''
+    Split list by length, accounting for prefix on first chunk
+    Returns (start, end) index pairs for each chunk, suffix is handled by _apply_suffix_bounds
+
+    start           :   Index to start chunking from
+    is_first_chunk  :   Whether the chunk at start is the first chunk, which holds the prefix
+    resume          :   Called with the start index of each new chunk, can return the remaining
+                        chunk bounds if they are already known
+    '''
+    new_bounds = []
+    current_size = 0
+    current_start = start
+    prefix_width = string_width(prefix)
+
+    for index in range(start, len(input_list)):
+        current_item = input_list[index]
+        item_width = current_item.width
+
+        # Check if item is too large for any page
+        if item_width > max_length:
+            raise DapperTableError(f'Length of input "{current_item.content}" is greater than max length {max_length}')
+
+        # Determine available space for current chunk
+        if is_first_chunk:
+            available_space = max_length - prefix_width
+        else:
+            available_space = max_length
+
+        # Calculate the size this item will add to the chunk
+        # Include newline separator if this isn't the first row in the chunk
+        item_size_to_add = item_width
+        if index > current_start:  # If there are already rows, we need a newline before this one
+            item_size_to_add += 1
+
+        # If first item doesn't fit with prefix, create empty chunk with just prefix
+        if is_first_chunk and item_size_to_add > available_space:
+            # Create empty chunk for prefix, then continue with normal chunking
+            new_bounds.append((start, start))
+            is_first_chunk = False
+            available_space = max_length
+            # Recalculate since we're now in a new chunk (first item, no newline needed)
+            item_size_to_add = item_width
+
+        if current_size + item_size_to_add > available_space:
+            # Current chunk is full, start new chunk
+            new_bounds.append((current_start, index))
+            current_start = index
+            current_size = 0
+            is_first_chunk = False
+            # Rest of the chunks may already be known from a previous run
+            if resume:
+                remaining = resume(index)
+                if remaining is not None:
+                    return new_bounds + remaining
+            # Recalculate since we're now in a new chunk (first item, no newline needed)
+            item_size_to_add = item_width
+
+        current_size += item_size_to_add
+
+    # Add the last chunk
+    if current_start < len(input_list):
+        new_bounds.append((current_start, len(input_list)))
+    return new_bounds
+
+def _apply_suffix_bounds(input_list: List[DapperRow], bounds: List[Tuple[int, int]],
+                         max_length: int, suffix: str = '') -> List[Tuple[int, int]]:
+    '''
+    Adjust last chunk bounds so the suffix fits on the last page
+    '''
+    new_bounds = list(bounds)
+    if not new_bounds or not suffix:
+        return new_bounds
+    suffix_width = string_width(suffix)
+    while True:
+        start, end = new_bounds[-1]
+        # Calculate total size including newlines between rows
+        last_chunk_size = sum(input_list[i].width for i in range(start, end))
+        if end - start > 1:
+            last_chunk_size += end - start - 1  # Add newlines between rows
+
+        if last_chunk_size + suffix_width <= max_length:
+            # Last chunk fits with suffix
+            break
+
+        # Need to move rows from last chunk
+        if end - start == 1:
+            # Single row doesn't fit with suffix - create empty chunk for suffix
+            new_bounds.append((end, end))
+            break
+
+        # Move last row to a new chunk
+        new_bounds[-1] = (start, end - 1)
+        new_bounds.append((end - 1, end))
+    return new_bounds
+
+def _chunk_list_by_length(input_list: List[DapperRow], max_length: int,
+                          prefix: str = '', suffix: str = '') -> List[List[DapperRow]]:
+    '''
+    Split list by length, accounting for prefix on first chunk, suffix on last chunk,
+    and enclosure on all chunks
+    '''
+    bounds = _chunk_bounds_by_length(input_list, max_length, prefix)
+    bounds = _apply_suffix_bounds(input_list, bounds, max_length, suffix)
+    return [input_list[start:end] for (start, end) in bounds]
+
+def _join_page(contents: List[str], collapse_newlines: bool = True) -> str:
+    '''
+    Join row contents into page content, collapsing double newlines if set
+    '''
+    combined = '\n'.join(contents)
+    if not collapse_newlines:
+        return combined
+    # Collapsing newlines and stripping them from the ends keeps only the non empty lines
+    return '\n'.join(line for line in combined.split('\n') if line)
+
+def _content_length(length_per_message: int, prefix: str = '', suffix: str = '',
+                    enclosure_start: str = '', enclosure_end: str = '') -> int:
+    '''
+    Length left for page content once enclosures are added, checking prefix and suffix fit
+    '''
+    # Make sure we take the enclosures into account
+    content_length = length_per_message - string_width(enclosure_start) - string_width(enclosure_end)
+    if content_length < 1:
+        raise DapperTableError(f'Invalid value for length per message: {length_per_message}')
+    # Validate prefix/suffix don't exceed pagination length
+    if string_width(prefix) > length_per_message:
+        raise DapperTableError(f'Prefix length ({string_width(prefix)}) exceeds pagination length ({length_per_message})')
+    if string_width(suffix) > length_per_message:
+        raise DapperTableError(f'Suffix length ({string_width(suffix)}) exceeds pagination length ({length_per_message})')
+    return content_length
+
+def _wrap_page(page_output: str, index: int, page_count: int, prefix: str = '', suffix: str = '',
+               enclosure_start: str = '', enclosure_end: str = '') -> str:
+    '''
+    Wrap page content with enclosure, prefix on first page and suffix on last page
+    '''
+    # Wrap content with enclosure
+    page_output = f'{enclosure_start}{page_output}{enclosure_end}'
+    # Add prefix to first page (before enclosure)
+    if index == 0 and prefix:
+        page_output = f'{prefix}{page_output}'
+    # Add suffix to last page (after enclosure)
+    if index == page_count - 1 and suffix:
+        page_output = f'{page_output}{suffix}'
+    return page_output
+
+def _page_width(row_list: List[DapperRow], index: int, page_count: int, prefix: str = '', suffix: str = '',
+                enclosure_start: str = '', enclosure_end: str = '') -> int:
+    '''
+    Display width of wrapped page, measured like pagination does: row widths, newlines
+    between rows, enclosure, prefix on first page and suffix on last page
+    '''
+    width = sum(string_width(row.content) for row in row_list) + max(0, len(row_list) - 1)
+    width += string_width(enclosure_start) + string_width(enclosure_end)
+    if index == 0:
+        width += string_width(prefix)
+    if index == page_count - 1:
+        width += string_width(suffix)
+    return width
+
+def _stream_page(writer: '_ChunkedWriter', row_list: List[DapperRow], collapse_newlines: bool = True) -> None:
+    '''
+    Write row contents as page content without joining them first, matches _join_page
+    '''
+    if not collapse_newlines:
+        for (count, row) in enumerate(row_list):
+            if count:
+                writer.write('\n')
+            writer.write(row.content)
+        return
+    # Collapsing newlines and stripping them from the ends keeps only the non empty lines
+    started = False
+    for row in row_list:
+        for line in row.content.split('\n'):
+            if not line:
+                continue
+            if started:
+                writer.write('\n')
+            writer.write(line)
+            started = True
+
+class _ChunkedWriter():
+    '''
+    Collect strings and write them to a file object in chunks
+    '''
+    def __init__(self, writer: TextIO | BinaryIO, buffer_size: int = 65536, encoding: str = 'utf-8'):
+        '''
+        writer          :   Text or binary file object to write to
+        buffer_size     :   Characters to collect before each write call
+        encoding        :   Encoding used for binary file objects
+        '''
+        self._writer = writer
+        self._buffer_size = buffer_size
+        self._encoding = encoding
+        self._binary = isinstance(writer, (RawIOBase, BufferedIOBase))
+        self._buffer = []
+        self._length = 0
+
+    def write(self, text: str) -> None:
+        '''
+        Add string, writes out once buffer size is reached
+        '''
+        if not text:
+            return
+        self._buffer.append(text)
+        self._length += len(text)
+        if self._length >= self._buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        '''
+        Write out collected strings
+        '''
+        if not self._buffer:
+            return
+        text = ''.join(self._buffer)
+        self._buffer = []
+        self._length = 0
+        if self._binary:
+            self._writer.write(text.encode(self._encoding))
+            return
+        self._writer.write(text)
+
+
+class _PagedRenderer(ABC):
+    '''
+    Shared pagination and rendering logic for anything that produces table rows
+    '''
+    def __init__(self, pagination_options: _PaginationBase = None, collapse_newlines: bool = True,
+                 prefix: str = '', suffix: str = '',
+                 enclosure_start: str = '', enclosure_end: str = '', stats: bool = False):
+        '''
+        Init pagination and page layout settings
+
+        pagination_options  :   Pagination settings
+        collapse_newlines   :   Collapse multiple newlines in messages
+        prefix              :   String to prepend to first page of output
+        suffix              :   String to append to last page of output
+        enclosure_start     :   String to wrap before table content on each page
+        enclosure_end       :   String to wrap after table content on each page
+        stats               :   Collect call counts and timings in stats attribute
+        '''
+        self.stats = TableStats() if stats else None
+        self.collapse_newlines = collapse_newlines
+        self._prefix = prefix
+        self._suffix = suffix
+        self._enclosure_start = enclosure_start
+        self._enclosure_end = enclosure_end
+        self._pagination_options = pagination_options
+
+        self._rows_per_message = None
+        self._length_per_message = None
+        if pagination_options:
+            if pagination_options.pagination_type == PaginationType.ROWS:
+                self._rows_per_message = pagination_options.rows_per_message
+                if pagination_options.rows_per_message and pagination_options.rows_per_message < 1:
+                    raise DapperTableError(f'Invalid value for rows per message: {pagination_options.rows_per_message}')
+            if pagination_options.pagination_type == PaginationType.LENGTH:
+                self._length_per_message = _content_length(pagination_options.length_per_message, prefix, suffix,
+                                                           enclosure_start, enclosure_end)
+
+        # Cached length page bounds, before suffix adjustment
+        self._page_bounds = None
+        # Raw row edits seen when bounds were cached
+        self._row_edits = _core.ROW_EDITS
+        # Range of rows changed since bounds were cached, and change in row count
+        self._dirty_start = None
+        self._dirty_end = None
+        self._dirty_delta = 0
+
+    @abstractmethod
+    def _page_rows(self) -> List[DapperRow]:
+        '''
+        All rows to paginate, including headers
+        '''
+
+    def _timed(self) -> bool:
+        '''
+        Check if phases should be timed, either for table stats or stats hooks
+        '''
+        return self.stats is not None or bool(_stats.STATS_HOOKS)
+
+    def _record(self, name: str, count: int, seconds: float) -> None:
+        '''
+        Record phase in table stats and pass it to stats hooks
+        '''
+        if self.stats is not None:
+            self.stats.record(name, count, seconds)
+        for hook in _stats.STATS_HOOKS:
+            hook(self, name, count, seconds)
+
+    def _invalidate_pages(self) -> None:
+        '''
+        Drop cached page bounds, next pagination starts from scratch
+        '''
+        self._page_bounds = None
+        self._dirty_start = None
+        self._dirty_end = None
+        self._dirty_delta = 0
+
+    def _rows_changed(self, start: int, end: int, delta: int) -> None:
+        '''
+        Track changed rows so pagination only redoes affected pages
+
+        start   :   First changed row, including headers
+        end     :   End of changed rows after the change
+        delta   :   Change in row count
+        '''
+        if self._page_bounds is None:
+            return
+        if self._dirty_start is None:
+            self._dirty_start, self._dirty_end, self._dirty_delta = start, end, delta
+            return
+        # Shift previous range end if the change happened before it
+        dirty_end = self._dirty_end
+        if dirty_end > start:
+            dirty_end += delta
+        self._dirty_start = min(self._dirty_start, start)
+        self._dirty_end = max(dirty_end, end)
+        self._dirty_delta += delta
+
+    def _length_page_bounds(self, all_rows: List[DapperRow]) -> List[Tuple[int, int]]:
+        '''
+        Get length page bounds, reusing cached bounds for pages before and after changed rows
+        '''
+        old_bounds = self._page_bounds
+        self._page_bounds = None
+        if self._row_edits != _core.ROW_EDITS:
+            # Rows edited directly may no longer fit their cached pages
+            old_bounds = None
+            self._row_edits = _core.ROW_EDITS
+        if not old_bounds:
+            bounds = _chunk_bounds_by_length(all_rows, self._length_per_message, self._prefix)
+        elif self._dirty_start is None:
+            bounds = old_bounds
+        else:
+            bounds = self._rechunk_bounds(all_rows, old_bounds)
+        self._page_bounds = bounds
+        self._dirty_start = None
+        self._dirty_end = None
+        self._dirty_delta = 0
+        return bounds
+
+    def _rechunk_bounds(self, all_rows: List[DapperRow], old_bounds: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        '''
+        Redo chunking starting at the page before the first changed row
+        '''
+        dirty_start, dirty_end, delta = self._dirty_start, self._dirty_end, self._dirty_delta
+        # Restart from last page starting before changed rows, the page before
+        # that could only change if its last row changed. Pages starting at the
+        # first row hold the prefix, so those restart from the beginning
+        restart = bisect_left(old_bounds, (dirty_start,)) - 1
+        if restart < 0 or old_bounds[restart][0] == 0:
+            restart = 0
+        old_starts = {bound[0]: count for (count, bound) in enumerate(old_bounds)}
+
+        def resume(index: int) -> List[Tuple[int, int]] | None:
+            # Past the changed rows, pages line up with old pages once a page starts at the same row
+            if index < dirty_end:
+                return None
+            old_index = old_starts.get(index - delta)
+            if old_index is None:
+                return None
+            return [(start + delta, end + delta) for (start, end) in old_bounds[old_index:]]
+
+        if restart == 0:
+            return _chunk_bounds_by_length(all_rows, self._length_per_message, self._prefix, resume=resume)
+        return old_bounds[:restart] + _chunk_bounds_by_length(all_rows, self._length_per_message,
+                                                               start=old_bounds[restart][0],
+                                                               is_first_chunk=False, resume=resume)
+
+    def _paginate(self, all_rows: List[DapperRow]) -> List[Tuple[int, int]]:
+        '''
+        Get (start, end) bounds of each page, requires pagination options
+        '''
+        timed = self._timed()
+        if timed:
+            start = perf_counter()
+        if self._rows_per_message:
+            bounds = _chunk_bounds(len(all_rows), self._rows_per_message)
+        else:
+            # Assume length per message
+            bounds = self._length_page_bounds(all_rows)
+            bounds = _apply_suffix_bounds(all_rows, bounds, self._length_per_message, self._suffix)
+        if timed:
+            self._record('paginate', len(bounds), perf_counter() - start)
+        return bounds
+
+    def get_pages(self) -> List[DapperRow]:
+        '''
+        Return list of rows based on pagination options
+        '''
+        # If no pagination options, return raw list
+        all_rows = self._page_rows()
+        if not (self._rows_per_message or self._length_per_message):
+            return all_rows
+        return [all_rows[start:end] for (start, end) in self._paginate(all_rows)]
+
+    def _page_lists(self) -> List[List[DapperRow]]:
+        '''
+        Rows of each page, a single page if no pagination is set
+        '''
+        if not (self._rows_per_message or self._length_per_message):
+            return [self._page_rows()]
+        return self.get_pages()
+
+    def _cached_page(self, key: tuple) -> str | None:
+        '''
+        Look up page output in the shared page cache
+        '''
+        output = _cache.PAGE_CACHE.get(key)
+        if self._timed():
+            self._record('page_cache_miss' if output is None else 'page_cache_hit', 1, 0.0)
+        return output
+
+    def format_page(self, row_list: List[DapperRow]) -> str:
+        '''
+        Join a list of DapperRow objects into a formatted string,
+        collapsing double newlines if set.
+        '''
+        contents = [i.content for i in row_list]
+        cache = _cache.PAGE_CACHE
+        if cache is None:
+            return self._join_contents(contents)
+        key = (tuple(contents), self.collapse_newlines)
+        output = self._cached_page(key)
+        if output is None:
+            output = self._join_contents(contents)
+            cache.put(key, output)
+        return output
+
+    def _join_contents(self, contents: List[str]) -> str:
+        '''
+        Join row contents into page content, timed as format_page
+        '''
+        if not self._timed():
+            return _join_page(contents, self.collapse_newlines)
+        start = perf_counter()
+        output = _join_page(contents, self.collapse_newlines)
+        self._record('format_page', 1, perf_counter() - start)
+        return output
+
+    def _render_page(self, row_list: List[DapperRow], index: int, page_count: int) -> str:
+        '''
+        Format page and wrap it with enclosure, prefix and suffix
+        '''
+        cache = _cache.PAGE_CACHE
+        if cache is None:
+            return _wrap_page(self.format_page(row_list), index, page_count, self._prefix, self._suffix,
+                              self._enclosure_start, self._enclosure_end)
+        # Prefix and suffix only change the output of the first and last page
+        contents = tuple(i.content for i in row_list)
+        key = (contents, self.collapse_newlines,
+               self._prefix if index == 0 else '', self._suffix if index == page_count - 1 else '',
+               self._enclosure_start, self._enclosure_end)
+        output = self._cached_page(key)
+        if output is None:
+            # Only the wrapped page is cached, so each render is one cache lookup
+            output = _wrap_page(self._join_contents(contents), index, page_count, self._prefix, self._suffix,
+                                self._enclosure_start, self._enclosure_end)
+            cache.put(key, output)
+        return output
+
+    def render(self) -> List[str] | str:
+        '''
+        Render table output. Returns a string if no pagination is set,
+        or a list of strings if paginated.
+        '''
+        # If no pagination options given
+        if not (self._rows_per_message or self._length_per_message):
+            return self._render_page(self._page_rows(), 0, 1)
+
+        split_rows = self.get_pages()
+        return [self._render_page(sr, i, len(split_rows)) for i, sr in enumerate(split_rows)]
+
+    @property
+    def page_count(self) -> int:
+        '''
+        Number of pages, a table without pagination has one
+        '''
+        return len(self._page_lists())
+
+    def render_page(self, index: int) -> str:
+        '''
+        Render single page, matches the same page of render()
+
+        index   :   Index of page
+        '''
+        pages = self._page_lists()
+        if not 0 <= index < len(pages):
+            raise DapperTableError(f'Invalid page index given {index}')
+        return self._render_page(pages[index], index, len(pages))
+
+    def _render_at_length(self, length_per_message: int) -> List[Tuple[str, int]]:
+        '''
+        Render pages paginated by another length, keeping prefix, suffix and enclosure,
+        returns each page with its display width
+        '''
+        max_length = _content_length(length_per_message, self._prefix, self._suffix,
+                                     self._enclosure_start, self._enclosure_end)
+        all_rows = self._page_rows()
+        bounds = _chunk_bounds_by_length(all_rows, max_length, self._prefix)
+        bounds = _apply_suffix_bounds(all_rows, bounds, max_length, self._suffix)
+        return [(self._render_page(all_rows[start:end], index, len(bounds)),
+                 _page_width(all_rows[start:end], index, len(bounds), self._prefix, self._suffix,
+                             self._enclosure_start, self._enclosure_end))
+                for (index, (start, end)) in enumerate(bounds)]
+
+    def render_to(self, writer: TextIO | BinaryIO, page_delimiter: str = '\n',
+                  buffer_size: int = 65536, encoding: str = 'utf-8') -> int:
+        '''
+        Write rendered output to a text or binary file object, rows are written one at a time
+        without building page strings. Output matches page_delimiter.join(render()), or render() if no pagination is set.
+
+        writer          :   Text or binary file object to write to
+        page_delimiter  :   String written between pages
+        buffer_size     :   Characters to collect before each write call
+        encoding        :   Encoding used for binary file objects
+
+        returns: number of pages written
+        '''
+        output = _ChunkedWriter(writer, buffer_size, encoding)
+        all_rows = self._page_rows()
+        # If no pagination options given, stream rows directly
+        if not (self._rows_per_message or self._length_per_message):
+            output.write(f'{self._prefix}{self._enclosure_start}')
+            _stream_page(output, all_rows, self.collapse_newlines)
+            output.write(f'{self._enclosure_end}{self._suffix}')
+            output.flush()
+            return 1
+
+        bounds = self._paginate(all_rows)
+        for i, (start, end) in enumerate(bounds):
+            if i:
+                output.write(page_delimiter)
+            # Same wrapping as _wrap_page, with the rows of the page streamed in between
+            if i == 0:
+                output.write(self._prefix)
+            output.write(self._enclosure_start)
+            _stream_page(output, all_rows[start:end], self.collapse_newlines)
+            output.write(self._enclosure_end)
+            if i == len(bounds) - 1:
+                output.write(self._suffix)
+        output.flush()
+        return len(bounds)
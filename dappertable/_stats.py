@@ -0,0 +1,96 @@
+'''
+Phase timing and memory usage of tables
+'''
+from dataclasses import dataclass, field
+from sys import getsizeof
+from typing import Callable, Dict
+
+from dappertable._core import DapperTableError
+
+@dataclass
+class TableStats:
+    '''
+    Call counts and time spent per phase, collected when stats are enabled on a table
+    '''
+    counts: Dict[str, int] = field(default_factory=dict)
+    seconds: Dict[str, float] = field(default_factory=dict)
+
+    def record(self, name: str, count: int = 1, seconds: float = 0.0) -> None:
+        '''
+        Add count and time to phase
+
+        name    :   Phase name
+        count   :   Number of calls or items handled
+        seconds :   Time spent
+        '''
+        self.counts[name] = self.counts.get(name, 0) + count
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def reset(self) -> None:
+        '''
+        Clear all counts and times
+        '''
+        self.counts.clear()
+        self.seconds.clear()
+
+@dataclass
+class MemoryUsage:
+    '''
+    Approximate bytes used by each part of a table
+    '''
+    content: int = 0
+    input_values: int = 0
+    segments: int = 0
+    rows: int = 0
+    headers: int = 0
+    caches: int = 0
+    pagination: int = 0
+
+    @property
+    def total(self) -> int:
+        '''
+        Bytes used by all parts
+        '''
+        return self.content + self.input_values + self.segments + self.rows + self.headers + self.caches + self.pagination
+
+def _deep_sizeof(value: object, seen: set, recurse: bool = True) -> int:
+    '''
+    Size of object and the lists, tuples and dicts it holds, skipping objects already counted
+
+    value   :   Object to measure
+    seen    :   Ids of objects already counted, updated in place
+    recurse :   Include items of containers
+    '''
+    if value is None or id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = getsizeof(value)
+    if not recurse:
+        return size
+    if isinstance(value, (list, tuple)):
+        size += sum(_deep_sizeof(item, seen) for item in value)
+    elif isinstance(value, dict):
+        size += sum(_deep_sizeof(key, seen) + _deep_sizeof(item, seen) for (key, item) in value.items())
+    return size
+
+# Called for every recorded phase of every table
+STATS_HOOKS = []
+
+def add_stats_hook(hook: Callable[[object, str, int, float], None]) -> None:
+    '''
+    Add hook called with (table, phase name, count, seconds) for every recorded phase of every table
+
+    hook    :   Function to call
+    '''
+    STATS_HOOKS.append(hook)
+
+def remove_stats_hook(hook: Callable[[object, str, int, float], None]) -> None:
+    '''
+    Remove hook added with add_stats_hook
+
+    hook    :   Function to remove
+    '''
+    try:
+        STATS_HOOKS.remove(hook)
+    except ValueError as exc:
+        raise DapperTableError('Stats hook was not added') from exc
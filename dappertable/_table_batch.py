@@ -0,0 +1,114 @@
+'''
+Batched row changes of a table
+'''
+from typing import TYPE_CHECKING, List
+
+from dappertable._core import DapperTableError
+
+if TYPE_CHECKING:
+    from dappertable import DapperTable
+
+class DapperTableBatch():
+    '''
+    Row changes queued against a table, applied together on commit
+
+    Indexes refer to the table as it will be after the changes queued before them.
+    Changes are validated when queued and dropped if the context exits with an error.
+    '''
+    def __init__(self, table: 'DapperTable'):
+        '''
+        Init a batch
+
+        table   :   Table to change
+        '''
+        self._table = table
+        self._operations = []
+        # Table size when the batch started, and after queued changes
+        self._table_size = len(table)
+        self._size = self._table_size
+        self.changed_pages = []
+
+    def _get_index(self, index: int, message: str, allow_end: bool = False) -> int:
+        '''
+        Validate row index against table size after queued changes
+        '''
+        if index < 0:
+            raise DapperTableError('Index must be positive number')
+        index = int(index)
+        if index > self._size or (index == self._size and not allow_end):
+            raise DapperTableError(f'{message} {index}')
+        return index
+
+    def add_row(self, row: List[str] | str) -> int:
+        '''
+        Queue row to add at the end of the table
+
+        row     :   List of items to go in row, assumes each item list is string representation
+
+        returns: index of new row
+        '''
+        return self.insert_row(self._size, row)
+
+    def insert_row(self, index: int, row: List[str] | str) -> int:
+        '''
+        Queue row to insert, rows at and after the index move down
+
+        index   :   Index to place row at, can be the table size to add at the end
+        row     :   List of items to go in row, assumes each item list is string representation
+
+        returns: index of new row
+        '''
+        index = self._get_index(index, 'Invalid insert index given', allow_end=True)
+        self._table._validate_row(row) # pylint: disable=protected-access
+        self._operations.append(('insert', index, row))
+        self._size += 1
+        return index
+
+    def edit_row(self, index: int, row: List[str] | str) -> bool:
+        '''
+        Queue row contents update
+
+        index   :   Index of row to update
+        row     :   List of items to go in row, assumes each item list is string representation
+        '''
+        index = self._get_index(index, 'Invalid edit index given')
+        self._table._validate_row(row) # pylint: disable=protected-access
+        self._operations.append(('edit', index, row))
+        return True
+
+    def remove_row(self, index: int) -> bool:
+        '''
+        Queue row removal
+
+        index   :   Index of row, cannot remove headers
+        '''
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise DapperTableError('Invalid deletion index')
+        self._operations.append(('remove', index, None))
+        self._size -= 1
+        return True
+
+    def commit(self) -> List[int]:
+        '''
+        Apply queued changes, zero padding and pagination are updated once
+
+        returns: indexes of pages with changed output, also kept in changed_pages
+        '''
+        if len(self._table) != self._table_size:
+            raise DapperTableError('Table was changed outside of batch')
+        self.changed_pages = self._table._apply_batch(self._operations) # pylint: disable=protected-access
+        self._operations = []
+        self._table_size = self._size
+        return self.changed_pages
+
+    def __enter__(self) -> 'DapperTableBatch':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self._operations = []
+            self._size = self._table_size
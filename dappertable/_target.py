@@ -0,0 +1,49 @@
+'''
+Pagination targets of a table
+'''
+from typing import TYPE_CHECKING, List
+
+from dappertable._core import DapperRow, PaginationTarget
+from dappertable._render import _PagedRenderer
+
+if TYPE_CHECKING:
+    from dappertable import DapperTable
+
+class DapperTableTarget(_PagedRenderer):
+    '''
+    Pagination target of a DapperTable
+
+    Targets paginate the formatted rows of the table with their own pagination,
+    prefix, suffix and enclosure. Rows and widths are shared with the table, and
+    cached page bounds are updated for the rows the table changes.
+    '''
+    def __init__(self, table: 'DapperTable', target: PaginationTarget):
+        '''
+        Init pagination target, created by the table
+
+        table   :   Table to paginate
+        target  :   Pagination and page layout settings
+        '''
+        super().__init__(pagination_options=target.pagination_options, collapse_newlines=table.collapse_newlines,
+                         prefix=target.prefix, suffix=target.suffix,
+                         enclosure_start=target.enclosure_start, enclosure_end=target.enclosure_end)
+        self._table = table
+        self.target = target
+        # Phases are recorded in the stats of the table
+        self.stats = table.stats
+
+    def _page_rows(self) -> List[DapperRow]:
+        '''
+        All rows to paginate, including headers
+        '''
+        return self._table._page_rows() # pylint: disable=protected-access
+
+    @property
+    def size(self) -> int:
+        '''
+        Return size of table (does not include headers)
+        '''
+        return len(self._table)
+
+    def __len__(self) -> int:
+        return len(self._table)
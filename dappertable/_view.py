@@ -0,0 +1,152 @@
+'''
+Sorted and filtered views of a table
+'''
+from bisect import bisect_left, bisect_right
+from typing import TYPE_CHECKING, Callable, List
+
+from dappertable._core import DapperTableError, DapperRow, _PaginationBase
+from dappertable._render import _PagedRenderer
+
+if TYPE_CHECKING:
+    from dappertable import DapperTable
+
+class DapperTableView(_PagedRenderer):
+    '''
+    Sorted and/or filtered view over an existing DapperTable
+
+    Views reference the formatted rows of the base table through an index list,
+    so no row is formatted again when sorting or filtering. The view follows
+    changes made to the base table.
+    '''
+    def __init__(self, table: 'DapperTable',
+                 sort_key: Callable[[List[str] | str], object] = None,
+                 row_filter: Callable[[List[str] | str], bool] = None,
+                 pagination_options: _PaginationBase = None, collapse_newlines: bool = True,
+                 prefix: str = '', suffix: str = '',
+                 enclosure_start: str = '', enclosure_end: str = '', stats: bool = False):
+        '''
+        Init a view of a dapper table
+
+        table               :   Base table to view
+        sort_key            :   Called with the row input values, rows are ordered by the result
+        row_filter          :   Called with the row input values, rows are only shown if result is true
+        pagination_options  :   Pagination settings for the view
+        collapse_newlines   :   Collapse multiple newlines in messages
+        prefix              :   String to prepend to first page of output
+        suffix              :   String to append to last page of output
+        enclosure_start     :   String to wrap before table content on each page
+        enclosure_end       :   String to wrap after table content on each page
+        stats               :   Collect call counts and timings in stats attribute
+        '''
+        super().__init__(pagination_options=pagination_options, collapse_newlines=collapse_newlines,
+                         prefix=prefix, suffix=suffix,
+                         enclosure_start=enclosure_start, enclosure_end=enclosure_end, stats=stats)
+        if (sort_key or row_filter) and not table._retain_input_values: # pylint: disable=protected-access
+            raise DapperTableError('Sorted and filtered views require retained input values')
+        self._table = table
+        self._sort_key = sort_key
+        self._row_filter = row_filter
+        # Base table row indexes in view order, along with their sort keys
+        self._indexes = [i for i in range(len(table._rows)) if self._include(i)] # pylint: disable=protected-access
+        self._keys = []
+        if self._sort_key:
+            self._indexes.sort(key=self._row_key)
+            self._keys = [self._row_key(i) for i in self._indexes]
+        table._views.add(self) # pylint: disable=protected-access
+
+    def _input_values(self, index: int) -> List[str] | str:
+        '''
+        Input values for base table row
+        '''
+        return self._table._rows[index].input_values # pylint: disable=protected-access
+
+    def _include(self, index: int) -> bool:
+        '''
+        Check if base table row passes the view filter
+        '''
+        if self._row_filter is None:
+            return True
+        return bool(self._row_filter(self._input_values(index)))
+
+    def _row_key(self, index: int) -> object:
+        '''
+        Sort key for base table row
+        '''
+        return self._sort_key(self._input_values(index))
+
+    def _insert_index(self, index: int) -> None:
+        '''
+        Place base table row index into the view, ties keep base table order
+        '''
+        if not self._sort_key:
+            position = bisect_left(self._indexes, index)
+        else:
+            key = self._row_key(index)
+            low = bisect_left(self._keys, key)
+            high = bisect_right(self._keys, key, low)
+            position = bisect_left(self._indexes, index, low, high)
+            self._keys.insert(position, key)
+        self._indexes.insert(position, index)
+        header_count = len(self._table._header_rows) # pylint: disable=protected-access
+        self._rows_changed(header_count + position, header_count + position + 1, 1)
+
+    def _discard_index(self, index: int) -> None:
+        '''
+        Remove base table row index from the view if present
+        '''
+        try:
+            position = self._indexes.index(index)
+        except ValueError:
+            return
+        del self._indexes[position]
+        if self._sort_key:
+            del self._keys[position]
+        header_count = len(self._table._header_rows) # pylint: disable=protected-access
+        self._rows_changed(header_count + position, header_count + position, -1)
+
+    def _row_inserted(self, index: int) -> None:
+        '''
+        Base table inserted a row at index
+        '''
+        self._indexes = [i + 1 if i >= index else i for i in self._indexes]
+        if self._include(index):
+            self._insert_index(index)
+
+    def _row_edited(self, index: int) -> None:
+        '''
+        Base table edited the row at index
+        '''
+        self._discard_index(index)
+        if self._include(index):
+            self._insert_index(index)
+
+    def _row_removed(self, index: int) -> None:
+        '''
+        Base table removed the row at index
+        '''
+        self._discard_index(index)
+        self._indexes = [i - 1 if i > index else i for i in self._indexes]
+
+    def _page_rows(self) -> List[DapperRow]:
+        '''
+        All rows to paginate, including headers
+        '''
+        rows = self._table._rows # pylint: disable=protected-access
+        return self._table._header_rows + [rows[i] for i in self._indexes] # pylint: disable=protected-access
+
+    @property
+    def indexes(self) -> List[int]:
+        '''
+        Base table row indexes, in view order
+        '''
+        return list(self._indexes)
+
+    @property
+    def size(self) -> int:
+        '''
+        Return size of view (does not include headers)
+        '''
+        return len(self._indexes)
+
+    def __len__(self) -> int:
+        return len(self._indexes)
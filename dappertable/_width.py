@@ -0,0 +1,131 @@
+'''
+Code point width lookup
+
+Display width and East Asian wide class of each code point are stored together,
+one byte per code point. The BMP is split into 256 blocks of 256 code points,
+each block is built from wcwidth and unicodedata the first time a code point
+in it is measured. Code points above the BMP are cached one at a time.
+
+Characters that wcwidth measures depending on their neighbours, such as
+zero width joiners, variation selectors, combining marks, regional indicators
+and skin tone modifiers, along with non-printable characters, are marked as
+complex. Strings holding them need to be measured with wcswidth.
+'''
+from functools import cache
+from typing import Tuple
+
+# Low two bits hold display width, 0 if complex
+WIDTH_MASK = 0b011
+# Set for East Asian wide (W) characters
+WIDE_FLAG = 0b100
+
+# Regional indicators and skin tone modifiers, measured as pairs by wcswidth
+_PAIRED_RANGES = ((0x1F1E6, 0x1F1FF), (0x1F3FB, 0x1F3FF))
+
+_BLOCKS = [None] * 256
+_ASTRAL = {}
+
+
+@cache
+def wcwidth_module():
+    '''
+    Import wcwidth on first use, most ascii only text never needs it
+    '''
+    import wcwidth # pylint: disable=import-outside-toplevel
+    return wcwidth
+
+
+@cache
+def unicodedata_module():
+    '''
+    Import unicodedata on first use, ascii only text never needs it
+    '''
+    import unicodedata # pylint: disable=import-outside-toplevel
+    return unicodedata
+
+
+def char_value(code: int) -> int:
+    '''
+    Get width and wide flag of code point
+
+    code    :   Code point
+    '''
+    char = chr(code)
+    value = WIDE_FLAG if unicodedata_module().east_asian_width(char) == 'W' else 0
+    for (start, end) in _PAIRED_RANGES:
+        if start <= code <= end:
+            return value
+    width = wcwidth_module().wcwidth(char)
+    if width in (1, 2):
+        value |= width
+    return value
+
+
+def block_values(index: int) -> bytes:
+    '''
+    Get lookup block for BMP code points index * 256 to index * 256 + 255
+    '''
+    block = _BLOCKS[index]
+    if block is None:
+        block = bytes(char_value(code) for code in range(index << 8, (index + 1) << 8))
+        _BLOCKS[index] = block
+    return block
+
+
+def astral_value(code: int) -> int:
+    '''
+    Get lookup value for code point above the BMP
+    '''
+    value = _ASTRAL.get(code)
+    if value is None:
+        value = char_value(code)
+        _ASTRAL[code] = value
+    return value
+
+
+def measure(text: str) -> Tuple[int | None, int]:
+    '''
+    Measure display width and wide character count in one pass
+
+    text    :   String to measure
+
+    returns: display width or None if text has complex characters, and count of wide characters
+    '''
+    blocks = _BLOCKS
+    width = 0
+    wide = 0
+    simple = True
+    for char in text:
+        code = ord(char)
+        if code < 0x10000:
+            block = blocks[code >> 8] or block_values(code >> 8)
+            value = block[code & 0xFF]
+        else:
+            value = astral_value(code)
+        if value & WIDTH_MASK:
+            width += value & WIDTH_MASK
+        else:
+            simple = False
+        if value & WIDE_FLAG:
+            wide += 1
+    return (width if simple else None), wide
+
+
+def cut_index(text: str, max_width: int) -> int:
+    '''
+    Get length of longest prefix that fits in max width, text must not have complex characters
+
+    text        :   String to cut
+    max_width   :   Display width to fit in
+    '''
+    width = 0
+    for (index, char) in enumerate(text):
+        code = ord(char)
+        if code < 0x10000:
+            value = (_BLOCKS[code >> 8] or block_values(code >> 8))[code & 0xFF]
+        else:
+            value = astral_value(code)
+        width += value & WIDTH_MASK
+        if width > max_width:
+            return index
+    return len(text)
@@ -0,0 +1,102 @@
+'''
+Live terminal rendering of tables
+
+LiveRenderer keeps the last frame written to a text stream, and on refresh
+only redraws the lines that changed using ANSI cursor movement. Nothing is
+written if the frame did not change.
+
+The cursor is kept at the start of the line below the frame between refreshes,
+so nothing else should write to the stream while the renderer is in use.
+Lines wider than the terminal wrap and frames taller than the terminal scroll,
+either breaks cursor movement, call reset() to draw the next frame in full.
+'''
+import sys
+from typing import List, TextIO
+
+from dappertable._render import _PagedRenderer
+
+# Move cursor to start of line, n lines up or down
+CURSOR_UP = '\x1b[{}F'
+CURSOR_DOWN = '\x1b[{}E'
+# Clear whole line, and everything from the cursor to the end of the screen
+CLEAR_LINE = '\x1b[2K'
+CLEAR_BELOW = '\x1b[J'
+
+
+def frame_update(old_lines: List[str], new_lines: List[str]) -> str:
+    '''
+    Get output that turns the old frame into the new frame, cursor starts and ends
+    at the start of the line below the frame
+
+    old_lines   :   Lines currently on screen
+    new_lines   :   Lines to show
+    '''
+    output = []
+    # Row the cursor is on, the line below the old frame
+    row = len(old_lines)
+    for (index, line) in enumerate(new_lines[:len(old_lines)]):
+        if line == old_lines[index]:
+            continue
+        output.append(CURSOR_UP.format(row - index) if index < row else CURSOR_DOWN.format(index - row))
+        output.append(f'{CLEAR_LINE}{line}')
+        row = index
+    target = min(len(old_lines), len(new_lines))
+    if row != target:
+        output.append(CURSOR_DOWN.format(target - row) if target > row else CURSOR_UP.format(row - target))
+    if len(new_lines) < len(old_lines):
+        output.append(CLEAR_BELOW)
+    # Lines past the old frame are written out, newlines scroll the screen if needed
+    for line in new_lines[len(old_lines):]:
+        output.append(f'{CLEAR_LINE}{line}\n')
+    return ''.join(output)
+
+
+class LiveRenderer():
+    '''
+    Redraw a table on a terminal, writing only lines that changed since the last refresh
+    '''
+    def __init__(self, table: _PagedRenderer, stream: TextIO = None, page_delimiter: str = '\n'):
+        '''
+        Init live renderer
+
+        table           :   Table or view to render
+        stream          :   Text stream to write to, defaults to stdout
+        page_delimiter  :   String placed between pages of paginated tables
+        '''
+        self._table = table
+        self._stream = stream if stream is not None else sys.stdout
+        self._page_delimiter = page_delimiter
+        self._lines = None
+
+    def _frame_lines(self) -> List[str]:
+        '''
+        Lines of the current table output
+        '''
+        output = self._table.render()
+        if isinstance(output, list):
+            output = self._page_delimiter.join(output)
+        return output.split('\n')
+
+    def refresh(self) -> int:
+        '''
+        Write changes since the last refresh, the first refresh writes the whole frame
+
+        returns: number of characters written
+        '''
+        lines = self._frame_lines()
+        if self._lines is None:
+            output = ''.join(f'{line}\n' for line in lines)
+        elif lines == self._lines:
+            return 0
+        else:
+            output = frame_update(self._lines, lines)
+        self._lines = lines
+        self._stream.write(output)
+        self._stream.flush()
+        return len(output)
+
+    def reset(self) -> None:
+        '''
+        Forget the last frame, the next refresh writes the whole frame below the cursor
+        '''
+        self._lines = None
@@ -0,0 +1,653 @@
+'''
+Local render service holding tables in memory
+
+RenderServer keeps named tables in a long running process, listening on a Unix
+socket or a localhost TCP port. Short lived processes use RenderClient to change
+rows and render pages without building the table again, RemoteTable mirrors the
+DapperTable methods.
+
+Wire format, every request and response is one frame:
+
+    header length (u32) | payload length (u32) | header (json) | payload
+
+Integers are big endian. Headers hold the request or the result, payloads carry
+table snapshots when whole tables are sent. Each table has a version that is
+bumped whenever its output changes, clients pass a version back to learn which
+pages changed since.
+'''
+import json
+import os
+import socket
+import socketserver
+from collections import deque
+from dataclasses import dataclass, field
+from struct import Struct
+from threading import Lock, Thread
+from typing import BinaryIO, List, Tuple
+
+from dappertable import DapperTable, DapperTableError, _changed_pages
+from dappertable.snapshot import dumps, loads
+
+_FRAME = Struct('>II')
+# Largest header or payload accepted
+MAX_FRAME_SIZE = 1 << 28
+# Row changes that can be queued in a table batch, others are applied directly
+_BATCH_ACTIONS = ('add_row', 'insert_row', 'edit_row', 'remove_row')
+_DIRECT_ACTIONS = ('add_rows', 'update_cell', 'update_column', 'move_row')
+
+
+def _write_frame(writer: BinaryIO, header: dict, payload: bytes = b'') -> None:
+    '''
+    Write one frame
+    '''
+    header = json.dumps(header, separators=(',', ':'), default=str).encode('utf-8')
+    writer.write(_FRAME.pack(len(header), len(payload)) + header + payload)
+
+
+def _read_frame(reader: BinaryIO) -> Tuple[dict, bytes] | None:
+    '''
+    Read one frame, None if the connection was closed
+    '''
+    lengths = reader.read(_FRAME.size)
+    if len(lengths) < _FRAME.size:
+        return None
+    header_length, payload_length = _FRAME.unpack(lengths)
+    if header_length > MAX_FRAME_SIZE or payload_length > MAX_FRAME_SIZE:
+        raise DapperTableError('Frame larger than maximum frame size')
+    header = reader.read(header_length)
+    payload = reader.read(payload_length)
+    if len(header) < header_length or len(payload) < payload_length:
+        return None
+    return json.loads(header.decode('utf-8')), payload
+
+
+@dataclass
+class _HostedTable:
+    '''
+    Table held by the server, with the pages changed by recent versions
+    '''
+    table: DapperTable
+    version: int = 0
+    history: deque = field(default_factory=deque)
+
+    def record(self, changed: List[int]) -> None:
+        '''
+        Bump version for changed pages
+        '''
+        self.version += 1
+        self.history.append((self.version, changed))
+
+    def changed_since(self, since: int) -> List[int]:
+        '''
+        Pages changed after version, every page if the version is no longer in the history
+        '''
+        if since == self.version:
+            return []
+        if since > self.version or not self.history or since < self.history[0][0] - 1:
+            return list(range(self.table.page_count))
+        pages = set()
+        for (version, changed) in self.history:
+            if version > since:
+                pages.update(changed)
+        page_count = self.table.page_count
+        return sorted(page for page in pages if page < page_count)
+
+
+def _page_lists(table: DapperTable) -> List[list] | None:
+    '''
+    Rows of every page, None if rows are too long to paginate
+    '''
+    try:
+        return table._page_lists() # pylint: disable=protected-access
+    except DapperTableError:
+        return None
+
+
+def _apply_operations(table: DapperTable, operations: List[list], results: list) -> None:
+    '''
+    Apply row changes in order, consecutive batch actions are applied as one batch.
+    Results of applied changes are added to results, also if a later change fails.
+    '''
+    index = 0
+    while index < len(operations):
+        action, *args = operations[index]
+        if action in _DIRECT_ACTIONS:
+            results.append(getattr(table, action)(*args))
+            index += 1
+            continue
+        if action not in _BATCH_ACTIONS:
+            raise DapperTableError(f'Unknown row operation {action}')
+        batch = table.batch()
+        queued = []
+        while index < len(operations) and operations[index][0] in _BATCH_ACTIONS:
+            action, *args = operations[index]
+            queued.append(getattr(batch, action)(*args))
+            index += 1
+        try:
+            batch.commit()
+        finally:
+            # Rows are applied before the changed pages are found, which can fail
+            results.extend(queued)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    '''
+    Answer frames on one connection until the client disconnects
+    '''
+    def handle(self):
+        try:
+            while True:
+                try:
+                    frame = _read_frame(self.rfile)
+                except DapperTableError as exc:
+                    # Rest of the frame was not read, the connection cannot go on
+                    _write_frame(self.wfile, {'error': str(exc)})
+                    return
+                except ValueError as exc:
+                    # Header was read whole but is not valid json
+                    _write_frame(self.wfile, {'error': f'Invalid request: {exc!r}'})
+                    continue
+                if frame is None:
+                    return
+                _write_frame(self.wfile, *self.server.render_server.dispatch(*frame))
+        except ConnectionError:
+            # Client went away while the response was written
+            return
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class RenderServer():
+    '''
+    Serve named tables to RenderClient connections
+    '''
+    def __init__(self, address: str | Tuple[str, int], history: int = 256):
+        '''
+        Init render server, starts listening right away
+
+        address :   Path of Unix socket, or (host, port) to listen on, port 0 picks a free port
+        history :   Versions to keep changed pages for, older versions report every page as changed
+        '''
+        server_class = _UnixServer if isinstance(address, str) else _TCPServer
+        self._server = server_class(address, _Handler)
+        self._server.render_server = self
+        self._tables = {}
+        self._history = history
+        self._lock = Lock()
+        self._thread = None
+
+    @property
+    def address(self) -> str | Tuple[str, int]:
+        '''
+        Address clients connect to
+        '''
+        return self._server.server_address
+
+    def serve_forever(self) -> None:
+        '''
+        Handle requests until close() is called from another thread
+        '''
+        self._server.serve_forever()
+
+    def start(self) -> 'RenderServer':
+        '''
+        Handle requests in a background thread
+        '''
+        self._thread = Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        '''
+        Stop handling requests and close the listening socket
+        '''
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+        if isinstance(self.address, str):
+            os.remove(self.address)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        self.close()
+
+    def _hosted(self, name: str) -> _HostedTable:
+        '''
+        Get table by name
+        '''
+        try:
+            return self._tables[name]
+        except KeyError as exc:
+            raise DapperTableError(f'Unknown table {name}') from exc
+
+    def _put(self, name: str, payload: bytes) -> _HostedTable:
+        '''
+        Add or replace table from snapshot payload
+        '''
+        old = self._tables.get(name)
+        hosted = _HostedTable(loads(payload), history=deque(maxlen=self._history))
+        if old is not None:
+            # Versions keep going up, clients holding old versions get every page
+            hosted.version = old.version + 1
+        self._tables[name] = hosted
+        return hosted
+
+    def _mutate(self, hosted: _HostedTable, operations: List[list]) -> Tuple[list, List[int]]:
+        '''
+        Apply row changes and bump version if output changed
+        '''
+        table = hosted.table
+        old_pages = _page_lists(table)
+        results = []
+        changed = []
+        try:
+            _apply_operations(table, operations, results)
+        finally:
+            # Changes applied before a failing operation are kept
+            if results:
+                new_pages = _page_lists(table)
+                # Pages of a table that could not be paginated before all changed
+                if new_pages is not None:
+                    changed = _changed_pages(old_pages or [], new_pages)
+                hosted.record(changed)
+        return results, changed
+
+    def _handle(self, request: dict, payload: bytes) -> Tuple[dict, bytes]:
+        # pylint: disable=too-many-return-statements
+        '''
+        Handle request while holding the lock
+        '''
+        op = request.get('op')
+        if op == 'names':
+            return {'result': sorted(self._tables)}, b''
+        if op == 'put':
+            hosted = self._put(request['table'], payload)
+            return {'result': True, 'version': hosted.version}, b''
+        hosted = self._hosted(request.get('table'))
+        table = hosted.table
+        if op == 'drop':
+            del self._tables[request['table']]
+            return {'result': True}, b''
+        if op == 'get':
+            return {'version': hosted.version}, dumps(table)
+        if op == 'mutate':
+            results, changed = self._mutate(hosted, request['operations'])
+            return {'result': results, 'changed_pages': changed, 'version': hosted.version}, b''
+        if op == 'render':
+            return {'result': table.render(), 'version': hosted.version}, b''
+        if op == 'render_page':
+            return {'result': table.render_page(request['index']), 'version': hosted.version}, b''
+        if op == 'page_count':
+            return {'result': table.page_count, 'version': hosted.version}, b''
+        if op == 'size':
+            return {'result': len(table), 'version': hosted.version}, b''
+        if op == 'changed_pages':
+            return {'result': hosted.changed_since(request['since']), 'version': hosted.version}, b''
+        raise DapperTableError(f'Unknown request {op}')
+
+    def dispatch(self, request: dict, payload: bytes) -> Tuple[dict, bytes]:
+        '''
+        Answer one request, errors are sent back to the client
+
+        request :   Request header
+        payload :   Request payload
+
+        returns: response header and payload
+        '''
+        if not isinstance(request, dict):
+            return {'error': 'Invalid request: header must be a json object'}, b''
+        with self._lock:
+            try:
+                return self._handle(request, payload)
+            except (DapperTableError, KeyError, TypeError, ValueError) as exc:
+                return {'error': str(exc) if isinstance(exc, DapperTableError) else f'Invalid request: {exc!r}'}, b''
+
+
+class RenderClient():
+    '''
+    Connection to a RenderServer
+    '''
+    def __init__(self, address: str | Tuple[str, int], timeout: float = None):
+        '''
+        Init render client, connects right away
+
+        address :   Path of Unix socket, or (host, port) of server
+        timeout :   Socket timeout in seconds
+        '''
+        if isinstance(address, str):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            self._socket.connect(address)
+        else:
+            self._socket = socket.create_connection(address, timeout=timeout)
+        self._reader = self._socket.makefile('rb')
+        self._writer = self._socket.makefile('wb')
+        self._lock = Lock()
+
+    def _request(self, request: dict, payload: bytes = b'') -> Tuple[dict, bytes]:
+        '''
+        Send request and wait for response
+        '''
+        with self._lock:
+            _write_frame(self._writer, request, payload)
+            self._writer.flush()
+            frame = _read_frame(self._reader)
+        if frame is None:
+            raise DapperTableError('Render server closed the connection')
+        response, payload = frame
+        if 'error' in response:
+            raise DapperTableError(response['error'])
+        return response, payload
+
+    def create_table(self, name: str, **kwargs) -> 'RemoteTable':
+        '''
+        Create empty table on the server, replacing any table with the same name
+
+        name    :   Table name
+        kwargs  :   Options passed to DapperTable
+        '''
+        return self.put_table(name, DapperTable(**kwargs))
+
+    def put_table(self, name: str, table: DapperTable) -> 'RemoteTable':
+        '''
+        Send table to the server, replacing any table with the same name, rows are not formatted again
+
+        name    :   Table name
+        table   :   Table to send
+        '''
+        remote = RemoteTable(self, name)
+        remote._request('put', dumps(table)) # pylint: disable=protected-access
+        return remote
+
+    def table(self, name: str) -> 'RemoteTable':
+        '''
+        Get handle of table on the server
+
+        name    :   Table name
+        '''
+        return RemoteTable(self, name)
+
+    def drop_table(self, name: str) -> bool:
+        '''
+        Remove table from the server
+
+        name    :   Table name
+        '''
+        return self._request({'op': 'drop', 'table': name})[0]['result']
+
+    def table_names(self) -> List[str]:
+        '''
+        Names of tables on the server
+        '''
+        return self._request({'op': 'names'})[0]['result']
+
+    def close(self) -> None:
+        '''
+        Close connection
+        '''
+        self._reader.close()
+        self._writer.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        self.close()
+
+
+class RemoteTable():
+    '''
+    Table held by a RenderServer, mirrors DapperTable methods
+
+    version is the table version seen in the latest response, pass it to
+    changed_pages() later to find the pages changed since.
+    '''
+    def __init__(self, client: RenderClient, name: str):
+        '''
+        Init remote table
+
+        client  :   Connected client
+        name    :   Table name
+        '''
+        self._client = client
+        self.name = name
+        self.version = 0
+
+    def _request(self, op: str, payload: bytes = b'', **kwargs) -> Tuple[dict, bytes]:
+        '''
+        Send request for this table, tracking its version
+        '''
+        response, payload = self._client._request({'op': op, 'table': self.name, **kwargs}, # pylint: disable=protected-access
+                                                  payload)
+        self.version = response['version']
+        return response, payload
+
+    def _mutate(self, operations: List[list]) -> Tuple[list, List[int]]:
+        '''
+        Apply row changes on the server
+        '''
+        response = self._request('mutate', operations=operations)[0]
+        return response['result'], response['changed_pages']
+
+    def add_row(self, row: List[str] | str) -> int:
+        '''
+        Add row to table
+
+        row     :   List of items to go in row, assumes each item list is string representation
+
+        returns: index of new row
+        '''
+        return self._mutate([['add_row', row]])[0][0]
+
+    def add_rows(self, rows: List[List[str] | str]) -> int:
+        '''
+        Add many rows to table
+
+        rows    :   Rows to add, each as given to add_row
+
+        returns: index of first new row
+        '''
+        return self._mutate([['add_rows', list(rows)]])[0][0]
+
+    def insert_row(self, index: int, row: List[str] | str) -> int:
+        '''
+        Insert row, rows at and after the index move down
+
+        index   :   Index to place row at, can be the table size to add at the end
+        row     :   List of items to go in row, assumes each item list is string representation
+
+        returns: index of new row
+        '''
+        return self._mutate([['insert_row', index, row]])[0][0]
+
+    def edit_row(self, index: int, row: List[str] | str) -> bool:
+        '''
+        Update row contents
+
+        index   :   Index of row to update
+        row     :   List of items to go in row, assumes each item list is string representation
+        '''
+        return self._mutate([['edit_row', index, row]])[0][0]
+
+    def update_cell(self, index: int, column: int | str, value: str) -> bool:
+        '''
+        Update a single cell
+
+        index   :   Index of row to update
+        column  :   Column index or name
+        value   :   New cell value, assumes string representation
+        '''
+        return self._mutate([['update_cell', index, column, value]])[0][0]
+
+    def update_column(self, column: int | str, values: List[str]) -> bool:
+        '''
+        Update one column of every row
+
+        column  :   Column index or name
+        values  :   New cell value for each row, assumes string representation
+        '''
+        return self._mutate([['update_column', column, list(values)]])[0][0]
+
+    def move_row(self, source: int, destination: int) -> bool:
+        '''
+        Move row to a new position
+
+        source      :   Index of row to move
+        destination :   Index the row should end up at
+        '''
+        return self._mutate([['move_row', source, destination]])[0][0]
+
+    def remove_row(self, index: int) -> bool:
+        '''
+        Remove row
+
+        index   :   Index of row, cannot remove headers
+        '''
+        return self._mutate([['remove_row', index]])[0][0]
+
+    def batch(self) -> 'RemoteBatch':
+        '''
+        Queue row changes that are sent in one request
+        '''
+        return RemoteBatch(self)
+
+    def render(self) -> List[str] | str:
+        '''
+        Render table output, same as DapperTable.render() on the server
+        '''
+        return self._request('render')[0]['result']
+
+    def render_page(self, index: int) -> str:
+        '''
+        Render single page, matches the same page of render()
+
+        index   :   Index of page
+        '''
+        return self._request('render_page', index=index)[0]['result']
+
+    @property
+    def page_count(self) -> int:
+        '''
+        Number of pages, a table without pagination has one
+        '''
+        return self._request('page_count')[0]['result']
+
+    @property
+    def size(self) -> int:
+        '''
+        Return size of table (does not include headers)
+        '''
+        return self._request('size')[0]['result']
+
+    def __len__(self) -> int:
+        return self.size
+
+    def changed_pages(self, since: int) -> List[int]:
+        '''
+        Indexes of pages with changed output since version
+
+        since   :   Version seen earlier, from the version attribute
+        '''
+        return self._request('changed_pages', since=since)[0]['result']
+
+    def get_table(self) -> DapperTable:
+        '''
+        Get local copy of table, rows are not formatted again
+        '''
+        return loads(self._request('get')[1])
+
+
+class RemoteBatch():
+    '''
+    Row changes queued against a remote table, sent in one request on commit
+
+    Changes are validated by the server on commit, and dropped if the context
+    exits with an error.
+    '''
+    def __init__(self, table: RemoteTable):
+        '''
+        Init a remote batch
+
+        table   :   Table to change
+        '''
+        self._table = table
+        self._operations = []
+        self.results = []
+        self.changed_pages = []
+
+    def add_row(self, row: List[str] | str) -> None:
+        '''
+        Queue row to add at the end of the table
+
+        row     :   List of items to go in row, assumes each item list is string representation
+        '''
+        self._operations.append(['add_row', row])
+
+    def insert_row(self, index: int, row: List[str] | str) -> None:
+        '''
+        Queue row to insert, rows at and after the index move down
+
+        index   :   Index to place row at, can be the table size to add at the end
+        row     :   List of items to go in row, assumes each item list is string representation
+        '''
+        self._operations.append(['insert_row', index, row])
+
+    def edit_row(self, index: int, row: List[str] | str) -> None:
+        '''
+        Queue row contents update
+
+        index   :   Index of row to update
+        row     :   List of items to go in row, assumes each item list is string representation
+        '''
+        self._operations.append(['edit_row', index, row])
+
+    def update_cell(self, index: int, column: int | str, value: str) -> None:
+        '''
+        Queue single cell update
+
+        index   :   Index of row to update
+        column  :   Column index or name
+        value   :   New cell value, assumes string representation
+        '''
+        self._operations.append(['update_cell', index, column, value])
+
+    def remove_row(self, index: int) -> None:
+        '''
+        Queue row removal
+
+        index   :   Index of row, cannot remove headers
+        '''
+        self._operations.append(['remove_row', index])
+
+    def commit(self) -> List[int]:
+        '''
+        Send queued changes
+
+        returns: indexes of pages with changed output, also kept in changed_pages,
+                 return values of each change are kept in results
+        '''
+        operations = self._operations
+        self._operations = []
+        self.results, self.changed_pages = self._table._mutate(operations) # pylint: disable=protected-access
+        return self.changed_pages
+
+    def __enter__(self) -> 'RemoteBatch':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None:
+            self._operations = []
+            return
+        self.commit()
@@ -0,0 +1,226 @@
+'''
+Tables shared between processes through shared memory
+
+One process formats a table and publishes it into a shared memory segment as
+snapshot data, other processes attach to the segment by name and render pages
+straight from it, without copying the table or formatting any rows.
+
+Segment layout, all integers little endian:
+
+    version (u64) | data length (u64) | snapshot data
+
+The version is odd while the writer is replacing the data and even once it is
+done, readers check it before and after every read and try again if it changed.
+Only one process should publish to a segment.
+'''
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from struct import Struct, error as StructError
+from time import sleep
+from typing import Callable, List
+
+from dappertable import DapperTable, DapperTableError, DapperRow
+from dappertable.snapshot import dumps, SnapshotReader
+
+_HEADER = Struct('<QQ')
+# Reads are tried again while the writer is publishing, up to about one second
+_MAX_ATTEMPTS = 1000
+_RETRY_DELAY = 0.001
+
+
+def _attach(name: str) -> SharedMemory:
+    '''
+    Attach to segment without tracking it, removing it at exit is left to the writer
+    '''
+    try:
+        return SharedMemory(name=name, track=False) # pylint: disable=unexpected-keyword-arg
+    except TypeError:
+        # Before python 3.13 attaching always registers the segment with the resource tracker
+        memory = SharedMemory(name=name)
+        resource_tracker.unregister(memory._name, 'shared_memory') # pylint: disable=protected-access
+        return memory
+
+
+class SharedTableWriter():
+    '''
+    Publish tables into a new shared memory segment
+    '''
+    def __init__(self, size: int, name: str = None):
+        '''
+        Init shared table writer
+
+        size    :   Size of segment in bytes, published snapshots must fit in it
+        name    :   Name of segment, generated if not given
+        '''
+        if size <= _HEADER.size:
+            raise DapperTableError(f'Shared memory size must be larger than {_HEADER.size}')
+        self._memory = SharedMemory(name=name, create=True, size=size)
+        _HEADER.pack_into(self._memory.buf, 0, 0, 0)
+
+    @property
+    def name(self) -> str:
+        '''
+        Name of segment, used by readers to attach
+        '''
+        return self._memory.name
+
+    @property
+    def version(self) -> int:
+        '''
+        Version of published table, 0 until the first publish
+        '''
+        return _HEADER.unpack_from(self._memory.buf, 0)[0]
+
+    def publish(self, table: DapperTable) -> int:
+        '''
+        Replace shared table, rows are formatted by the table already
+
+        table   :   Table to publish
+
+        returns: new version
+        '''
+        data = dumps(table)
+        if _HEADER.size + len(data) > self._memory.size:
+            raise DapperTableError(f'Table snapshot of {len(data)} bytes does not fit shared memory '
+                                   f'of {self._memory.size} bytes')
+        version = self.version
+        buffer = self._memory.buf
+        _HEADER.pack_into(buffer, 0, version + 1, 0)
+        buffer[_HEADER.size:_HEADER.size + len(data)] = data
+        _HEADER.pack_into(buffer, 0, version + 2, len(data))
+        return version + 2
+
+    def close(self) -> None:
+        '''
+        Close segment in this process, readers keep working until it is unlinked
+        '''
+        self._memory.close()
+
+    def unlink(self) -> None:
+        '''
+        Remove segment, call once when no process needs it anymore
+        '''
+        self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        self.close()
+        self.unlink()
+
+
+class SharedTableReader():
+    '''
+    Read pages from a shared memory segment published by SharedTableWriter
+    '''
+    def __init__(self, name: str):
+        '''
+        Init shared table reader
+
+        name    :   Name of segment
+        '''
+        self._memory = _attach(name)
+        self._view = None
+        self._snapshot = None
+        self.read_version = 0
+
+    @property
+    def version(self) -> int:
+        '''
+        Current version of shared table, compare with read_version to check for updates
+        '''
+        return _HEADER.unpack_from(self._memory.buf, 0)[0]
+
+    def _release(self) -> None:
+        '''
+        Release view of snapshot data
+        '''
+        self._snapshot = None
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+
+    def _read(self, read: Callable[[SnapshotReader], object]) -> object:
+        '''
+        Run read on snapshot data, trying again if the table was published meanwhile
+        '''
+        for _attempt in range(_MAX_ATTEMPTS):
+            version, length = _HEADER.unpack_from(self._memory.buf, 0)
+            if version == 0:
+                raise DapperTableError('No table published to shared memory')
+            if version % 2:
+                sleep(_RETRY_DELAY)
+                continue
+            try:
+                if self._snapshot is None or self.read_version != version:
+                    self._release()
+                    self._view = self._memory.buf[_HEADER.size:_HEADER.size + length]
+                    self.read_version = version
+                    self._snapshot = SnapshotReader(self._view)
+                result = read(self._snapshot)
+            except (DapperTableError, ValueError, StructError):
+                # Partly written data fails to parse, only raise if it was not being replaced
+                if self.version == version:
+                    raise
+                self._release()
+                continue
+            if self.version == version:
+                return result
+            self._release()
+        raise DapperTableError('Shared table was not readable, writer is still publishing')
+
+    @property
+    def page_count(self) -> int:
+        '''
+        Number of pages
+        '''
+        return self._read(lambda snapshot: snapshot.page_count)
+
+    def render_page(self, index: int) -> str:
+        '''
+        Render single page, matches the same page of DapperTable.render() in the writer
+
+        index   :   Index of page
+        '''
+        return self._read(lambda snapshot: snapshot.render_page(index))
+
+    def render(self) -> List[str] | str:
+        '''
+        Render all pages, matches DapperTable.render() in the writer
+        '''
+        return self._read(_render_snapshot)
+
+    def get_pages(self) -> List[List[DapperRow]] | List[DapperRow]:
+        '''
+        Get rows of every page, matches DapperTable.get_pages() in the writer
+        '''
+        return self._read(lambda snapshot: snapshot.get_pages())
+
+    def load_table(self) -> DapperTable:
+        '''
+        Load copy of shared table, rows are not formatted again
+        '''
+        return self._read(lambda snapshot: snapshot.load_table())
+
+    def close(self) -> None:
+        '''
+        Detach from segment
+        '''
+        self._release()
+        self._memory.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        self.close()
+
+
+def _render_snapshot(snapshot: SnapshotReader) -> List[str] | str:
+    '''
+    Render all pages of snapshot
+    '''
+    if not snapshot.layout['pagination']:
+        return snapshot.render_page(0)
+    return [snapshot.render_page(i) for i in range(snapshot.page_count)]
@@ -0,0 +1,299 @@
+'''
+Binary snapshots of formatted tables
+
+Snapshots store the table layout, the raw input values and the formatted rows,
+so a table can be loaded again without formatting any rows. Page bounds are
+stored as well, which lets SnapshotReader serve a single page from a
+memory mapped file without reading the whole file.
+
+File layout, all integers little endian:
+
+    magic (6 bytes) | version (u16) | layout length (u32) | layout (json)
+    page count (u32) | page bounds (u32 start, u32 end per page)
+    row count (u32) | row offsets (u64 per row, plus end offset)
+    row records: width (u32), zero padding (i32), content length (u32), content, input values (json)
+
+Rows include the header rows, offsets are relative to the start of the row records.
+'''
+import json
+from mmap import mmap, ACCESS_READ
+from struct import Struct, error as StructError
+from typing import BinaryIO, List
+
+from dappertable import DapperTable, DapperTableError, DapperRow, Column, Columns
+from dappertable import PaginationLength, PaginationRows, PaginationTarget, PaginationType
+from dappertable._render import _join_page, _wrap_page
+
+MAGIC = b'DTSNAP'
+VERSION = 1
+
+_PREAMBLE = Struct('<6sHI')
+_COUNT = Struct('<I')
+_BOUND = Struct('<II')
+_OFFSET = Struct('<Q')
+_OFFSET_PAIR = Struct('<QQ')
+_ROW = Struct('<IiI')
+# Stored in place of a missing zero padding value
+_NO_PADDING = -2 ** 31
+
+
+def _pagination_layout(options: PaginationRows | PaginationLength | None) -> list | None:
+    '''
+    Get pagination type and value
+    '''
+    if not options:
+        return None
+    if options.pagination_type == PaginationType.ROWS:
+        return [options.pagination_type.value, options.rows_per_message]
+    return [options.pagination_type.value, options.length_per_message]
+
+
+def _pagination_options(layout: list | None) -> PaginationRows | PaginationLength | None:
+    '''
+    Get pagination options from type and value
+    '''
+    if not layout:
+        return None
+    pagination_type, value = layout
+    if pagination_type == PaginationType.ROWS.value:
+        return PaginationRows(value)
+    return PaginationLength(value)
+
+
+def _layout(table: DapperTable) -> dict:
+    '''
+    Get layout settings of table
+    '''
+    # pylint: disable=protected-access
+    layout = {
+        'columns': None,
+        'separator': None,
+        'pagination': None,
+        'collapse_newlines': table.collapse_newlines,
+        'prefix': table._prefix,
+        'suffix': table._suffix,
+        'enclosure_start': table._enclosure_start,
+        'enclosure_end': table._enclosure_end,
+        'zero_pad_width': table._zero_pad_width,
+        'header_count': len(table._header_rows),
+        'retain_input_values': table._retain_input_values,
+    }
+    if table._columns:
+        layout['columns'] = [[col.name, col.width, col.zero_pad, col.auto_width, col.percentile]
+                             for col in table._columns.headers]
+        layout['separator'] = table._columns.separator
+        layout['widths'] = table._widths
+        layout['width_counts'] = [[count, list(width_counts.items())]
+                                  for (count, width_counts) in table._width_counts.items()]
+    layout['pagination'] = _pagination_layout(table._pagination_options)
+    targets = [(name, target.target) for (name, target) in table.targets.items()]
+    layout['targets'] = [[name, _pagination_layout(target.pagination_options), target.prefix, target.suffix,
+                          target.enclosure_start, target.enclosure_end] for (name, target) in targets]
+    return layout
+
+
+def _page_bounds(table: DapperTable) -> List[tuple]:
+    '''
+    Get page bounds of table over all rows, including headers
+    '''
+    pages = table.get_pages()
+    if not table._pagination_options: # pylint: disable=protected-access
+        return [(0, len(pages))]
+    bounds = []
+    start = 0
+    for page in pages:
+        bounds.append((start, start + len(page)))
+        start += len(page)
+    return bounds
+
+
+def dumps(table: DapperTable) -> bytes:
+    '''
+    Serialize table to snapshot bytes
+
+    table   :   Table to serialize
+    '''
+    layout = json.dumps(_layout(table), separators=(',', ':')).encode('utf-8')
+    bounds = _page_bounds(table)
+    rows = table._page_rows() # pylint: disable=protected-access
+
+    output = [_PREAMBLE.pack(MAGIC, VERSION, len(layout)), layout, _COUNT.pack(len(bounds))]
+    output.extend(_BOUND.pack(start, end) for (start, end) in bounds)
+
+    records = []
+    offsets = [0]
+    for row in rows:
+        content = row.content.encode('utf-8')
+        values = json.dumps(row.input_values, separators=(',', ':'), default=str).encode('utf-8')
+        padding = _NO_PADDING if row.zero_padding_value is None else row.zero_padding_value
+        records.append(_ROW.pack(row.width, padding, len(content)) + content + values)
+        offsets.append(offsets[-1] + len(records[-1]))
+    output.append(_COUNT.pack(len(rows)))
+    output.extend(_OFFSET.pack(offset) for offset in offsets)
+    output.extend(records)
+    return b''.join(output)
+
+
+def dump(table: DapperTable, writer: BinaryIO) -> None:
+    '''
+    Serialize table to binary file object
+
+    table   :   Table to serialize
+    writer  :   Binary file object to write to
+    '''
+    writer.write(dumps(table))
+
+
+def loads(data: bytes) -> DapperTable:
+    '''
+    Load table from snapshot bytes
+
+    data    :   Snapshot bytes, or any object supporting the buffer protocol
+    '''
+    return SnapshotReader(data).load_table()
+
+
+def load(reader: BinaryIO) -> DapperTable:
+    '''
+    Load table from binary file object
+
+    reader  :   Binary file object to read from
+    '''
+    return loads(reader.read())
+
+
+class SnapshotReader():
+    '''
+    Read pages and tables from snapshot data without loading all rows
+    '''
+    def __init__(self, buffer: bytes):
+        '''
+        Init snapshot reader
+
+        buffer  :   Snapshot bytes, or any object supporting the buffer protocol such as mmap
+        '''
+        self._buffer = buffer
+        self._mmap = None
+        try:
+            magic, version, layout_length = _PREAMBLE.unpack_from(buffer, 0)
+        except StructError as exc:
+            raise DapperTableError('Invalid snapshot data') from exc
+        if magic != MAGIC:
+            raise DapperTableError('Invalid snapshot data')
+        if version != VERSION:
+            raise DapperTableError(f'Unsupported snapshot version {version}')
+        position = _PREAMBLE.size
+        self.layout = json.loads(bytes(buffer[position:position + layout_length]).decode('utf-8'))
+        position += layout_length
+
+        self.page_count = _COUNT.unpack_from(buffer, position)[0]
+        self._bounds_position = position + _COUNT.size
+        position = self._bounds_position + self.page_count * _BOUND.size
+
+        self.row_count = _COUNT.unpack_from(buffer, position)[0]
+        self._offsets_position = position + _COUNT.size
+        self._records_position = self._offsets_position + (self.row_count + 1) * _OFFSET.size
+
+    @classmethod
+    def open(cls, path: str) -> 'SnapshotReader':
+        '''
+        Open snapshot file as memory map
+
+        path    :   Path of snapshot file
+        '''
+        with open(path, 'rb') as reader:
+            buffer = mmap(reader.fileno(), 0, access=ACCESS_READ)
+        snapshot = cls(buffer)
+        snapshot._mmap = buffer
+        return snapshot
+
+    def close(self) -> None:
+        '''
+        Close memory map if snapshot was opened from a file
+        '''
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        self.close()
+
+    def _record(self, index: int) -> tuple:
+        '''
+        Get record position and header of row
+        '''
+        start, end = _OFFSET_PAIR.unpack_from(self._buffer, self._offsets_position + index * _OFFSET.size)
+        start += self._records_position
+        end += self._records_position
+        return start, end, _ROW.unpack_from(self._buffer, start)
+
+    def _content(self, index: int) -> str:
+        '''
+        Get formatted content of row
+        '''
+        start, _end, (_width, _padding, content_length) = self._record(index)
+        start += _ROW.size
+        return bytes(self._buffer[start:start + content_length]).decode('utf-8')
+
+    def _row(self, index: int) -> DapperRow:
+        '''
+        Get row
+        '''
+        start, end, (width, padding, content_length) = self._record(index)
+        start += _ROW.size
+        content = bytes(self._buffer[start:start + content_length]).decode('utf-8')
+        values = json.loads(bytes(self._buffer[start + content_length:end]).decode('utf-8'))
+        row = DapperRow(content, values, zero_padding_value=None if padding == _NO_PADDING else padding)
+        row._width = width # pylint: disable=protected-access
+        return row
+
+    def render_page(self, index: int) -> str:
+        '''
+        Render single page, matches the same page of DapperTable.render()
+
+        index   :   Index of page
+        '''
+        if index < 0 or index >= self.page_count:
+            raise DapperTableError(f'Invalid page index given {index}')
+        start, end = _BOUND.unpack_from(self._buffer, self._bounds_position + index * _BOUND.size)
+        output = _join_page([self._content(i) for i in range(start, end)], self.layout['collapse_newlines'])
+        return _wrap_page(output, index, self.page_count, self.layout['prefix'], self.layout['suffix'],
+                          self.layout['enclosure_start'], self.layout['enclosure_end'])
+
+    def get_pages(self) -> List[List[DapperRow]] | List[DapperRow]:
+        '''
+        Get rows of every page, matches DapperTable.get_pages()
+        '''
+        pages = []
+        for index in range(self.page_count):
+            start, end = _BOUND.unpack_from(self._buffer, self._bounds_position + index * _BOUND.size)
+            pages.append([self._row(i) for i in range(start, end)])
+        if not self.layout['pagination']:
+            return pages[0]
+        return pages
+
+    def load_table(self) -> DapperTable:
+        '''
+        Load full table, rows are not formatted again
+        '''
+        columns = None
+        if self.layout['columns']:
+            columns = Columns([Column(name, width, zero_pad=zero_pad, auto_width=auto_width, percentile=percentile)
+                               for (name, width, zero_pad, auto_width, percentile) in self.layout['columns']],
+                              separator=self.layout['separator'])
+        targets = {name: PaginationTarget(_pagination_options(pagination), prefix=prefix, suffix=suffix,
+                                          enclosure_start=enclosure_start, enclosure_end=enclosure_end)
+                   for (name, pagination, prefix, suffix, enclosure_start, enclosure_end) in self.layout.get('targets', [])}
+        table = DapperTable(columns=columns, pagination_options=_pagination_options(self.layout['pagination']),
+                            collapse_newlines=self.layout['collapse_newlines'],
+                            prefix=self.layout['prefix'], suffix=self.layout['suffix'],
+                            enclosure_start=self.layout['enclosure_start'], enclosure_end=self.layout['enclosure_end'],
+                            retain_input_values=self.layout.get('retain_input_values', True), targets=targets)
+        rows = [self._row(i) for i in range(self.layout['header_count'], self.row_count)]
+        width_counts = {count: dict(width_counts) for (count, width_counts) in self.layout.get('width_counts') or []}
+        table._restore_rows(rows, self.layout['zero_pad_width'], # pylint: disable=protected-access
+                            widths=self.layout.get('widths'), width_counts=width_counts)
+        return table
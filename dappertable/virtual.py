@@ -0,0 +1,287 @@
+'''
+Tables backed by a row provider
+
+VirtualTable fetches rows from a callback only when a page needs them, such as
+rows stored in a database. Fetched rows are formatted and kept in a bounded
+cache, so paging back and forth does not fetch or format them again.
+
+Row pagination finds the rows of any page from the row count alone. Length
+pagination has to measure every row before a page to find where it starts, so
+page bounds are discovered page by page the first time they are needed and
+kept afterwards, later pages cost the same as the first once found.
+'''
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from time import perf_counter
+from typing import Callable, List
+
+from dappertable import DapperTable, DapperTableError, DapperRow, Columns, _PaginationBase
+from dappertable._render import _PagedRenderer, _apply_suffix_bounds, _chunk_bounds, _chunk_bounds_by_length
+
+
+class _VirtualRows(Sequence):
+    '''
+    All rows of a virtual table including headers, fetched as they are read
+    '''
+    def __init__(self, table: 'VirtualTable'):
+        self._table = table
+
+    def __len__(self) -> int:
+        return len(self._table._header_rows) + self._table.size # pylint: disable=protected-access
+
+    def __getitem__(self, index: int | slice) -> DapperRow | List[DapperRow]:
+        table = self._table
+        header_count = len(table._header_rows) # pylint: disable=protected-access
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1 or start >= stop:
+                return [self[i] for i in range(start, stop, step)]
+            headers = table._header_rows[start:stop] # pylint: disable=protected-access
+            return headers + table._data_rows(max(start, header_count) - header_count, # pylint: disable=protected-access
+                                              stop - header_count)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Row index out of range')
+        if index < header_count:
+            return table._header_rows[index] # pylint: disable=protected-access
+        return table._data_row(index - header_count) # pylint: disable=protected-access
+
+
+class VirtualTable(_PagedRenderer):
+    '''
+    Table with rows fetched from a provider when pages are rendered
+    '''
+    def __init__(self, fetch: Callable[[int, int], List[List[str] | str]], count: Callable[[], int] | int,
+                 columns: Columns = None,
+                 pagination_options: _PaginationBase = None, collapse_newlines: bool = True,
+                 prefix: str = '', suffix: str = '',
+                 enclosure_start: str = '', enclosure_end: str = '', stats: bool = False,
+                 cache_size: int = 4096, fetch_size: int = 256):
+        '''
+        Init a virtual table
+
+        fetch               :   Called with (start, count), returns that many rows as given to DapperTable.add_row,
+                                rows can be tuples or other sequences such as database cursor rows
+        count               :   Number of rows, or function returning it, called again on refresh()
+        columns             :   Column definitions; if not given will treat as raw input
+        pagination_options  :   Pagination settings
+        collapse_newlines   :   Collapse multiple newlines in messages
+        prefix              :   String to prepend to first page of output
+        suffix              :   String to append to last page of output
+        enclosure_start     :   String to wrap before table content on each page
+        enclosure_end       :   String to wrap after table content on each page
+        stats               :   Collect call counts and timings in stats attribute
+        cache_size          :   Number of formatted rows to keep, at least fetch_size
+        fetch_size          :   Rows fetched at once when finding length page bounds
+        '''
+        super().__init__(pagination_options=pagination_options, collapse_newlines=collapse_newlines,
+                         prefix=prefix, suffix=suffix,
+                         enclosure_start=enclosure_start, enclosure_end=enclosure_end, stats=stats)
+        if cache_size < 1 or fetch_size < 1:
+            raise DapperTableError('Cache size and fetch size must be at least 1')
+        if cache_size < fetch_size:
+            # Rows of a fetch would be dropped before being read, and fetched again
+            raise DapperTableError(f'Cache size {cache_size} must be at least fetch size {fetch_size}')
+        if columns and any(col.auto_width for col in columns.headers):
+            raise DapperTableError('Virtual tables do not support auto width columns')
+        # Formats fetched rows, zero padding follows the row count
+        self._formatter = DapperTable(columns=columns)
+        self._formatter.stats = self.stats
+        self._header_rows = self._formatter._header_rows # pylint: disable=protected-access
+        self._fetch = fetch
+        self._count = count
+        self._cache_size = cache_size
+        self._fetch_size = fetch_size
+        self._cache = OrderedDict()
+        self._size = 0
+        # Length page bounds found so far, and whether the last page was reached
+        self._bounds = []
+        self._bounds_complete = False
+        self.refresh()
+
+    def refresh(self) -> None:
+        '''
+        Read the row count again and drop cached rows and page bounds, call after the provider data changed
+        '''
+        self._size = self._count() if callable(self._count) else self._count
+        if self._size < 0:
+            raise DapperTableError(f'Invalid row count {self._size}')
+        self._formatter._update_zero_pad(self._size) # pylint: disable=protected-access
+        self._cache.clear()
+        self._bounds = []
+        self._bounds_complete = False
+
+    def _fetch_rows(self, start: int, end: int) -> List[DapperRow]:
+        '''
+        Fetch and format rows, adding them to the cache
+        '''
+        timed = self._timed()
+        if timed:
+            timer = perf_counter()
+        values = list(self._fetch(start, end - start))
+        if timed:
+            self._record('fetch', len(values), perf_counter() - timer)
+        if len(values) != end - start:
+            raise DapperTableError(f'Row provider returned {len(values)} rows, expected {end - start}')
+        formatter = self._formatter
+        if formatter._headers: # pylint: disable=protected-access
+            # Database cursors return tuples or row objects instead of lists
+            values = [list(row) if isinstance(row, Iterable) and not isinstance(row, str) else row
+                      for row in values]
+        for row in values:
+            formatter._validate_row(row) # pylint: disable=protected-access
+        if formatter._headers: # pylint: disable=protected-access
+            rows = formatter._format_rows(values) # pylint: disable=protected-access
+        else:
+            rows = [DapperRow(row, row) for row in values]
+        cache = self._cache
+        for (index, row) in enumerate(rows, start):
+            cache[index] = row
+            cache.move_to_end(index)
+        while len(cache) > self._cache_size:
+            cache.popitem(last=False)
+        return rows
+
+    def _data_rows(self, start: int, end: int) -> List[DapperRow]:
+        '''
+        Get rows, fetching each run of rows missing from the cache in one call
+        '''
+        cache = self._cache
+        rows = []
+        hits = 0
+        index = start
+        while index < end:
+            row = cache.get(index)
+            if row is not None:
+                cache.move_to_end(index)
+                rows.append(row)
+                hits += 1
+                index += 1
+                continue
+            run_end = index + 1
+            while run_end < end and run_end not in cache:
+                run_end += 1
+            rows.extend(self._fetch_rows(index, run_end))
+            index = run_end
+        if hits and self._timed():
+            self._record('row_cache_hit', hits, 0.0)
+        return rows
+
+    def _data_row(self, index: int) -> DapperRow:
+        '''
+        Get row, fetching the rows after it as well if it is not cached
+        '''
+        row = self._cache.get(index)
+        if row is not None:
+            self._cache.move_to_end(index)
+            if self._timed():
+                self._record('row_cache_hit', 1, 0.0)
+            return row
+        return self._fetch_rows(index, min(index + self._fetch_size, self._size))[0]
+
+    def _page_rows(self) -> _VirtualRows:
+        '''
+        All rows to paginate, including headers, fetched as they are read
+        '''
+        return _VirtualRows(self)
+
+    def _discover(self, page: int | None) -> None:
+        '''
+        Find length page bounds up to page, or up to the last page if page is None
+        '''
+        if self._bounds_complete or (page is not None and page < len(self._bounds)):
+            return
+        all_rows = self._page_rows()
+        needed = None if page is None else page + 1 - len(self._bounds)
+        closed = 0
+        stopped = False
+
+        def resume(_index: int) -> List[tuple] | None:
+            # Called when a page is closed, stop once enough pages are known
+            nonlocal closed, stopped
+            closed += 1
+            if needed is not None and closed >= needed:
+                stopped = True
+                return []
+            return None
+
+        timed = self._timed()
+        if timed:
+            timer = perf_counter()
+        start = self._bounds[-1][1] if self._bounds else 0
+        bounds = self._bounds + _chunk_bounds_by_length(all_rows, self._length_per_message, self._prefix,
+                                                        start=start, is_first_chunk=not self._bounds,
+                                                        resume=resume)
+        if not stopped:
+            bounds = _apply_suffix_bounds(all_rows, bounds, self._length_per_message, self._suffix)
+            self._bounds_complete = True
+        if timed:
+            self._record('paginate', len(bounds) - len(self._bounds), perf_counter() - timer)
+        self._bounds = bounds
+
+    def _paginate(self, all_rows: _VirtualRows) -> List[tuple]:
+        '''
+        Get (start, end) bounds of every page, requires pagination options
+        '''
+        if self._rows_per_message:
+            return _chunk_bounds(len(all_rows), self._rows_per_message)
+        self._discover(None)
+        return self._bounds
+
+    @property
+    def page_count(self) -> int:
+        '''
+        Number of pages, finds every length page bound if not known yet
+        '''
+        if not (self._rows_per_message or self._length_per_message):
+            return 1
+        return len(self._paginate(self._page_rows()))
+
+    def _page_bounds_of(self, index: int) -> tuple:
+        '''
+        Get (start, end, page count) of page, page count is only a lower bound while length bounds are being found
+        '''
+        row_count = len(self._header_rows) + self._size
+        if not (self._rows_per_message or self._length_per_message):
+            bounds = [(0, row_count)]
+            page_count = 1
+        elif self._rows_per_message:
+            bounds = _chunk_bounds(row_count, self._rows_per_message)
+            page_count = len(bounds)
+        else:
+            self._discover(index)
+            bounds = self._bounds
+            # Pages before the last one found are never the last page
+            page_count = len(bounds) if self._bounds_complete else len(bounds) + 1
+        if not 0 <= index < len(bounds):
+            raise DapperTableError(f'Invalid page index given {index}')
+        return bounds[index][0], bounds[index][1], page_count
+
+    def get_page(self, index: int) -> List[DapperRow]:
+        '''
+        Get rows of single page, only rows of that page are fetched
+
+        index   :   Index of page
+        '''
+        start, end, _page_count = self._page_bounds_of(index)
+        return self._page_rows()[start:end]
+
+    def render_page(self, index: int) -> str:
+        '''
+        Render single page, matches the same page of render()
+
+        index   :   Index of page
+        '''
+        start, end, page_count = self._page_bounds_of(index)
+        return self._render_page(self._page_rows()[start:end], index, page_count)
+
+    @property
+    def size(self) -> int:
+        '''
+        Return size of table (does not include headers)
+        '''
+        return self._size
+
+    def __len__(self) -> int:
+        return self._size
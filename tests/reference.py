@@ -0,0 +1,454 @@
+'''
+Frozen reference implementation of table output
+
+The width, shortening, row formatting and pagination code below is copied
+verbatim from dappertable 1.1.5, before any optimization. Only auto width
+columns, which 1.1.5 did not have, and formatting rows once the final row
+count is known are added, both are marked below. test_differential checks
+every optimized and cached path of dappertable against it, so do not optimize
+or tidy it. Changes here change the expected output of the library.
+'''
+# pylint: disable=protected-access
+from dataclasses import dataclass, replace
+from math import ceil
+from re import sub
+from typing import List
+from unicodedata import east_asian_width
+from wcwidth import wcswidth
+
+from dappertable import DapperTableError, Column, Columns, PaginationType, _PaginationBase
+
+
+# Copied verbatim from dappertable 1.1.5
+
+@dataclass
+class DapperRow:
+    '''
+    Instance of a row in a table
+    '''
+    content: str
+    input_values: List[str] | str
+    zero_padding_value: int | None = None
+
+    def edit(self, new_content: str) -> bool:
+        '''
+        Allow raw editing of row content
+        '''
+        self.content = new_content
+        self.input_values = new_content
+        return True
+
+    def __eq__(self, other):
+        '''
+        Override equals check
+        '''
+        return other.content == self.content
+
+    def __len__(self):
+        '''
+        Override length check
+        '''
+        return len(self.content)
+
+    def __getitem__(self, index: int):
+        '''
+        Override get item
+        '''
+        return self.content[index]
+
+def shorten_string(intput_string: str, width: int, placeholder: str = '..') -> str:
+    '''
+    Shorten a string with wide characters (e.g. East Asian characters)
+
+    intput_string (string): input string to shorten
+    width (int): character count to shorten too
+    placeholder (str, optional): cut of end characters if space is there. Defaults to '..'.
+    '''
+    # get the display width using wcwidth
+    string_display_width = string_width(str(intput_string))
+    # if display width is too big
+    if string_display_width > width:
+        # set current length and output string
+        out_string = ''
+        # loop through each character
+        for char in str(intput_string):
+            # Calculate what the width would be if we add this character
+            new_string = out_string + char
+            new_string_width = wcswidth(new_string)
+            # Handle non-printable characters - fall back to basic length
+            if new_string_width == -1:
+                new_string_width = len(new_string)
+
+            # if the new length is smaller than the output length to shorten too add the char
+            if new_string_width <= (width - wcswidth(placeholder)):
+                out_string += char
+            else:
+                break
+        # return string with new width and placeholder
+        return f"{out_string}{placeholder}"
+    return str(intput_string)
+
+def string_width(input_string: str) -> int:
+    '''
+    Get display width of a string (accounts for wide characters)
+
+    string (string): string to get display width for
+    '''
+    # Use wcwidth library for accurate display width calculation
+    width = wcswidth(input_string)
+    # wcswidth returns -1 if string contains non-printable characters
+    # Fall back to basic string length in that case
+    if width == -1:
+        return len(input_string)
+    return width
+
+def format_string_length(input_string: str, length: int) -> int:
+    '''
+    Returns length updated for string with wide characters
+    Calculate the padding width needed to achieve the desired display width
+    when using Python's string formatting with wide characters (e.g. East Asian)
+
+    input_string (string): string to calculate length of
+    length (int): desired display width for string
+    '''
+    display_width = string_width(input_string)
+    char_count = len(input_string)
+
+    # For proper separator alignment, we need consistent format widths
+    # When the display width meets or exceeds target, we use the target length
+    # to ensure all separators align at the same character position
+    if display_width >= length:
+        return length
+
+    # For strings shorter than target, calculate the needed padding
+    # Count actual wide East Asian characters (excluding fullwidth ASCII like ＂)
+    # to determine adjustment needed for terminals that don't render wide chars correctly
+    needed_padding = length - display_width
+
+    # Count only true wide characters (W width), not fullwidth ASCII variants (F width)
+    true_wide_count = sum(1 for c in input_string if east_asian_width(c) == 'W')
+    adjusted_padding = needed_padding + (ceil(true_wide_count / 4))
+
+    return char_count + adjusted_padding
+
+
+# https://stackoverflow.com/questions/312443/how-do-i-split-a-list-into-equally-sized-chunks
+def _chunk_list(input_list: List[object], chunk_size: int) -> List[List[object]]:
+    '''
+    Split list into equal sized chunks
+
+    input_list: Input list of any type
+    chunk_size: Chunk list into size bits
+    '''
+    size = max(1, chunk_size)
+    return [input_list[i:i+size] for i in range(0, len(input_list), size)]
+
+def _chunk_list_by_length(input_list: List[DapperRow], max_length: int,
+                          prefix: str = '', suffix: str = '') -> List[List[str]]:
+    # pylint: disable=too-many-locals,too-many-branches
+    '''
+    Split list by length, accounting for prefix on first chunk, suffix on last chunk,
+    and enclosure on all chunks
+    '''
+    new_rows = []
+    current_size = 0
+    current_rows = []
+    is_first_chunk = True
+
+    for current_item in input_list:
+        item_width = string_width(current_item.content)
+
+        # Check if item is too large for any page
+        if item_width > max_length:
+            raise DapperTableError(f'Length of input "{current_item.content}" is greater than max length {max_length}')
+
+        # Determine available space for current chunk
+        if is_first_chunk:
+            available_space = max_length - string_width(prefix)
+        else:
+            available_space = max_length
+
+        # Calculate the size this item will add to the chunk
+        # Include newline separator if this isn't the first row in the chunk
+        item_size_to_add = item_width
+        if current_rows:  # If there are already rows, we need a newline before this one
+            item_size_to_add += 1
+
+        # If first item doesn't fit with prefix, create empty chunk with just prefix
+        if is_first_chunk and item_size_to_add > available_space:
+            # Create empty chunk for prefix, then continue with normal chunking
+            new_rows.append([])
+            is_first_chunk = False
+            available_space = max_length
+            # Recalculate since we're now in a new chunk (first item, no newline needed)
+            item_size_to_add = item_width
+
+        if current_size + item_size_to_add > available_space:
+            # Current chunk is full, start new chunk
+            new_rows.append(current_rows)
+            current_rows = []
+            current_size = 0
+            is_first_chunk = False
+            available_space = max_length
+            # Recalculate since we're now in a new chunk (first item, no newline needed)
+            item_size_to_add = item_width
+
+        current_rows.append(current_item)
+        current_size += item_size_to_add
+
+    # Add the last chunk
+    if current_rows:
+        new_rows.append(current_rows)
+
+    # Adjust last chunk for suffix
+    if new_rows and suffix:
+        while new_rows:
+            last_chunk = new_rows[-1]
+            # Calculate total size including newlines between rows
+            last_chunk_size = sum(string_width(row.content) for row in last_chunk)
+            if len(last_chunk) > 1:
+                last_chunk_size += len(last_chunk) - 1  # Add newlines between rows
+
+            if last_chunk_size + string_width(suffix) <= max_length:
+                # Last chunk fits with suffix
+                break
+
+            # Need to move rows from last chunk
+            if len(last_chunk) == 1:
+                # Single row doesn't fit with suffix - create empty chunk for suffix
+                new_rows.append([])
+                break
+
+            # Move last row to a new chunk
+            moved_row = last_chunk.pop()
+            # Create new chunk with moved row
+            new_rows.append([moved_row])
+
+    return new_rows
+
+class ReferenceTable():
+    '''
+    DapperTable of dappertable 1.1.5, without row editing
+    '''
+    def __init__(self, columns: Columns = None,
+                 pagination_options: _PaginationBase = None, collapse_newlines: bool = True,
+                 prefix: str = '', suffix: str = '',
+                 enclosure_start: str = '', enclosure_end: str = ''):
+        '''
+        Init a dapper table
+
+        columns             :   Column definitions; if not given will treat as raw input
+        pagination_options  :   Pagination settings
+        collapse_newlines   :   Collapse multiple newlines in messages
+        prefix              :   String to prepend to first page of output
+        suffix              :   String to append to last page of output
+        enclosure_start     :   String to wrap before table content on each page
+        enclosure_end       :   String to wrap after table content on each page
+        '''
+        self.collapse_newlines = collapse_newlines
+        self._prefix = prefix
+        self._suffix = suffix
+        self._enclosure_start = enclosure_start
+        self._enclosure_end = enclosure_end
+        self._rows = []
+        self._header_rows = []
+
+        self._rows_per_message = None
+        self._length_per_message = None
+        if pagination_options:
+            if pagination_options.pagination_type == PaginationType.ROWS:
+                self._rows_per_message = pagination_options.rows_per_message
+                if pagination_options.rows_per_message and pagination_options.rows_per_message < 1:
+                    raise DapperTableError(f'Invalid value for rows per message: {pagination_options.rows_per_message}')
+            if pagination_options.pagination_type == PaginationType.LENGTH:
+                # Make sure we take the enclosures into account
+                self._length_per_message = pagination_options.length_per_message - string_width(self._enclosure_start) - string_width(self._enclosure_end)
+                if self._length_per_message < 1:
+                    raise DapperTableError(f'Invalid value for length per message: {pagination_options.length_per_message}')
+                # Validate prefix/suffix don't exceed pagination length
+                if string_width(prefix) > pagination_options.length_per_message:
+                    raise DapperTableError(f'Prefix length ({string_width(prefix)}) exceeds pagination length ({pagination_options.length_per_message})')
+                if string_width(suffix) > pagination_options.length_per_message:
+                    raise DapperTableError(f'Suffix length ({string_width(suffix)}) exceeds pagination length ({pagination_options.length_per_message})')
+
+        # Headers
+        self._headers = None
+        self._separator = None
+        # Track pad indexing
+        self._contains_zero_pad = False
+
+        if columns:
+            self._headers = columns.headers
+            for header in self._headers:
+                if header.zero_pad:
+                    self._contains_zero_pad = True
+                    break
+            # Make sure we add a single space at the end
+            self._separator = f'{columns.separator.replace(" ", "")} '
+            # Init first headers
+            self._header_rows = self._generate_headers()
+
+    def _generate_formatted_string(self, target_width: int, col_string: str, is_last_column: bool = False) -> str:
+        '''
+        Generate a properly formatted string with appropriate spacing for CJK characters.
+        '''
+        if string_width(col_string) < target_width:
+            col_length = format_string_length(col_string, target_width)
+            return f'{col_string:{col_length}}'
+        # If last column, don't add spacing to save space
+        if is_last_column:
+            return col_string
+
+        # Use one regular space plus thin spaces for better readability
+        space_count = target_width - len(col_string)
+        return col_string + ' ' * space_count
+
+    def _generate_headers(self) -> List[str]:
+        '''
+        Generate header content, first two rows of table
+        '''
+        col_items = []
+        # Setup headers as first row
+        for i, col in enumerate(self._headers):
+            col_string = shorten_string(col.name, col.width)
+            is_last_column = i == len(self._headers) - 1
+            formatted_col = self._generate_formatted_string(col.width, col_string, is_last_column)
+            col_items.append(formatted_col)
+        row_string = self._separator.join(i for i in col_items)
+        row_string = row_string.rstrip(' ')
+        # Calculate total length based on actual display width
+        total_length = string_width(row_string)
+        # First row and then table formatter
+        return [DapperRow(row_string, None), DapperRow('-' * total_length, None)]
+
+    def _validate_row(self, row: List[str] | str) -> bool:
+        '''
+        Validate row input
+        '''
+        if self._headers:
+            if not isinstance(row, list):
+                raise DapperTableError('Row input must be list if headers were given')
+            if len(row) != len(self._headers):
+                raise DapperTableError('Row length must match length of headers')
+        return True
+
+
+    def _check_padding_zeros(self, new_value: str) -> int:
+        '''
+        Check how many padded zeros should be added
+        '''
+        return len(str(len(self._rows))) - len(str(new_value))
+
+    def _format_row(self, row: List[str]) -> DapperRow:
+        '''
+        Format row content to headers
+        '''
+        padding = None
+        col_items = []
+        for (count, item) in enumerate(row):
+            if self._headers[count].zero_pad:
+                padding = self._check_padding_zeros(item)
+                item = f'{"0" * padding}{item}'
+            col_string = shorten_string(item, self._headers[count].width)
+            is_last_column = count == len(self._headers) - 1
+            formatted_col = self._generate_formatted_string(self._headers[count].width, col_string, is_last_column)
+            col_items.append(formatted_col)
+        row_string = self._separator.join(i for i in col_items)
+        row_string = row_string.rstrip(' ')
+        return DapperRow(row_string, row, zero_padding_value=padding)
+
+    def get_pages(self) -> List[DapperRow]:
+        '''
+        Return list of rows based on pagination options
+        '''
+        # If no pagination options, return raw list
+        all_rows = self._header_rows + self._rows
+        if not (self._rows_per_message or self._length_per_message):
+            return all_rows
+        if self._rows_per_message:
+            return _chunk_list(all_rows, self._rows_per_message)
+        # Assume length per message
+        return _chunk_list_by_length(all_rows, self._length_per_message, self._prefix, self._suffix)
+
+    def format_page(self, row_list: List[DapperRow]) -> str:
+        '''
+        Join a list of DapperRow objects into a formatted string,
+        collapsing double newlines if set.
+        '''
+        combined = '\n'.join(i.content for i in row_list)
+        if not self.collapse_newlines:
+            return combined
+        combined = sub(r'\n{2,}', '\n', combined)
+        combined = combined.strip('\n')
+        return combined
+
+    def render(self) -> List[str] | str:
+        '''
+        Render table output. Returns a string if no pagination is set,
+        or a list of strings if paginated.
+        '''
+        # If no pagination options given
+        if not (self._rows_per_message or self._length_per_message):
+            output = self.format_page(self._header_rows + self._rows)
+            return f'{self._prefix}{self._enclosure_start}{output}{self._enclosure_end}{self._suffix}'
+
+        split_rows = self.get_pages()
+        split_output = []
+        for i, sr in enumerate(split_rows):
+            page_output = self.format_page(sr)
+            # Wrap content with enclosure
+            page_output = f'{self._enclosure_start}{page_output}{self._enclosure_end}'
+            # Add prefix to first page (before enclosure)
+            if i == 0 and self._prefix:
+                page_output = f'{self._prefix}{page_output}'
+            # Add suffix to last page (after enclosure)
+            if i == len(split_rows) - 1 and self._suffix:
+                page_output = f'{page_output}{self._suffix}'
+            split_output.append(page_output)
+        return split_output
+
+
+# Addition, not in dappertable 1.1.5: auto width columns
+
+def column_widths(headers: List[Column], rows: List[List[str]], separator: str, length_per_message: int | None) -> List[int]:
+    '''
+    Column widths, auto width columns use the percentile of their value widths
+    '''
+    widths = [col.width for col in headers]
+    auto = [count for (count, col) in enumerate(headers) if col.auto_width]
+    for count in auto:
+        col = headers[count]
+        width = max(string_width(col.name), len(str(len(rows))) if col.zero_pad else 0)
+        value_widths = sorted(min(string_width(str(row[count])), col.width) for row in rows)
+        if value_widths:
+            width = max(width, value_widths[ceil(len(value_widths) * col.percentile / 100) - 1])
+        widths[count] = min(width, col.width)
+    if not length_per_message or not auto:
+        return widths
+    excess = sum(widths) + string_width(separator) * (len(widths) - 1) - length_per_message
+    while excess > 0:
+        count = max(auto, key=lambda i: widths[i])
+        if widths[count] <= 1:
+            break
+        widths[count] -= 1
+        excess -= 1
+    return widths
+
+
+def render(rows: List[List[str] | str], columns: Columns = None, **kwargs) -> List[str] | str:
+    '''
+    Render rows, same arguments and output as DapperTable
+    '''
+    table = ReferenceTable(columns=columns, **kwargs)
+    if table._headers:
+        # Addition: auto width columns get their width from all rows before anything is formatted
+        widths = column_widths(table._headers, rows, table._separator, table._length_per_message)
+        table._headers = [replace(col, width=width) for (col, width) in zip(table._headers, widths)]
+        table._header_rows = table._generate_headers()
+    for row in rows:
+        table._validate_row(row)
+    # Addition: rows are formatted once with the final row count, so zero padding
+    # matches the digit count of the row count on every row
+    table._rows = rows
+    table._rows = [table._format_row(row) if table._headers else DapperRow(row, row) for row in rows]
+    return table.render()
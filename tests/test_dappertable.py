@@ -1,8 +1,16 @@
+import io
+import subprocess
+import sys
+
 import pytest
 
 from dappertable import shorten_string, format_string_length, string_width
 from dappertable import DapperRow, DapperTable, Column, Columns, DapperTableError
-from dappertable import PaginationRows, PaginationLength
+from dappertable import PaginationRows, PaginationLength, PaginationTarget
+from dappertable import DapperTableView, _chunk_list_by_length
+from dappertable import add_stats_hook, remove_stats_hook, pack_tables
+from dappertable import enable_page_cache, disable_page_cache, page_cache_info, PageCacheInfo
+from dappertable import _batch, _width
 
 def test_shorten_string():
     input = 'Some string 123 other text'
@@ -352,7 +360,9 @@ def test_cjk_spacing_multi_column():
                      '6  || 2:36:14  || Crystal Night                                   || 1986 OMEGA TRIBE - Topic'
 
 def test_wcwidth_fallback(mocker):
-    mocker.patch('dappertable.wcswidth', return_value=-1)
+    # Treat every character as complex so wcswidth is used
+    mocker.patch('dappertable._width.measure', return_value=(None, 0))
+    mocker.patch('dappertable._core.wcswidth', return_value=-1)
     assert string_width('abcd') == 4
     assert string_width('ファッシネイション') == 9
 
@@ -381,6 +391,20 @@ def test_format_page():
     pages[1][0].edit('')
     assert x.format_page(pages[1]) == '1  || foo1'
 
+def test_render_page():
+    x = DapperTable(columns=Columns([Column('pos', 3, zero_pad=True), Column('name', 15)]),
+                    pagination_options=PaginationLength(25), prefix='Queue\n', suffix='\nend')
+    for count in range(3):
+        x.add_row([count, f'foo{count}'])
+    assert x.page_count == len(x.render()) == 3
+    assert [x.render_page(i) for i in range(x.page_count)] == x.render()
+    with pytest.raises(DapperTableError) as error:
+        x.render_page(3)
+    assert 'Invalid page index given 3' in str(error.value)
+    y = DapperTable(suffix='\nend')
+    assert y.page_count == 1
+    assert y.render_page(0) == y.render() == '\nend'
+
 def test_dapper_row():
     x = DapperRow('foo', 'foo')
     assert len(x) == 3
@@ -601,3 +625,859 @@ def test_len():
     x.add_row('foo')
     x.add_row('bar')
     assert len(x) == 2
+
+def test_view_sort_and_filter():
+    headers = [
+        Column('pos', 3),
+        Column('title', 6),
+        Column('uploader', 8),
+    ]
+    x = DapperTable(columns=Columns(headers))
+    x.add_row(['1', 'delta', 'foo'])
+    x.add_row(['2', 'alpha', 'bar'])
+    x.add_row(['3', 'charlie', 'foo'])
+    sorted_view = DapperTableView(x, sort_key=lambda values: values[1])
+    filtered_view = DapperTableView(x, row_filter=lambda values: values[2] == 'foo',
+                                    pagination_options=PaginationRows(2))
+    assert sorted_view.indexes == [1, 2, 0]
+    assert sorted_view.render() == 'pos|| title || uploader\n'\
+                                   '-----------------------\n'\
+                                   '2  || alpha || bar\n'\
+                                   '3  || char..|| foo\n'\
+                                   '1  || delta || foo'
+    assert filtered_view.render() == ['pos|| title || uploader\n-----------------------',
+                                      '1  || delta || foo\n3  || char..|| foo']
+    assert len(filtered_view) == 2
+    assert filtered_view.size == 2
+    # Views share the formatted rows of the base table
+    assert sorted_view.get_pages()[2] is x.get_pages()[3]
+
+def test_view_follows_base_table():
+    x = DapperTable()
+    x.add_row('b')
+    x.add_row('d')
+    view = DapperTableView(x, sort_key=lambda value: value, row_filter=lambda value: value != 'skip')
+    x.add_row('a')
+    x.add_row('skip')
+    x.add_row('c')
+    assert view.render() == 'a\nb\nc\nd'
+    assert view.indexes == [2, 0, 4, 1]
+    x.edit_row(0, 'e')
+    assert view.render() == 'a\nc\nd\ne'
+    x.edit_row(3, 'f')
+    assert view.render() == 'a\nc\nd\ne\nf'
+    x.remove_row(1)
+    assert view.render() == 'a\nc\ne\nf'
+    assert view.indexes == [1, 3, 0, 2]
+    x.remove_row(-1)
+    assert view.render() == 'a\ne\nf'
+    x.edit_row(0, 'skip')
+    assert view.render() == 'a\nf'
+
+def test_view_ties_keep_table_order():
+    x = DapperTable()
+    for value in ['b1', 'a1', 'b2', 'a2']:
+        x.add_row(value)
+    view = DapperTableView(x, sort_key=lambda value: value[0])
+    x.add_row('a3')
+    x.edit_row(0, 'b0')
+    assert view.render() == 'a1\na2\na3\nb0\nb2'
+
+def test_view_no_sort_key():
+    x = DapperTable(pagination_options=PaginationLength(10))
+    x.add_row('1234')
+    view = DapperTableView(x, pagination_options=PaginationRows(1), prefix='>')
+    x.add_row('5678')
+    assert x.render() == ['1234\n5678']
+    assert view.render() == ['>1234', '5678']
+
+def test_insert_row():
+    x = DapperTable()
+    x.add_row('a')
+    x.add_row('c')
+    assert x.insert_row(1, 'b') == 1
+    assert x.insert_row(3, 'd') == 3
+    assert x.insert_row(0, 'start') == 0
+    assert x.render() == 'start\na\nb\nc\nd'
+    with pytest.raises(DapperTableError) as error:
+        x.insert_row(6, 'foo')
+    assert 'Invalid insert index given 6' in str(error.value)
+    with pytest.raises(DapperTableError) as error:
+        x.insert_row(-1, 'foo')
+    assert 'Index must be positive number' in str(error.value)
+
+def test_move_row():
+    x = DapperTable()
+    for value in ['a', 'b', 'c', 'd']:
+        x.add_row(value)
+    x.move_row(3, 1)
+    assert x.render() == 'a\nd\nb\nc'
+    x.move_row(0, 3)
+    assert x.render() == 'd\nb\nc\na'
+    x.move_row(2, 2)
+    assert x.render() == 'd\nb\nc\na'
+    with pytest.raises(DapperTableError) as error:
+        x.move_row(4, 0)
+    assert 'Invalid move index given 4' in str(error.value)
+    with pytest.raises(DapperTableError) as error:
+        x.move_row(0, 4)
+    assert 'Invalid move index given 4' in str(error.value)
+
+def test_move_row_updates_views():
+    x = DapperTable()
+    for value in ['a', 'b', 'c']:
+        x.add_row(value)
+    view = DapperTableView(x, row_filter=lambda value: value != 'b')
+    x.move_row(2, 0)
+    assert view.render() == 'c\na'
+    assert view.indexes == [0, 1]
+
+def test_zero_pad_insert_and_remove():
+    headers = [
+        Column('pos', 3, zero_pad=True),
+        Column('name', 5)
+    ]
+    x = DapperTable(columns=Columns(headers))
+    for count in range(9):
+        x.add_row([count, 'foo'])
+    assert '0  || foo' in x.render()
+    # Tenth row pads every row, including the last one
+    x.insert_row(0, [9, 'bar'])
+    assert x.render().split('\n')[2:4] == ['09 || bar', '00 || foo']
+    assert x.render().split('\n')[-1] == '08 || foo'
+    x.remove_row(0)
+    assert x.render().split('\n')[2] == '0  || foo'
+
+def test_zero_pad_all_rows_match_row_count():
+    headers = [
+        Column('pos', 3, zero_pad=True),
+        Column('name', 5)
+    ]
+    x = DapperTable(columns=Columns(headers))
+    for count in range(10):
+        x.add_row([count, 'foo'])
+    assert x.render().split('\n')[-1] == '09 || foo'
+
+def test_length_pagination_follows_row_changes():
+    headers = [
+        Column('pos', 3),
+        Column('name', 6)
+    ]
+    x = DapperTable(columns=Columns(headers), pagination_options=PaginationLength(30),
+                    prefix='Queue\n', suffix='\nend')
+    for count in range(20):
+        x.add_row([str(count), 'foo'])
+    x.render()
+    x.move_row(15, 1)
+    x.insert_row(10, ['new', 'bar'])
+    x.edit_row(12, ['12', 'foobar'])
+    x.remove_row(3)
+    x.add_row(['last', 'baz'])
+
+    expected = DapperTable(columns=Columns(headers), pagination_options=PaginationLength(30),
+                           prefix='Queue\n', suffix='\nend')
+    for row in x._rows:
+        expected.add_row(row.input_values)
+    assert x.render() == expected.render()
+    # Unchanged tables reuse the cached pages
+    assert x.render() == expected.render()
+
+def test_length_pagination_view_follows_row_changes():
+    x = DapperTable()
+    for count in range(30):
+        x.add_row(f'row {count:02}')
+    view = DapperTableView(x, sort_key=lambda value: value[-1], pagination_options=PaginationLength(20))
+    view.render()
+    x.edit_row(5, 'row 5')
+    x.remove_row(20)
+    x.add_row('new')
+
+    rows = sorted((row.content for row in x._rows), key=lambda value: value[-1])
+    expected = DapperTable(pagination_options=PaginationLength(20))
+    for row in rows:
+        expected.add_row(row)
+    assert view.render() == expected.render()
+
+def test_chunk_list_by_length():
+    rows = [DapperRow('1234', '1234'), DapperRow('1234', '1234'), DapperRow('1234', '1234')]
+    assert _chunk_list_by_length(rows, 10, prefix='>', suffix='<') == [rows[0:2], rows[2:3]]
+    assert _chunk_list_by_length(rows, 10, prefix='>', suffix='<<<<<<<') == [rows[0:2], rows[2:3], []]
+
+def test_dapper_row_width():
+    x = DapperRow('日本語', '日本語')
+    assert x.width == 6
+    x.edit('foo')
+    assert x.width == 3
+
+def test_length_pagination_reuses_later_pages():
+    x = DapperTable(pagination_options=PaginationLength(20))
+    for count in range(30):
+        x.add_row(f'row {count:02}')
+    x.render()
+    x.edit_row(10, 'row 99')
+    assert x.render()[3] == 'row 09\nrow 99\nrow 11'
+    x.edit_row(10, 'row ten')
+    x.remove_row(20)
+    x.insert_row(21, 'new row')
+    rows = [row.content for row in x._rows]
+    expected = DapperTable(pagination_options=PaginationLength(20))
+    for row in rows:
+        expected.add_row(row)
+    assert x.render() == expected.render()
+
+def test_length_pagination_follows_raw_edits():
+    x = DapperTable(pagination_options=PaginationLength(12))
+    view = DapperTableView(x, pagination_options=PaginationLength(12))
+    for count in range(6):
+        x.add_row(f'row{count}')
+    assert x.render() == ['row0\nrow1', 'row2\nrow3', 'row4\nrow5']
+    assert view.render() == x.render()
+    x.get_pages()[0][0].edit('x' * 11)
+    # Cached page bounds are dropped after raw edits
+    assert x.render() == ['x' * 11, 'row1\nrow2', 'row3\nrow4', 'row5']
+    assert view.render() == x.render()
+
+def test_zero_pad_reformat_updates_views():
+    headers = [
+        Column('pos', 3, zero_pad=True),
+        Column('name', 5)
+    ]
+    x = DapperTable(columns=Columns(headers))
+    for count in range(9):
+        x.add_row([str(count), 'foo'])
+    view = DapperTableView(x, row_filter=lambda values: values[0] == '1', pagination_options=PaginationLength(50))
+    assert view.render() == ['pos|| name\n----------\n1  || foo']
+    x.add_row(['9', 'bar'])
+    assert view.render() == ['pos|| name\n----------\n01 || foo']
+
+class WriteCounter():
+    def __init__(self):
+        self.writes = []
+
+    def write(self, text):
+        self.writes.append(text)
+
+def test_render_to_no_pagination():
+    x = DapperTable(prefix='[', suffix=']', enclosure_start='<', enclosure_end='>')
+    x.add_row('\n')
+    x.add_row('')
+    x.add_row('foo\n\n\nbar')
+    x.add_row('')
+    x.add_row('baz\n')
+    output = io.StringIO()
+    assert x.render_to(output) == 1
+    assert output.getvalue() == x.render()
+
+    x.collapse_newlines = False
+    output = io.StringIO()
+    x.render_to(output)
+    assert output.getvalue() == x.render()
+
+def test_render_to_pages():
+    headers = [
+        Column('pos', 3),
+        Column('name', 12),
+    ]
+    x = DapperTable(columns=Columns(headers), pagination_options=PaginationLength(40),
+                    prefix='Queue\n', suffix='\nend', enclosure_start='```\n', enclosure_end='\n```')
+    for count in range(20):
+        x.add_row([str(count), 'ファッシネイション'])
+    output = io.BytesIO()
+    assert x.render_to(output, page_delimiter='\n\n') == len(x.render())
+    assert output.getvalue().decode('utf-8') == '\n\n'.join(x.render())
+
+    x = DapperTable(pagination_options=PaginationRows(1))
+    for count in range(10):
+        x.add_row(f'row {count}')
+    output = WriteCounter()
+    x.render_to(output, buffer_size=10)
+    assert ''.join(output.writes) == '\n'.join(x.render())
+    assert len(output.writes) == 5
+
+    # Rows of a page are streamed, the page is never written as one string
+    x = DapperTable(pagination_options=PaginationRows(100), prefix='Queue\n', enclosure_start='```\n')
+    x.add_rows([f'row {count}' for count in range(100)])
+    output = WriteCounter()
+    assert x.render_to(output, buffer_size=1) == 1
+    assert ''.join(output.writes) == x.render()[0]
+    assert max(len(text) for text in output.writes) == len('Queue\n')
+
+def test_render_to_empty():
+    x = DapperTable(pagination_options=PaginationRows(1))
+    output = WriteCounter()
+    assert x.render_to(output) == 0
+    assert not output.writes
+
+def test_auto_width_column():
+    headers = [
+        Column('pos', 3),
+        Column('title', 20, auto_width=True),
+        Column('uploader', 10),
+    ]
+    x = DapperTable(columns=Columns(headers))
+    x.add_row(['1', 'foo', 'bar'])
+    assert x.render() == 'pos|| title|| uploader\n'\
+                         '----------------------\n'\
+                         '1  || foo  || bar'
+    x.add_row(['2', '日本語は', 'bar'])
+    assert x.render() == 'pos|| title   || uploader\n'\
+                         '-------------------------\n'\
+                         '1  || foo     || bar\n'\
+                         '2  || 日本語は    || bar'
+    # Values are truncated at the max width
+    x.add_row(['3', 'a' * 30, 'bar'])
+    assert x.render().split('\n')[-1] == f'3  || {"a" * 18}..|| bar'
+    x.remove_row(2)
+    x.edit_row(1, ['2', 'foobar', 'bar'])
+    assert x.render() == 'pos|| title || uploader\n'\
+                         '-----------------------\n'\
+                         '1  || foo   || bar\n'\
+                         '2  || foobar|| bar'
+
+def test_auto_width_percentile():
+    headers = [
+        Column('t', 20, auto_width=True, percentile=50),
+        Column('u', 3),
+    ]
+    x = DapperTable(columns=Columns(headers))
+    x.add_row(['aa', 'x'])
+    x.add_row(['aaaa', 'x'])
+    x.add_row(['aaaaaaaaaa', 'x'])
+    assert x.render() == 't   || u\n'\
+                         '--------\n'\
+                         'aa  || x\n'\
+                         'aaaa|| x\n'\
+                         'aa..|| x'
+    with pytest.raises(DapperTableError) as error:
+        Column('t', 20, auto_width=True, percentile=0)
+    assert 'Invalid value for column percentile: 0' in str(error.value)
+
+def test_auto_width_zero_pad():
+    headers = [
+        Column('#', 5, zero_pad=True, auto_width=True),
+        Column('name', 5),
+    ]
+    x = DapperTable(columns=Columns(headers))
+    for count in range(10):
+        x.add_row([str(count), 'foo'])
+    assert x.render().split('\n')[:3] == ['# || name', '---------', '00|| foo']
+
+def test_auto_width_length_budget():
+    headers = [
+        Column('a', 20, auto_width=True),
+        Column('b', 20, auto_width=True),
+        Column('c', 4),
+    ]
+    x = DapperTable(columns=Columns(headers), pagination_options=PaginationLength(25))
+    x.add_row(['a' * 20, 'b' * 10, 'cccc'])
+    # 25 columns of space, minus 6 for separators and 4 for the fixed column
+    assert x._widths == [7, 8, 4]
+    assert x.render() == ['a      || b       || c', '----------------------', 'aaaaa..|| bbbbbb..|| cccc']
+
+    x = DapperTable(columns=Columns(headers), pagination_options=PaginationLength(8))
+    x.add_row(['a', 'b', 'cccc'])
+    assert x._widths == [1, 1, 4]
+
+def test_table_stats():
+    headers = [
+        Column('pos', 3, zero_pad=True),
+        Column('name', 5),
+    ]
+    x = DapperTable(columns=Columns(headers), pagination_options=PaginationRows(5), stats=True)
+    for count in range(10):
+        x.add_row([str(count), 'foo'])
+    x.render()
+    assert x.stats.counts['format_row'] == 19
+    assert x.stats.counts['reformat'] == 9
+    assert x.stats.counts['shorten_string'] == 38
+    assert x.stats.counts['format_string_length'] == 38
+    assert x.stats.counts['paginate'] == 3
+    assert x.stats.counts['format_page'] == 3
+    assert x.stats.seconds['format_row'] > 0
+    x.stats.reset()
+    assert not x.stats.counts
+    assert not x.stats.seconds
+
+def test_table_stats_disabled():
+    x = DapperTable(pagination_options=PaginationLength(10))
+    x.add_row('foo')
+    x.render()
+    assert x.stats is None
+
+def test_stats_hook():
+    calls = []
+    def hook(table, name, count, seconds):
+        calls.append((table, name, count))
+    add_stats_hook(hook)
+    try:
+        x = DapperTable(pagination_options=PaginationLength(10))
+        x.add_row('foo')
+        x.render()
+    finally:
+        remove_stats_hook(hook)
+    assert calls == [(x, 'paginate', 1), (x, 'format_page', 1)]
+    x.render()
+    assert len(calls) == 2
+    with pytest.raises(DapperTableError) as error:
+        remove_stats_hook(hook)
+    assert 'Stats hook was not added' in str(error.value)
+
+def test_wcwidth_loaded_on_demand():
+    code = 'import sys\n'\
+           'from dappertable import DapperTable, Column, Columns\n'\
+           'x = DapperTable(columns=Columns([Column("pos", 3), Column("name", 5)]), prefix="foo")\n'\
+           'x.add_row(["1", "foobar"])\n'\
+           'x.render()\n'\
+           'assert "wcwidth" not in sys.modules\n'\
+           'x.add_row(["2", "日本語"])\n'\
+           'assert "wcwidth" in sys.modules\n'
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+def test_header_rows_reused():
+    columns = Columns([Column('pos', 3), Column('name', 5)])
+    x = DapperTable(columns=columns)
+    y = DapperTable(columns=columns)
+    assert x._header_rows[0].content is y._header_rows[0].content
+    # Rows are separate objects so editing one table does not change the other
+    x._header_rows[0].edit('foo')
+    assert y._header_rows[0].content == 'pos|| name'
+
+def test_string_width_ascii():
+    assert string_width('foo bar') == 7
+    assert string_width('foo\tbar') == 7
+    assert shorten_string('foo bar baz', 6) == 'foo ..'
+    assert shorten_string('foo bar baz', 1) == '..'
+    assert format_string_length('foo', 10) == 10
+
+def test_width_lookup():
+    # Wide characters in and above the BMP are added up from the lookup table
+    assert string_width('日本語\U00020000') == 8
+    assert format_string_length('日本語\U00020000', 10) == 7
+    assert shorten_string('日本語\U00020000', 6) == '日本..'
+    assert shorten_string('日本語\U00020000', 6, placeholder='\t') == '日本語\t'
+    assert shorten_string('\U00020000\U00020000日', 4, placeholder='.') == '\U00020000.'
+    assert _width.cut_index('日本', 10) == 2
+    # Combining marks and paired emoji are measured with wcwidth
+    assert string_width('é') == 1
+    assert string_width('\U0001F1EF\U0001F1F5') == 2
+    assert string_width('\U0001F44D\U0001F3FB') == 2
+    assert string_width('foo\x85') == 4
+    assert shorten_string('ééé', 2, placeholder='.') == 'é.'
+
+def test_row_width_from_columns():
+    x = DapperTable(columns=Columns([Column('pos', 3), Column('name', 10)]))
+    x.add_row(['1', '日本語'])
+    x.add_row(['2', 'é'])
+    x.add_row(['3', ''])
+    # Rows with only simple characters get their width while formatting
+    assert x._rows[0]._width == string_width(x._rows[0].content)
+    assert x._rows[1]._width is None
+    assert x._rows[1].width == string_width(x._rows[1].content)
+    assert x._rows[2]._width == string_width(x._rows[2].content) == 5
+
+def test_add_rows():
+    columns = Columns([Column('pos', 3, zero_pad=True), Column('name', 6)])
+    x = DapperTable(columns=columns, pagination_options=PaginationLength(100))
+    y = DapperTable(columns=columns, pagination_options=PaginationLength(100))
+    view = DapperTableView(x, sort_key=lambda row: row[1])
+    rows = [[str(i), f'日本 {i}'] for i in range(150)] + [['150', 'é'], ['151', 'foo\x85']]
+    assert x.add_rows(rows) == 0
+    for row in rows:
+        y.add_row(row)
+    assert x.render() == y.render()
+    assert x._rows[-1].content == '151|| foo\x85'
+    assert view.indexes[:2] == [151, 150]
+    x.render()
+    assert x.add_rows([['a', 'b']]) == 152
+    y.add_row(['a', 'b'])
+    assert x.render() == y.render()
+
+def test_add_rows_no_headers():
+    x = DapperTable()
+    assert x.add_rows(['foo', 'bar']) == 0
+    assert x.render() == 'foo\nbar'
+    with pytest.raises(DapperTableError) as error:
+        DapperTable(columns=Columns([Column('pos', 3)])).add_rows([['1'], '2'])
+    assert 'Row input must be list if headers were given' in str(error.value)
+
+def test_add_rows_batch_matches_python(mocker):
+    pytest.importorskip('numpy')
+    columns = Columns([Column('pos', 3, zero_pad=True), Column('name', 5), Column('tag', 4)])
+    rows = [[str(i), 'サンセット・ロード' if i % 2 else f'foo {i}', f'\U00020000{i}'] for i in range(200)]
+    x = DapperTable(columns=columns, stats=True)
+    x.add_rows(rows)
+    assert x.stats.counts['batch_measure'] == 600
+    mocker.patch('dappertable._batch.numpy_module', return_value=None)
+    y = DapperTable(columns=columns, stats=True)
+    y.add_rows(rows)
+    assert 'batch_measure' not in y.stats.counts
+    assert x.render() == y.render()
+    assert [row.width for row in x._rows] == [row.width for row in y._rows]
+
+def test_batch_fallbacks(mocker):
+    pytest.importorskip('numpy')
+    # Complex placeholders leave every cell to the python path
+    assert _batch.fit_column(['foo', '日本'], 1, placeholder='\t') == [None, None]
+    assert _batch.fit_column(['foo', 'e\u0301', '日本語'], 4) == [('foo', 3, 0, True), None, ('日..', 4, 1, True)]
+    mocker.patch.dict(sys.modules, {'numpy': None})
+    _batch.numpy_module.cache_clear()
+    try:
+        assert _batch.numpy_module() is None
+    finally:
+        _batch.numpy_module.cache_clear()
+
+def test_pack_tables():
+    first = DapperTable(columns=Columns([Column('pos', 3), Column('name', 5)]),
+                        pagination_options=PaginationLength(50), prefix='Now\n',
+                        enclosure_start='```\n', enclosure_end='\n```')
+    first.add_row(['1', 'foo'])
+    second = DapperTable(pagination_options=PaginationRows(1), prefix='Queue\n')
+    second.add_row('bar')
+    second.add_row('baz')
+    third = DapperTable()
+    third.add_row('x' * 20)
+    view = DapperTableView(second, sort_key=lambda row: row != 'baz')
+    assert pack_tables([first, second, third, view], PaginationLength(50)) == [
+        'Now\n```\npos|| name\n----------\n1  || foo\n```',
+        'Queue\nbar\nbaz\nxxxxxxxxxxxxxxxxxxxx\nbaz\nbar',
+    ]
+    # Tables are paginated by the shared length, not their own pagination
+    assert pack_tables([second, third], PaginationLength(40), joiner='\n\n') == ['Queue\nbar\nbaz\n\nxxxxxxxxxxxxxxxxxxxx']
+    assert not pack_tables([], PaginationLength(40))
+
+def test_pack_tables_splits_pages():
+    rows = [f'{count:03} ' + 'x' * 26 for count in range(100)]
+    x = DapperTable(prefix='Queue\n', suffix='\nend', enclosure_start='```\n', enclosure_end='\n```')
+    y = DapperTable(pagination_options=PaginationRows(100))
+    for table in (x, y):
+        table.add_rows(rows)
+    z = DapperTable(pagination_options=PaginationLength(2000), prefix='Queue\n', suffix='\nend',
+                    enclosure_start='```\n', enclosure_end='\n```')
+    z.add_rows(rows)
+    # Unpaginated tables and pages over the limit are split like a table paginated by the shared length
+    assert pack_tables([x], PaginationLength(2000)) == z.render()
+    assert len(z.render()) == 2
+    messages = pack_tables([x, y], PaginationLength(2000))
+    assert all(string_width(message) <= 2000 for message in messages)
+    assert '\n'.join(messages).count('x' * 26) == 200
+    assert len(messages) == 4
+
+def test_pack_tables_wide_characters():
+    x = DapperTable()
+    y = DapperTable()
+    for table in (x, y):
+        table.add_rows(['中文中文', '中文'])
+    z = DapperTable(pagination_options=PaginationLength(20))
+    z.add_rows(['中文中文', '中文', '中文中文', '中文'])
+    # Pages are measured by display width, like a single table with the same rows
+    assert pack_tables([x, y], PaginationLength(20)) == z.render()
+    assert len(z.render()) == 2
+    assert pack_tables([x, y], PaginationLength(40), joiner='\n中文\n') == ['中文中文\n中文\n中文\n中文中文\n中文']
+    assert pack_tables([x, y], PaginationLength(30), joiner='\n中文\n') == ['中文中文\n中文', '中文中文\n中文']
+
+def test_pack_tables_errors():
+    x = DapperTable()
+    x.add_row('x' * 20)
+    with pytest.raises(DapperTableError) as error:
+        pack_tables([x], PaginationLength(10))
+    assert f'Length of input "{"x" * 20}" is greater than max length 10' in str(error.value)
+    y = DapperTable(prefix='x' * 20)
+    with pytest.raises(DapperTableError) as error:
+        pack_tables([y], PaginationLength(10))
+    assert 'Prefix length (20) exceeds pagination length (10)' in str(error.value)
+    with pytest.raises(DapperTableError) as error:
+        pack_tables([x], PaginationRows(10))
+    assert 'Packing tables requires length pagination' in str(error.value)
+
+def test_batch():
+    x = DapperTable(columns=Columns([Column('pos', 3, zero_pad=True), Column('name', 5)]),
+                    pagination_options=PaginationRows(4), stats=True)
+    for i in range(9):
+        x.add_row([str(i), f'foo {i}'])
+    view = DapperTableView(x, sort_key=lambda row: row[1], row_filter=lambda row: row[1] != 'bar')
+    x.render()
+    x.stats.reset()
+    with x.batch() as batch:
+        assert batch.add_row(['9', 'new']) == 9
+        assert batch.add_row(['12', 'last']) == 10
+        assert batch.insert_row(0, ['10', 'first']) == 0
+        assert batch.edit_row(10, ['11', 'bar'])
+        assert batch.remove_row(-2)
+        assert batch.remove_row(1)
+    # Zero padding grew once for the final row count, so every row is formatted one time
+    assert x.stats.counts['reformat'] == 10
+    assert x.stats.counts['format_row'] == 10
+    assert batch.changed_pages == [0, 1, 2]
+    assert x.render() == [
+        'pos|| name\n----------\n10 || first\n01 || foo 1',
+        '02 || foo 2\n03 || foo 3\n04 || foo 4\n05 || foo 5',
+        '06 || foo 6\n07 || foo 7\n08 || foo 8\n12 || last',
+    ]
+    assert view.indexes == [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
+
+    with x.batch() as batch:
+        batch.edit_row(8, ['8', 'bar'])
+    assert batch.changed_pages == [2]
+    assert x.stats.counts['format_row'] == 11
+    assert view.indexes == [0, 1, 2, 3, 4, 5, 6, 7, 9]
+
+def test_batch_errors():
+    x = DapperTable(columns=Columns([Column('pos', 3)]))
+    x.add_row(['1'])
+    batch = x.batch()
+    with pytest.raises(DapperTableError) as error:
+        batch.insert_row(2, ['2'])
+    assert 'Invalid insert index given 2' in str(error.value)
+    with pytest.raises(DapperTableError) as error:
+        batch.edit_row(-1, ['2'])
+    assert 'Index must be positive number' in str(error.value)
+    with pytest.raises(DapperTableError) as error:
+        batch.remove_row(1)
+    assert 'Invalid deletion index' in str(error.value)
+    with pytest.raises(DapperTableError) as error:
+        batch.add_row('2')
+    assert 'Row input must be list if headers were given' in str(error.value)
+    batch.add_row(['2'])
+    x.add_row(['3'])
+    with pytest.raises(DapperTableError) as error:
+        batch.commit()
+    assert 'Table was changed outside of batch' in str(error.value)
+
+    y = DapperTable(pagination_options=PaginationLength(20))
+    with pytest.raises(ValueError):
+        with y.batch() as batch:
+            batch.add_row('foo')
+            raise ValueError('test')
+    assert not y.size
+    with y.batch() as batch:
+        batch.add_row('foo')
+        batch.add_row('bar')
+    assert batch.changed_pages == [0]
+    assert y.render() == ['foo\nbar']
+    with y.batch() as batch:
+        batch.remove_row(0)
+        batch.remove_row(0)
+    assert not batch.changed_pages
+    assert not y.render()
+    # Batch fixing a row that was too long to paginate is still applied
+    y.add_row('foo bar baz foo bar baz')
+    with y.batch() as batch:
+        batch.edit_row(0, 'foo')
+        batch.add_row('bar')
+    assert batch.changed_pages == [0]
+    assert y.render() == ['foo\nbar']
+
+def test_batch_no_pagination():
+    x = DapperTable()
+    x.add_row('foo')
+    with x.batch() as batch:
+        batch.edit_row(0, 'bar')
+    assert batch.changed_pages == [0]
+    assert x.render() == 'bar'
+
+def test_update_cell():
+    x = DapperTable(columns=Columns([Column('pos', 3, zero_pad=True), Column('name', 6), Column('status', 6)]),
+                    pagination_options=PaginationLength(100), stats=True)
+    view = DapperTableView(x, sort_key=lambda row: row[2])
+    for i in range(3):
+        x.add_row([str(i), f'foo {i}', '0%'])
+    x.render()
+    x.stats.reset()
+    assert x.update_cell(1, 'status', '50%')
+    assert x.update_cell(2, 2, 'done 日本語')
+    # Only the changed cells are formatted again
+    assert x.stats.counts['shorten_string'] == 2
+    assert 'format_row' not in x.stats.counts
+    assert x.render() == ['pos|| name  || status\n---------------------\n0  || foo 0 || 0%\n1  || foo 1 || 50%',
+                          '2  || foo 2 || done..']
+    assert x._rows[2].width == string_width(x._rows[2].content)
+    assert view.indexes == [0, 1, 2]
+    # Zero pad columns can change every row, so the whole row is edited
+    x.update_cell(0, 'pos', '100')
+    assert x.render() == ['pos|| name  || status\n---------------------\n100|| foo 0 || 0%\n1  || foo 1 || 50%',
+                          '2  || foo 2 || done..']
+
+def test_update_column():
+    x = DapperTable(columns=Columns([Column('pos', 3), Column('name', 10, auto_width=True), Column('status', 6)]),
+                    pagination_options=PaginationRows(2))
+    view = DapperTableView(x, sort_key=lambda row: row[2])
+    x.add_rows([[str(i), 'foo', '0%'] for i in range(3)])
+    x.render()
+    assert x.update_column('status', ['10%', '0%', '20%'])
+    assert view.indexes == [1, 0, 2]
+    assert x.update_column(1, ['foobar', 'foo', 'foo'])
+    assert x.render() == ['pos|| name  || status\n---------------------',
+                          '0  || foobar|| 10%\n1  || foo   || 0%', '2  || foo   || 20%']
+    assert x.update_column(2, ['10%', '0%', '20%'])
+    assert x.render() == ['pos|| name  || status\n---------------------',
+                          '0  || foobar|| 10%\n1  || foo   || 0%', '2  || foo   || 20%']
+
+def test_update_column_batch():
+    pytest.importorskip('numpy')
+    x = DapperTable(columns=Columns([Column('pos', 3), Column('status', 4)]))
+    y = DapperTable(columns=Columns([Column('pos', 3), Column('status', 4)]))
+    rows = [[str(i), '0%'] for i in range(200)]
+    x.add_rows(rows)
+    y.add_rows(rows)
+    values = ['日本語' if i % 2 else 'é' for i in range(200)]
+    x.update_column('status', values)
+    for (i, value) in enumerate(values):
+        y.edit_row(i, [str(i), value])
+    assert x.render() == y.render()
+
+def test_update_column_auto_width():
+    x = DapperTable(columns=Columns([Column('pos', 3), Column('title', 12), Column('name', 20, auto_width=True)]),
+                    pagination_options=PaginationLength(20))
+    x.add_rows([['1', 'foo', 'foo bar baz'], ['2', 'bar', 'foo']])
+    # Changing columns that affect layout does not paginate, only rendering raises
+    assert x.update_column('name', ['foo', 'bar'])
+    with pytest.raises(DapperTableError) as error:
+        x.render()
+    assert 'is greater than max length 20' in str(error.value)
+    y = DapperTable(columns=Columns([Column('pos', 3), Column('title', 12), Column('name', 20, auto_width=True)]),
+                    pagination_options=PaginationLength(20))
+    y.add_rows([['1', 'foo', 'foo'], ['2', 'bar', 'bar']])
+    assert [row.content for row in x._rows] == [row.content for row in y._rows]
+
+def test_update_cell_errors():
+    x = DapperTable(columns=Columns([Column('pos', 3)]))
+    x.add_row(['1'])
+    with pytest.raises(DapperTableError) as error:
+        x.update_cell(0, 'name', '2')
+    assert 'Invalid column given name' in str(error.value)
+    with pytest.raises(DapperTableError) as error:
+        x.update_cell(1, 0, '2')
+    assert 'Invalid edit index given 1' in str(error.value)
+    with pytest.raises(DapperTableError) as error:
+        x.update_column(0, ['1', '2'])
+    assert 'Column values must match number of rows' in str(error.value)
+    with pytest.raises(DapperTableError) as error:
+        DapperTable().update_cell(0, 0, 'foo')
+    assert 'Cell updates require columns' in str(error.value)
+
+def test_memory_usage():
+    columns = Columns([Column('pos', 3), Column('name', 10)])
+    x = DapperTable(columns=columns, pagination_options=PaginationLength(100))
+    y = DapperTable(columns=columns, pagination_options=PaginationLength(100), retain_input_values=False)
+    for table in (x, y):
+        for i in range(20):
+            table.add_row([str(i), f'name {i}'])
+        table.render()
+    usage = x.memory_usage()
+    assert usage.content and usage.input_values and usage.segments and usage.rows and usage.headers
+    assert usage.pagination and usage.caches
+    assert usage.total == usage.content + usage.input_values + usage.segments + usage.rows + \
+        usage.headers + usage.caches + usage.pagination
+    retained = y.memory_usage()
+    assert not retained.input_values
+    assert not retained.segments
+    assert retained.content == usage.content
+    assert retained.total < usage.total
+    assert x.render() == y.render()
+    assert y._rows[0].input_values is None
+    # Raw rows use the same string for content and input values, it is only counted once
+    z = DapperTable()
+    z.add_row('foo')
+    assert not z.memory_usage().input_values
+
+def test_retain_input_values():
+    with pytest.raises(DapperTableError) as error:
+        DapperTable(columns=Columns([Column('pos', 3, zero_pad=True)]), retain_input_values=False)
+    assert 'Zero pad and auto width columns require retained input values' in str(error.value)
+    x = DapperTable(columns=Columns([Column('pos', 3), Column('name', 5)]), retain_input_values=False)
+    x.add_rows([['1', 'foo'], ['2', 'bar']])
+    x.insert_row(0, ['0', 'baz'])
+    x.edit_row(1, ['1', 'foo 1'])
+    with x.batch() as batch:
+        batch.add_row(['3', 'new'])
+        batch.remove_row(2)
+    assert x.render() == 'pos|| name\n----------\n0  || baz\n1  || foo 1\n3  || new'
+    assert all(row.input_values is None for row in x._rows)
+    with pytest.raises(DapperTableError) as error:
+        x.update_cell(0, 'name', 'foo')
+    assert 'Row input values are not retained' in str(error.value)
+    with pytest.raises(DapperTableError) as error:
+        DapperTableView(x, sort_key=lambda row: row[1])
+    assert 'Sorted and filtered views require retained input values' in str(error.value)
+    assert DapperTableView(x).render() == x.render()
+    y = DapperTable(retain_input_values=False)
+    y.add_rows(['foo'])
+    y.add_row('bar')
+    assert y.render() == 'foo\nbar'
+    assert y._rows[0].input_values is None
+
+def test_page_cache():
+    assert page_cache_info() == PageCacheInfo()
+    assert not PageCacheInfo().hit_rate
+    enable_page_cache(maxsize=3)
+    try:
+        x = DapperTable(pagination_options=PaginationRows(2), prefix='start\n', enclosure_start='`', enclosure_end='`', stats=True)
+        y = DapperTable(pagination_options=PaginationRows(2), prefix='start\n', enclosure_start='`', enclosure_end='`')
+        for table in (x, y):
+            table.add_rows(['foo', 'bar', 'baz'])
+        assert x.render() == ['start\n`foo\nbar`', '`baz`']
+        assert y.render() == ['start\n`foo\nbar`', '`baz`']
+        # Wrapped pages of the second table come from the cache, one lookup per page
+        info = page_cache_info()
+        assert (info.hits, info.misses, info.size, info.maxsize) == (2, 2, 2, 3)
+        assert info.hit_rate == 0.5
+        assert x.stats.counts['page_cache_miss'] == 2
+        assert x.stats.counts['format_page'] == 2
+        assert x.render() == ['start\n`foo\nbar`', '`baz`']
+        assert page_cache_info().hits == 4
+        # The same rows as a last page get the suffix, so they are cached separately
+        z = DapperTable(pagination_options=PaginationRows(2), suffix='\nend')
+        z.add_rows(['foo', 'bar'])
+        assert z.render() == ['foo\nbar\nend']
+        assert z.format_page(z.get_pages()[0]) == 'foo\nbar'
+        assert z.format_page(z.get_pages()[0]) == 'foo\nbar'
+        # Least recently used pages are dropped over the size limit
+        info = page_cache_info()
+        assert (info.hits, info.misses, info.size) == (5, 4, 3)
+    finally:
+        disable_page_cache()
+    assert page_cache_info() == PageCacheInfo()
+    with pytest.raises(DapperTableError) as error:
+        enable_page_cache(0)
+    assert 'Page cache size must be at least 1' in str(error.value)
+
+def test_pagination_targets():
+    columns = Columns([Column('pos', 3, zero_pad=True), Column('title', 12)])
+    targets = {
+        'message': PaginationTarget(PaginationLength(60), prefix='Queue\n', suffix='\nend'),
+        'embed': PaginationTarget(PaginationLength(90), enclosure_start='```\n', enclosure_end='\n```'),
+        'web': PaginationTarget(PaginationRows(4)),
+    }
+    x = DapperTable(columns=columns, targets=targets, stats=True)
+    references = {name: DapperTable(columns=columns, pagination_options=target.pagination_options,
+                                    prefix=target.prefix, suffix=target.suffix,
+                                    enclosure_start=target.enclosure_start, enclosure_end=target.enclosure_end)
+                  for (name, target) in targets.items()}
+    for table in [x, *references.values()]:
+        table.add_rows([[count, f'禁断のテレパシー {count}'] for count in range(9)])
+    assert x.render_targets() == {name: table.render() for (name, table) in references.items()}
+    assert x.stats.counts['format_row'] == 9
+    # Cached page bounds of every target follow row changes
+    for table in [x, *references.values()]:
+        table.insert_row(2, [2, 'inserted'])
+        table.update_cell(5, 'title', 'updated')
+        table.remove_row(0)
+        table.add_row([10, 'last'])
+    assert x.render_targets() == {name: table.render() for (name, table) in references.items()}
+    # Zero padding width changes reformat every row
+    for table in [x, *references.values()]:
+        table.add_rows([[count, 'more'] for count in range(90)])
+    assert x.render_targets() == {name: table.render() for (name, table) in references.items()}
+
+    web = x.target('web')
+    assert x.targets == {'message': x.target('message'), 'embed': x.target('embed'), 'web': web}
+    assert web.target is targets['web']
+    assert len(web) == web.size == len(x)
+    assert [len(page) for page in web.get_pages()] == [len(page) for page in references['web'].get_pages()]
+    assert x.memory_usage().pagination > DapperTable(columns=columns).memory_usage().pagination
+    with pytest.raises(DapperTableError) as error:
+        x.target('missing')
+    assert str(error.value) == 'Unknown pagination target missing'
+    with pytest.raises(DapperTableError) as error:
+        DapperTable(targets={'small': PaginationTarget(PaginationLength(5), prefix='too long')})
+    assert 'Prefix length (8) exceeds pagination length (5)' in str(error.value)
@@ -0,0 +1,308 @@
+'''
+Randomized differential tests, every optimized and cached path has to render
+exactly what the frozen implementation in tests/reference.py renders.
+
+DAPPERTABLE_FUZZ_SEED and DAPPERTABLE_FUZZ_CASES change the seed and the
+number of cases, failures include the seed of the case so it can be run again.
+Rows per second of the reference and of each path are kept as test properties,
+run with --junitxml and -o junit_family=xunit1 to track them.
+'''
+import io
+import os
+from dataclasses import dataclass, field
+from random import Random
+from time import perf_counter
+from unittest.mock import patch
+
+from dappertable import DapperTable, DapperTableView, DapperTableError, Column, Columns
+from dappertable import PaginationRows, PaginationLength, PaginationTarget
+from dappertable import enable_page_cache, disable_page_cache, string_width
+from dappertable.snapshot import dumps, loads
+from dappertable.virtual import VirtualTable
+
+from tests import reference
+
+SEED = int(os.environ.get('DAPPERTABLE_FUZZ_SEED', '0'))
+CASES = int(os.environ.get('DAPPERTABLE_FUZZ_CASES', '60'))
+
+TEXT_POOLS = [
+    list('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 -_.'),
+    list('禁断のテレパシー工藤静香한국어中文字'),
+    list('ＡＢＣ１２３！＂'),
+    list('ｱｲｳｴｵｶﾞ'),
+    ['é', 'ä', '́', 'ñ'],
+    ['😀', '👍🏽', '👨‍👩‍👧', '🇯🇵', '❤️', '🏳️‍🌈'],
+    ['\x07', '\x1b', '\t', '​', '­', '‍'],
+    ['\n'],
+]
+
+@dataclass
+class Case:
+    seed: int
+    rows: list
+    columns: Columns = None
+    options: dict = field(default_factory=dict)
+
+def random_text(rng, max_count):
+    pool = rng.choice(TEXT_POOLS)
+    mixed = rng.random() < 0.3
+    return ''.join(rng.choice(rng.choice(TEXT_POOLS) if mixed else pool) for _ in range(rng.randint(0, max_count)))
+
+def random_row(rng, columns):
+    if columns is None:
+        return random_text(rng, 30)
+    return [rng.randint(0, 10 ** rng.randint(0, 4)) if col.zero_pad else random_text(rng, 20)
+            for col in columns.headers]
+
+def random_columns(rng):
+    headers = []
+    for index in range(rng.randint(1, 5)):
+        auto_width = rng.random() < 0.3
+        headers.append(Column(random_text(rng, 6) or f'col{index}', rng.randint(1, 16),
+                              zero_pad=rng.random() < 0.2, auto_width=auto_width,
+                              percentile=rng.choice([25, 50, 90, 100])))
+    return Columns(headers, separator=rng.choice(['', '|', ' | ', '||', '│', '｜']))
+
+def random_case(seed):
+    rng = Random(seed)
+    columns = random_columns(rng) if rng.random() < 0.8 else None
+    rows = [random_row(rng, columns) for _ in range(rng.choice([0, 1, 3, 10, 40, 150]))]
+    options = {
+        'collapse_newlines': rng.random() < 0.8,
+        'prefix': random_text(rng, 4) if rng.random() < 0.5 else '',
+        'suffix': random_text(rng, 4) if rng.random() < 0.5 else '',
+        'enclosure_start': rng.choice(['', '```\n', '「']),
+        'enclosure_end': rng.choice(['', '\n```', '」']),
+    }
+    kind = rng.choice(['none', 'rows', 'length', 'length'])
+    if kind == 'rows':
+        options['pagination_options'] = PaginationRows(rng.randint(1, 8))
+    elif kind == 'length':
+        # Prefix, suffix and enclosures always fit, rows may not
+        fixed = max(string_width(options['prefix']), string_width(options['suffix']))
+        options['pagination_options'] = PaginationLength(fixed + string_width(options['enclosure_start'])
+                                                         + string_width(options['enclosure_end'])
+                                                         + rng.choice([rng.randint(1, 20), rng.randint(20, 300)]))
+    else:
+        options['pagination_options'] = None
+    return Case(seed, rows, columns, options)
+
+def outcome(function, *args):
+    try:
+        return function(*args)
+    except DapperTableError as exc:
+        return DapperTableError, str(exc)
+
+def expected(case, rows=None):
+    return outcome(lambda: reference.render(case.rows if rows is None else rows, case.columns, **case.options))
+
+def new_table(case):
+    return DapperTable(columns=case.columns, **case.options)
+
+def path_add_row(case):
+    table = new_table(case)
+    for row in case.rows:
+        table.add_row(row)
+    return table.render()
+
+def path_add_rows(case):
+    table = new_table(case)
+    table.add_rows(case.rows)
+    return table.render()
+
+def path_add_rows_numpy(case):
+    # Measure columns with numpy when installed, whatever the row count
+    with patch('dappertable._batch.BATCH_MIN_ROWS', 1):
+        return path_add_rows(case)
+
+def path_insert_reversed(case):
+    table = new_table(case)
+    for row in reversed(case.rows):
+        table.insert_row(0, row)
+    return table.render()
+
+def path_batch(case):
+    table = new_table(case)
+    with table.batch() as batch:
+        for row in case.rows:
+            batch.add_row(row)
+    return table.render()
+
+def path_update(case):
+    # Start from other rows and change every cell to the case rows
+    rng = Random(case.seed)
+    table = new_table(case)
+    table.add_rows([random_row(rng, case.columns) for _ in case.rows])
+    outcome(table.render)
+    if case.columns is None:
+        for (index, row) in enumerate(case.rows):
+            table.edit_row(index, row)
+        return table.render()
+    names = [col.name for col in case.columns.headers]
+    for (index, name) in enumerate(names):
+        if index % 2:
+            # Random column names can repeat, names only find the first column with them
+            table.update_column(name if names.count(name) == 1 else index, [row[index] for row in case.rows])
+            continue
+        for (row_index, row) in enumerate(case.rows):
+            table.update_cell(row_index, index, row[index])
+    return table.render()
+
+def path_page_cache(case):
+    enable_page_cache(16)
+    try:
+        table = new_table(case)
+        table.add_rows(case.rows)
+        first = outcome(table.render)
+        second = table.render()
+        assert first == second
+        return second
+    finally:
+        disable_page_cache()
+
+def path_snapshot(case):
+    table = new_table(case)
+    table.add_rows(case.rows)
+    return loads(dumps(table)).render()
+
+def path_target(case):
+    # Auto widths follow the length budget of the table, so the table gets the same settings
+    target = PaginationTarget(**{key: value for (key, value) in case.options.items() if key != 'collapse_newlines'})
+    table = DapperTable(columns=case.columns, targets={'fuzz': target}, **case.options)
+    table.add_rows(case.rows)
+    return table.target('fuzz').render()
+
+def path_view(case):
+    table = new_table(case)
+    view = DapperTableView(table, **case.options)
+    table.add_rows(case.rows)
+    return view.render()
+
+def path_virtual(case):
+    if case.columns and any(col.auto_width for col in case.columns.headers):
+        return None
+    table = VirtualTable(lambda start, count: case.rows[start:start + count], len(case.rows),
+                         columns=case.columns, cache_size=7, fetch_size=5, **case.options)
+    return table.render()
+
+def path_render_to(case):
+    table = new_table(case)
+    table.add_rows(case.rows)
+    output = io.StringIO()
+    table.render_to(output, page_delimiter='\x00', buffer_size=7)
+    if case.options['pagination_options'] is None:
+        return output.getvalue()
+    return output.getvalue().split('\x00') if case.rows or case.columns else []
+
+PATHS = {
+    'add_row': path_add_row,
+    'add_rows': path_add_rows,
+    'add_rows_numpy': path_add_rows_numpy,
+    'insert_reversed': path_insert_reversed,
+    'batch': path_batch,
+    'update': path_update,
+    'page_cache': path_page_cache,
+    'snapshot': path_snapshot,
+    'target': path_target,
+    'view': path_view,
+    'virtual': path_virtual,
+    'render_to': path_render_to,
+}
+
+def record_throughput(record_property, name, rows, seconds):
+    record_property(f'{name}_rows_per_second', round(rows / seconds) if seconds else 0)
+
+def test_differential_paths(record_property):
+    row_count = 0
+    timings = dict.fromkeys(['reference', *PATHS], 0.0)
+    for seed in range(SEED, SEED + CASES):
+        case = random_case(seed)
+        row_count += len(case.rows)
+        timer = perf_counter()
+        result = expected(case)
+        timings['reference'] += perf_counter() - timer
+        for (name, path) in PATHS.items():
+            timer = perf_counter()
+            output = outcome(path, case)
+            timings[name] += perf_counter() - timer
+            if output is None:
+                continue
+            assert output == result, f'Path {name} differs from reference for seed {seed}'
+    for (name, seconds) in timings.items():
+        record_throughput(record_property, name, row_count, seconds)
+
+def random_edit(rng, table, model, columns):
+    action = rng.choice(['add_row', 'add_rows', 'insert_row', 'edit_row', 'remove_row', 'move_row',
+                         'update_cell', 'update_column', 'batch'])
+    if action == 'add_row' or not model:
+        row = random_row(rng, columns)
+        table.add_row(row)
+        model.append(row)
+    elif action == 'add_rows':
+        rows = [random_row(rng, columns) for _ in range(rng.randint(1, 20))]
+        table.add_rows(rows)
+        model.extend(rows)
+    elif action == 'insert_row':
+        index = rng.randint(0, len(model))
+        row = random_row(rng, columns)
+        table.insert_row(index, row)
+        model.insert(index, row)
+    elif action == 'edit_row':
+        index = rng.randrange(len(model))
+        model[index] = random_row(rng, columns)
+        table.edit_row(index, model[index])
+    elif action == 'remove_row':
+        index = rng.randrange(len(model))
+        table.remove_row(index)
+        model.pop(index)
+    elif action == 'move_row':
+        source, destination = rng.randrange(len(model)), rng.randrange(len(model))
+        table.move_row(source, destination)
+        model.insert(destination, model.pop(source))
+    elif action in ('update_cell', 'update_column') and columns:
+        column = rng.randrange(len(columns.headers))
+        indexes = [rng.randrange(len(model))] if action == 'update_cell' else range(len(model))
+        values = {index: random_row(rng, columns)[column] for index in indexes}
+        for (index, value) in values.items():
+            model[index] = [*model[index][:column], value, *model[index][column + 1:]]
+        if action == 'update_cell':
+            table.update_cell(indexes[0], column, values[indexes[0]])
+        else:
+            table.update_column(column, list(values.values()))
+    else:
+        with table.batch() as batch:
+            for _ in range(rng.randint(1, 6)):
+                if model and rng.random() < 0.4:
+                    index = rng.randrange(len(model))
+                    batch.remove_row(index)
+                    model.pop(index)
+                    continue
+                index = rng.randint(0, len(model))
+                row = random_row(rng, columns)
+                batch.insert_row(index, row)
+                model.insert(index, row)
+
+def test_differential_edits(record_property):
+    # Rendering between edits keeps cached page bounds, which have to match a fresh render
+    edit_count = 0
+    seconds = 0.0
+    for seed in range(SEED, SEED + CASES):
+        case = random_case(seed)
+        rng = Random(seed)
+        table = new_table(case)
+        model = list(case.rows)
+        table.add_rows(model)
+        for step in range(rng.randint(1, 30)):
+            timer = perf_counter()
+            # Batches paginate when applied, rows too long to paginate raise once the batch is applied
+            outcome(random_edit, rng, table, model, case.columns)
+            output = outcome(table.render)
+            seconds += perf_counter() - timer
+            edit_count += 1
+            assert output == expected(case, model), f'Edit {step} differs from reference for seed {seed}'
+    record_throughput(record_property, 'edit', edit_count, seconds)
+
+def test_differential_reference_errors():
+    case = Case(0, ['x' * 30], options={'pagination_options': PaginationLength(10)})
+    assert expected(case) == (DapperTableError, f'Length of input "{"x" * 30}" is greater than max length 10')
+    assert outcome(path_add_rows, case) == expected(case)
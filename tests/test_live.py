@@ -0,0 +1,54 @@
+import io
+
+from dappertable import DapperTable, Column, Columns, PaginationRows
+from dappertable.live import LiveRenderer, frame_update
+
+
+def test_live_refresh():
+    table = DapperTable(columns=Columns([Column('pos', 3), Column('name', 5)]))
+    table.add_row(['1', 'foo'])
+    table.add_row(['2', 'bar'])
+    stream = io.StringIO()
+    live = LiveRenderer(table, stream)
+    assert live.refresh() == len(stream.getvalue())
+    assert stream.getvalue() == 'pos|| name\n----------\n1  || foo\n2  || bar\n'
+    # Nothing is written if the frame did not change
+    assert live.refresh() == 0
+    assert stream.getvalue() == 'pos|| name\n----------\n1  || foo\n2  || bar\n'
+
+    stream.seek(0)
+    stream.truncate()
+    table.edit_row(0, ['1', 'baz'])
+    live.refresh()
+    assert stream.getvalue() == '\x1b[2F\x1b[2K1  || baz\x1b[2E'
+
+    stream.seek(0)
+    stream.truncate()
+    table.add_row(['3', 'new'])
+    live.refresh()
+    assert stream.getvalue() == '\x1b[2K3  || new\n'
+
+    stream.seek(0)
+    stream.truncate()
+    table.remove_row(0)
+    live.refresh()
+    assert stream.getvalue() == '\x1b[3F\x1b[2K2  || bar\x1b[1E\x1b[2K3  || new\x1b[1E\x1b[J'
+
+    stream.seek(0)
+    stream.truncate()
+    live.reset()
+    live.refresh()
+    assert stream.getvalue() == 'pos|| name\n----------\n2  || bar\n3  || new\n'
+
+def test_live_pages(capsys):
+    table = DapperTable(pagination_options=PaginationRows(1))
+    table.add_rows(['foo', 'bar'])
+    live = LiveRenderer(table, page_delimiter='\n--\n')
+    live.refresh()
+    assert capsys.readouterr().out == 'foo\n--\nbar\n'
+
+def test_frame_update():
+    assert frame_update(['a', 'b', 'c'], ['a', 'x']) == '\x1b[2F\x1b[2Kx\x1b[1E\x1b[J'
+    assert frame_update(['a', 'b', 'c'], ['a']) == '\x1b[2F\x1b[J'
+    assert frame_update(['a', 'b'], ['a', 'b', 'c']) == '\x1b[2Kc\n'
+    assert not frame_update(['a'], ['a'])
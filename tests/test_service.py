@@ -0,0 +1,225 @@
+import io
+import socket
+
+import pytest
+
+from dappertable import DapperTable, Column, Columns, DapperTableError
+from dappertable import PaginationRows, PaginationLength
+from dappertable import service
+from dappertable.service import RenderServer, RenderClient
+
+def build_table(count=12, **kwargs):
+    headers = [
+        Column('pos', 3, zero_pad=True),
+        Column('title', 12),
+        Column('uploader', 8),
+    ]
+    x = DapperTable(columns=Columns(headers, separator='|'), **kwargs)
+    for index in range(count):
+        x.add_row([index, f'禁断のテレパシー {index}', '工藤静香'])
+    return x
+
+@pytest.fixture
+def server(tmp_path):
+    with RenderServer(str(tmp_path / 'render.sock')) as render_server:
+        render_server.start()
+        yield render_server
+
+def test_service_mirrors_table(server):
+    x = build_table(pagination_options=PaginationLength(150), prefix='Queue\n', suffix='\nend')
+    with RenderClient(server.address) as client:
+        remote = client.put_table('queue', x)
+        assert client.table_names() == ['queue']
+        assert remote.render() == x.render()
+        assert remote.page_count == len(x.render())
+        assert len(remote) == len(x) == 12
+        assert remote.render_page(1) == x.render()[1]
+
+        assert remote.add_row([12, 'new', 'foo']) == x.add_row([12, 'new', 'foo'])
+        assert remote.add_rows([[13, 'a', 'b'], [14, 'c', 'd']]) == x.add_rows([[13, 'a', 'b'], [14, 'c', 'd']])
+        assert remote.insert_row(2, [2, 'inserted', 'x']) == x.insert_row(2, [2, 'inserted', 'x'])
+        assert remote.edit_row(0, [0, 'edited', 'y']) == x.edit_row(0, [0, 'edited', 'y'])
+        assert remote.update_cell(1, 'title', 'cell') == x.update_cell(1, 'title', 'cell')
+        assert remote.update_column(2, ['z'] * len(x)) == x.update_column(2, ['z'] * len(x))
+        assert remote.move_row(0, 3) == x.move_row(0, 3)
+        assert remote.remove_row(4) == x.remove_row(4)
+        assert remote.render() == x.render()
+        assert remote.get_table().render() == x.render()
+
+        with pytest.raises(DapperTableError) as error:
+            remote.render_page(100)
+        assert str(error.value) == 'Invalid page index given 100'
+        with pytest.raises(DapperTableError) as error:
+            remote.edit_row(100, [0, 'a', 'b'])
+        assert str(error.value) == 'Invalid edit index given 100'
+
+def test_service_changed_pages(server):
+    x = build_table(count=10, pagination_options=PaginationRows(4))
+    with RenderClient(server.address) as client:
+        remote = client.put_table('queue', x)
+        seen = remote.version
+        assert not remote.changed_pages(seen)
+        remote.edit_row(9, [9, 'edited', 'foo'])
+        assert remote.changed_pages(seen) == [2]
+        remote.update_cell(0, 1, 'first')
+        assert remote.changed_pages(seen) == [0, 2]
+        assert remote.version == seen + 2
+        # Another client changes the table
+        with RenderClient(server.address) as other:
+            other.table('queue').add_row([10, 'new', 'foo'])
+        assert remote.changed_pages(seen) == [0, 2, 3]
+        assert remote.version == seen + 3
+        # Versions older than the history, or from a replaced table, report every page
+        assert remote.changed_pages(-5) == [0, 1, 2, 3]
+        assert remote.changed_pages(remote.version + 1) == [0, 1, 2, 3]
+        client.put_table('queue', x)
+        assert remote.changed_pages(seen + 3) == [0, 1, 2]
+        assert not remote.changed_pages(seen + 4)
+
+def test_service_rows_too_long(server):
+    with RenderClient(server.address) as client:
+        remote = client.create_table('queue', pagination_options=PaginationLength(10))
+        remote.add_row('foo')
+        seen = remote.version
+        # Row is kept and the version bumped even though the table cannot be paginated
+        with pytest.raises(DapperTableError) as error:
+            remote.add_row('x' * 30)
+        assert 'is greater than max length 10' in str(error.value)
+        assert len(remote) == 2
+        assert remote.version == seen + 1
+        with pytest.raises(DapperTableError):
+            remote.render()
+        # Removing the row recovers the table, every page is reported as changed
+        assert remote.remove_row(1)
+        assert remote.render() == ['foo']
+        assert remote.version == seen + 2
+        assert remote.changed_pages(seen) == [0]
+        assert remote.changed_pages(seen + 1) == [0]
+        # Batches are applied before their pages are found
+        with pytest.raises(DapperTableError):
+            with remote.batch() as batch:
+                batch.add_row('bar')
+                batch.add_row('x' * 30)
+        assert len(remote) == 3
+        assert remote.version == seen + 3
+
+def test_service_batch(server):
+    x = build_table(count=3)
+    with RenderClient(server.address) as client:
+        remote = client.put_table('queue', x)
+        with remote.batch() as batch:
+            batch.add_row([3, 'a', 'b'])
+            batch.insert_row(0, [0, 'b', 'c'])
+            batch.edit_row(1, [1, 'c', 'd'])
+            batch.update_cell(2, 'uploader', 'e')
+            batch.remove_row(3)
+        with x.batch() as local:
+            local.add_row([3, 'a', 'b'])
+            local.insert_row(0, [0, 'b', 'c'])
+            local.edit_row(1, [1, 'c', 'd'])
+        x.update_cell(2, 'uploader', 'e')
+        x.remove_row(3)
+        assert batch.results == [3, 0, True, True, True]
+        assert batch.changed_pages == [0]
+        assert remote.render() == x.render()
+
+        version = remote.version
+        with pytest.raises(ValueError):
+            with remote.batch() as batch:
+                batch.add_row([4, 'a', 'b'])
+                raise ValueError('dropped')
+        assert remote.version == version
+        assert len(remote) == 4
+        # Changes before a failing one are kept
+        with pytest.raises(DapperTableError) as error:
+            with remote.batch() as batch:
+                batch.update_cell(0, 'title', 'kept')
+                batch.remove_row(10)
+        assert str(error.value) == 'Invalid deletion index'
+        assert remote.version == version
+        assert 'kept' in remote.render()
+        assert remote.changed_pages(version) == [0]
+
+def test_service_tables(server):
+    with RenderClient(server.address) as client:
+        remote = client.create_table('log', pagination_options=PaginationRows(2))
+        assert remote.render() == []
+        remote.add_row('foo')
+        assert remote.render() == ['foo']
+        client.create_table('other')
+        assert client.table_names() == ['log', 'other']
+        assert client.drop_table('log')
+        assert client.table_names() == ['other']
+        with pytest.raises(DapperTableError) as error:
+            remote.render()
+        assert str(error.value) == 'Unknown table log'
+        with pytest.raises(DapperTableError) as error:
+            client._request({'op': 'explode', 'table': 'other'})
+        assert str(error.value) == 'Unknown request explode'
+        with pytest.raises(DapperTableError) as error:
+            client.table('other')._mutate([['clear']])
+        assert str(error.value) == 'Unknown row operation clear'
+        with pytest.raises(DapperTableError) as error:
+            client.table('other').render_page('a')
+        assert str(error.value).startswith('Invalid request: TypeError')
+
+def test_service_tcp():
+    x = build_table(count=3)
+    with RenderServer(('127.0.0.1', 0)) as render_server:
+        render_server.start()
+        with RenderClient(render_server.address, timeout=10) as client:
+            assert client.put_table('queue', x).render() == x.render()
+
+def test_service_close_removes_socket(tmp_path):
+    render_server = RenderServer(str(tmp_path / 'render.sock'))
+    render_server.close()
+    assert not (tmp_path / 'render.sock').exists()
+
+def test_service_frames():
+    stream = io.BytesIO()
+    service._write_frame(stream, {'op': 'put'}, b'data')
+    stream.seek(0)
+    assert service._read_frame(stream) == ({'op': 'put'}, b'data')
+    assert service._read_frame(stream) is None
+    # Frame cut short
+    assert service._read_frame(io.BytesIO(stream.getvalue()[:-1])) is None
+    with pytest.raises(DapperTableError) as error:
+        service._read_frame(io.BytesIO(service._FRAME.pack(service.MAX_FRAME_SIZE + 1, 0)))
+    assert str(error.value) == 'Frame larger than maximum frame size'
+
+def test_service_connection_closed(server):
+    client = RenderClient(server.address)
+    client._socket.shutdown(socket.SHUT_RD)
+    with pytest.raises(DapperTableError) as error:
+        client.table_names()
+    assert str(error.value) == 'Render server closed the connection'
+    client.close()
+
+def raw_request(sock, header, payload=b''):
+    sock.sendall(service._FRAME.pack(len(header), len(payload)) + header + payload)
+    return service._read_frame(sock.makefile('rb'))
+
+def test_service_invalid_frames(server, capsys):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(server.address)
+        response, _payload = raw_request(sock, b'{not json')
+        assert response['error'].startswith('Invalid request: JSONDecodeError')
+        response, _payload = raw_request(sock, b'[1, 2]')
+        assert response == {'error': 'Invalid request: header must be a json object'}
+        # Connection keeps working after invalid headers
+        assert raw_request(sock, b'{"op": "names"}') == ({'result': []}, b'')
+        sock.sendall(service._FRAME.pack(service.MAX_FRAME_SIZE + 1, 0))
+        reader = sock.makefile('rb')
+        assert service._read_frame(reader) == ({'error': 'Frame larger than maximum frame size'}, b'')
+        # Server closes the connection since the rest of the frame is not read
+        assert service._read_frame(reader) is None
+    # Client leaving before reading the response does not break the server
+    client = RenderClient(server.address)
+    client._socket.shutdown(socket.SHUT_RD)
+    with pytest.raises(DapperTableError):
+        client.table_names()
+    client.close()
+    with RenderClient(server.address) as other:
+        assert other.table_names() == []
+    assert 'Traceback' not in capsys.readouterr().err
+
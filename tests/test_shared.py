@@ -0,0 +1,149 @@
+import multiprocessing
+
+import pytest
+
+from dappertable import DapperTable, Column, Columns, DapperTableError
+from dappertable import PaginationRows, PaginationLength
+from dappertable import shared
+from dappertable.shared import SharedTableWriter, SharedTableReader
+from dappertable.snapshot import SnapshotReader
+
+def build_table(count=12, **kwargs):
+    headers = [
+        Column('pos', 3, zero_pad=True),
+        Column('title', 12),
+        Column('uploader', 8),
+    ]
+    x = DapperTable(columns=Columns(headers, separator='|'), **kwargs)
+    for index in range(count):
+        x.add_row([index, f'禁断のテレパシー {index}', '工藤静香'])
+    return x
+
+def render_worker(name, queue):
+    with SharedTableReader(name) as reader:
+        pages = reader.render()
+        queue.put((reader.read_version, pages))
+        queue.put(reader.render_page(1))
+
+def test_shared_table():
+    x = build_table(pagination_options=PaginationLength(120), prefix='Queue\n', suffix='\nend')
+    with SharedTableWriter(1 << 16) as writer:
+        assert writer.version == 0
+        assert writer.publish(x) == 2
+        with SharedTableReader(writer.name) as reader:
+            assert reader.version == 2
+            assert reader.read_version == 0
+            assert reader.render() == x.render()
+            assert reader.read_version == 2
+            assert reader.page_count == len(x.render())
+            assert reader.render_page(1) == x.render()[1]
+            assert [[row.content for row in page] for page in reader.get_pages()] == \
+                [[row.content for row in page] for page in x.get_pages()]
+            assert reader.load_table().render() == x.render()
+            # Readers see updates once published
+            x.add_row([12, 'new', 'foo'])
+            assert writer.publish(x) == 4
+            assert reader.version == 4
+            assert reader.render() == x.render()
+            assert reader.read_version == 4
+            with pytest.raises(DapperTableError) as error:
+                reader.render_page(100)
+            assert str(error.value) == 'Invalid page index given 100'
+
+def test_shared_table_no_pagination():
+    x = build_table(count=3)
+    with SharedTableWriter(1 << 12) as writer:
+        writer.publish(x)
+        with SharedTableReader(writer.name) as reader:
+            assert reader.render() == x.render()
+            assert [row.content for row in reader.get_pages()] == [row.content for row in x.get_pages()]
+
+def test_shared_table_other_process():
+    x = build_table(pagination_options=PaginationRows(4))
+    with SharedTableWriter(1 << 16) as writer:
+        writer.publish(x)
+        context = multiprocessing.get_context('spawn')
+        queue = context.Queue()
+        process = context.Process(target=render_worker, args=(writer.name, queue))
+        process.start()
+        assert queue.get(timeout=30) == (2, x.render())
+        assert queue.get(timeout=30) == x.render()[1]
+        process.join(timeout=30)
+        assert process.exitcode == 0
+
+def test_shared_table_errors():
+    with pytest.raises(DapperTableError) as error:
+        SharedTableWriter(16)
+    assert str(error.value) == 'Shared memory size must be larger than 16'
+    with SharedTableWriter(1024) as writer:
+        with SharedTableReader(writer.name) as reader:
+            with pytest.raises(DapperTableError) as error:
+                reader.render()
+            assert str(error.value) == 'No table published to shared memory'
+        with pytest.raises(DapperTableError) as error:
+            writer.publish(build_table(count=100))
+        assert 'does not fit shared memory' in str(error.value)
+
+def test_shared_table_publish_during_read(monkeypatch):
+    x = build_table(pagination_options=PaginationRows(4))
+    with SharedTableWriter(1 << 16) as writer:
+        writer.publish(x)
+        with SharedTableReader(writer.name) as reader:
+            assert reader.render_page(0) == x.render()[0]
+            render_page = SnapshotReader.render_page
+            calls = []
+
+            def publish_first(snapshot, index):
+                calls.append(index)
+                if len(calls) == 1:
+                    x.edit_row(0, [0, 'edited', 'foo'])
+                    writer.publish(x)
+                return render_page(snapshot, index)
+
+            monkeypatch.setattr(SnapshotReader, 'render_page', publish_first)
+            # Read is tried again against the new version
+            assert reader.render_page(0) == x.render()[0]
+            assert 'edited' in reader.render_page(0)
+            assert len(calls) == 3
+            assert reader.read_version == 4
+
+            def publish_broken(snapshot, index):
+                calls.append(index)
+                if len(calls) == 4:
+                    writer.publish(x)
+                    raise DapperTableError('Invalid snapshot data')
+                return render_page(snapshot, index)
+
+            monkeypatch.setattr(SnapshotReader, 'render_page', publish_broken)
+            assert reader.render_page(0) == x.render()[0]
+            assert reader.read_version == 6
+
+def test_shared_table_writer_busy(monkeypatch):
+    monkeypatch.setattr(shared, '_MAX_ATTEMPTS', 3)
+    monkeypatch.setattr(shared, '_RETRY_DELAY', 0)
+    with SharedTableWriter(1 << 16) as writer:
+        writer.publish(build_table())
+        with SharedTableReader(writer.name) as reader:
+            # Odd version while the writer is publishing
+            shared._HEADER.pack_into(writer._memory.buf, 0, 3, 0)
+            with pytest.raises(DapperTableError) as error:
+                reader.render()
+            assert str(error.value) == 'Shared table was not readable, writer is still publishing'
+
+def test_shared_table_attach_untracked(monkeypatch):
+    # Python 3.13 and later attach with track=False, older versions unregister after attaching
+    unregistered = []
+    monkeypatch.setattr(shared.resource_tracker, 'unregister', lambda name, rtype: unregistered.append(rtype))
+
+    class OldSharedMemory(shared.SharedMemory):
+        def __init__(self, name=None, create=False, size=0, **kwargs):
+            if kwargs:
+                raise TypeError('unexpected keyword argument')
+            super().__init__(name=name, create=create, size=size)
+
+    with SharedTableWriter(1 << 12) as writer:
+        writer.publish(build_table(count=1))
+        monkeypatch.setattr(shared, 'SharedMemory', OldSharedMemory)
+        with SharedTableReader(writer.name) as reader:
+            assert reader.page_count == 1
+        assert unregistered == ['shared_memory']
@@ -0,0 +1,133 @@
+import io
+
+import pytest
+
+from dappertable import DapperTable, Column, Columns, DapperTableError
+from dappertable import PaginationRows, PaginationLength, PaginationTarget
+from dappertable.snapshot import dump, dumps, load, loads, SnapshotReader
+
+def build_table(**kwargs):
+    headers = [
+        Column('pos', 3, zero_pad=True),
+        Column('title', 12),
+        Column('uploader', 8),
+    ]
+    x = DapperTable(columns=Columns(headers, separator='|'), **kwargs)
+    for count in range(12):
+        x.add_row([count, f'禁断のテレパシー {count}', '工藤静香'])
+    return x
+
+def test_snapshot_roundtrip():
+    x = build_table(pagination_options=PaginationLength(120), prefix='Queue\n', suffix='\nend',
+                    enclosure_start='```\n', enclosure_end='\n```')
+    y = loads(dumps(x))
+    assert y.render() == x.render()
+    assert len(y) == 12
+    # Loaded tables keep working like regular tables
+    x.add_row(['12', 'new', 'foo'])
+    y.add_row(['12', 'new', 'foo'])
+    x.edit_row(0, ['0', 'edit', 'bar'])
+    y.edit_row(0, ['0', 'edit', 'bar'])
+    assert y.render() == x.render()
+
+def test_snapshot_raw_rows():
+    x = DapperTable(pagination_options=PaginationRows(2), collapse_newlines=False)
+    x.add_row('foo\n\n')
+    x.add_row('bar')
+    x.add_row('baz')
+    y = loads(dumps(x))
+    assert y.render() == x.render()
+    assert y.collapse_newlines is False
+
+def test_snapshot_file(tmp_path):
+    x = build_table(pagination_options=PaginationRows(5))
+    path = tmp_path / 'table.snap'
+    with open(path, 'wb') as writer:
+        dump(x, writer)
+    with open(path, 'rb') as reader:
+        y = load(reader)
+    assert y.render() == x.render()
+
+def test_snapshot_reader_pages(tmp_path):
+    x = build_table(pagination_options=PaginationLength(120), prefix='Queue\n', suffix='\nend')
+    path = tmp_path / 'table.snap'
+    path.write_bytes(dumps(x))
+    with SnapshotReader.open(path) as reader:
+        assert reader.page_count == len(x.render())
+        for (count, page) in enumerate(x.render()):
+            assert reader.render_page(count) == page
+        with pytest.raises(DapperTableError) as error:
+            reader.render_page(reader.page_count)
+        assert f'Invalid page index given {reader.page_count}' in str(error.value)
+        assert reader.load_table().render() == x.render()
+        assert [[row.content for row in page] for page in reader.get_pages()] == \
+            [[row.content for row in page] for page in x.get_pages()]
+
+def test_snapshot_reader_no_pagination():
+    x = DapperTable(prefix='[', suffix=']')
+    x.add_row('foo')
+    reader = SnapshotReader(dumps(x))
+    assert reader.page_count == 1
+    assert reader.render_page(0) == x.render()
+    assert [row.content for row in reader.get_pages()] == ['foo']
+    reader.close()
+
+def test_snapshot_invalid_data():
+    with pytest.raises(DapperTableError) as error:
+        loads(b'foo')
+    assert 'Invalid snapshot data' in str(error.value)
+    with pytest.raises(DapperTableError) as error:
+        loads(b'NOTSNP' + dumps(DapperTable())[6:])
+    assert 'Invalid snapshot data' in str(error.value)
+    data = bytearray(dumps(DapperTable()))
+    data[6] = 99
+    with pytest.raises(DapperTableError) as error:
+        SnapshotReader(data)
+    assert 'Unsupported snapshot version 99' in str(error.value)
+
+def test_snapshot_reader_memoryview():
+    x = build_table(pagination_options=PaginationRows(4))
+    data = io.BytesIO(dumps(x)).getbuffer()
+    reader = SnapshotReader(data)
+    assert reader.render_page(1) == x.render()[1]
+
+def test_snapshot_auto_width():
+    headers = [
+        Column('pos', 3),
+        Column('title', 20, auto_width=True, percentile=90),
+    ]
+    x = DapperTable(columns=Columns(headers))
+    for value in ['foo', 'foobar', '日本語']:
+        x.add_row(['1', value])
+    y = loads(dumps(x))
+    assert y.render() == x.render()
+    x.add_row(['2', 'a longer title'])
+    y.add_row(['2', 'a longer title'])
+    assert y.render() == x.render()
+
+def test_snapshot_update_cell():
+    table = DapperTable(columns=Columns([Column('pos', 3), Column('name', 5)]))
+    table.add_row(['1', 'foo'])
+    loaded = loads(dumps(table))
+    loaded.update_cell(0, 'name', 'bar')
+    table.update_cell(0, 'name', 'bar')
+    assert loaded.render() == table.render()
+
+def test_snapshot_retain_input_values():
+    table = DapperTable(columns=Columns([Column('pos', 3), Column('name', 5)]), retain_input_values=False)
+    table.add_row(['1', 'foo'])
+    loaded = loads(dumps(table))
+    assert loaded.render() == table.render()
+    with pytest.raises(DapperTableError) as error:
+        loaded.update_cell(0, 'name', 'bar')
+    assert 'Row input values are not retained' in str(error.value)
+
+def test_snapshot_targets():
+    x = build_table(pagination_options=PaginationRows(5),
+                    targets={'message': PaginationTarget(PaginationLength(120), prefix='Queue\n', enclosure_start='`',
+                                                         enclosure_end='`'),
+                             'all': PaginationTarget(None, suffix='\nend')})
+    y = loads(dumps(x))
+    assert y.render() == x.render()
+    assert y.render_targets() == x.render_targets()
+    assert y.target('message').target == x.target('message').target
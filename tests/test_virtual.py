@@ -0,0 +1,162 @@
+import sqlite3
+
+import pytest
+
+from dappertable import DapperTable, Column, Columns, DapperTableError
+from dappertable import PaginationRows, PaginationLength
+from dappertable.virtual import VirtualTable
+
+COLUMNS = Columns([Column('pos', 3, zero_pad=True), Column('title', 12), Column('uploader', 8)], separator='|')
+
+class Provider():
+    def __init__(self, count):
+        self.rows = [[index, f'禁断のテレパシー {index}', '工藤静香'] for index in range(count)]
+        self.calls = []
+
+    def fetch(self, start, count):
+        self.calls.append((start, count))
+        return self.rows[start:start + count]
+
+    def count(self):
+        return len(self.rows)
+
+def reference(provider, **kwargs):
+    x = DapperTable(columns=COLUMNS, **kwargs)
+    x.add_rows(provider.rows)
+    return x
+
+def test_virtual_rows_pagination():
+    provider = Provider(150)
+    kwargs = {'pagination_options': PaginationRows(10), 'prefix': 'Queue\n', 'suffix': '\nend'}
+    x = reference(provider, **kwargs)
+    y = VirtualTable(provider.fetch, provider.count, columns=COLUMNS, stats=True, **kwargs)
+    assert len(y) == y.size == 150
+    assert y.page_count == len(x.render())
+    # Only the rows of the requested page are fetched
+    assert y.render_page(12) == x.render()[12]
+    assert provider.calls == [(118, 10)]
+    assert y.render_page(12) == x.render()[12]
+    assert provider.calls == [(118, 10)]
+    assert y.render_page(0) == x.render()[0]
+    assert provider.calls == [(118, 10), (0, 8)]
+    assert [row.content for row in y.get_page(1)] == [row.content for row in x.get_pages()[1]]
+    assert y.stats.counts['fetch'] == 28
+    assert y.render() == x.render()
+    with pytest.raises(DapperTableError) as error:
+        y.render_page(16)
+    assert str(error.value) == 'Invalid page index given 16'
+
+def test_virtual_length_pagination():
+    provider = Provider(200)
+    kwargs = {'pagination_options': PaginationLength(300), 'prefix': 'Queue\n', 'suffix': '\n' + 'end' * 30,
+              'enclosure_start': '```\n', 'enclosure_end': '\n```'}
+    x = reference(provider, **kwargs)
+    y = VirtualTable(provider.fetch, provider.count, columns=COLUMNS, cache_size=64, fetch_size=16, stats=True,
+                     **kwargs)
+    # Page bounds are found up to the requested page
+    assert y.render_page(3) == x.render()[3]
+    assert provider.calls[-1][0] < 64
+    assert y.render_page(1) == x.render()[1]
+    pages = x.render()
+    assert y.render_page(len(pages) - 1) == pages[-1]
+    assert y.page_count == len(pages)
+    assert y.stats.counts['paginate'] == len(pages)
+    assert y.render() == pages
+    for index in (5, 0, 7):
+        assert y.render_page(index) == pages[index]
+    with pytest.raises(DapperTableError) as error:
+        y.render_page(len(pages))
+    assert str(error.value) == f'Invalid page index given {len(pages)}'
+
+def test_virtual_small_cache():
+    provider = Provider(100)
+    kwargs = {'pagination_options': PaginationLength(300)}
+    pages = reference(provider, **kwargs).render()
+    y = VirtualTable(provider.fetch, provider.count, columns=COLUMNS, cache_size=16, fetch_size=16, stats=True,
+                     **kwargs)
+    assert y.page_count == len(pages)
+    # Finding page bounds fetches every row once, the rest of each fetch is read from the cache
+    assert y.stats.counts['fetch'] == 100
+    assert y.stats.counts['row_cache_hit'] == 100 - len(provider.calls)
+    assert provider.calls == [(start, 16) for start in range(0, 96, 16)] + [(96, 4)]
+    assert y.render() == pages
+
+def test_virtual_no_pagination():
+    provider = Provider(20)
+    y = VirtualTable(provider.fetch, 20, columns=COLUMNS, fetch_size=8)
+    x = reference(provider)
+    assert y.page_count == 1
+    assert y.render() == x.render()
+    assert y.render_page(0) == x.render()
+    assert [row.content for row in y.get_page(0)] == [row.content for row in x.get_pages()]
+    with pytest.raises(DapperTableError) as error:
+        y.render_page(-1)
+    assert str(error.value) == 'Invalid page index given -1'
+
+def test_virtual_raw_rows():
+    rows = ['foo', 'bar\n\n', 'baz']
+    y = VirtualTable(lambda start, count: rows[start:start + count], len(rows), pagination_options=PaginationRows(2))
+    x = DapperTable(pagination_options=PaginationRows(2))
+    x.add_rows(rows)
+    assert y.render() == x.render()
+    all_rows = y._page_rows()
+    assert all_rows[-1].content == 'baz'
+    assert [row.content for row in all_rows[::2]] == ['foo', 'baz']
+    assert not all_rows[2:1]
+    with pytest.raises(IndexError):
+        all_rows[3]
+
+def test_virtual_database_rows():
+    provider = Provider(30)
+    db = sqlite3.connect(':memory:')
+    db.execute('CREATE TABLE history (pos INTEGER, title TEXT, uploader TEXT)')
+    db.executemany('INSERT INTO history VALUES (?, ?, ?)', provider.rows)
+
+    def fetch(start, count):
+        return db.execute('SELECT pos, title, uploader FROM history LIMIT ? OFFSET ?', (count, start)).fetchall()
+
+    def count():
+        return db.execute('SELECT COUNT(*) FROM history').fetchone()[0]
+
+    kwargs = {'pagination_options': PaginationRows(7)}
+    y = VirtualTable(fetch, count, columns=COLUMNS, **kwargs)
+    assert y.render() == reference(provider, **kwargs).render()
+    db.row_factory = sqlite3.Row
+    y.refresh()
+    assert y.render_page(2) == reference(provider, **kwargs).render()[2]
+    db.close()
+
+def test_virtual_refresh():
+    provider = Provider(9)
+    y = VirtualTable(provider.fetch, provider.count, columns=COLUMNS, pagination_options=PaginationLength(200))
+    assert y.render() == reference(provider, pagination_options=PaginationLength(200)).render()
+    # Zero padding grows with the row count
+    provider.rows.append([9, 'new', 'foo'])
+    assert len(y) == 9
+    y.refresh()
+    assert len(y) == 10
+    assert y.render() == reference(provider, pagination_options=PaginationLength(200)).render()
+    assert '01 |' in y.render_page(0)
+
+def test_virtual_errors():
+    provider = Provider(5)
+    with pytest.raises(DapperTableError) as error:
+        VirtualTable(provider.fetch, 5, cache_size=0)
+    assert str(error.value) == 'Cache size and fetch size must be at least 1'
+    with pytest.raises(DapperTableError) as error:
+        VirtualTable(provider.fetch, 5, cache_size=8, fetch_size=16)
+    assert str(error.value) == 'Cache size 8 must be at least fetch size 16'
+    with pytest.raises(DapperTableError) as error:
+        VirtualTable(provider.fetch, 5, columns=Columns([Column('name', 5, auto_width=True)]))
+    assert str(error.value) == 'Virtual tables do not support auto width columns'
+    with pytest.raises(DapperTableError) as error:
+        VirtualTable(provider.fetch, -1)
+    assert str(error.value) == 'Invalid row count -1'
+    y = VirtualTable(provider.fetch, 6, columns=COLUMNS)
+    with pytest.raises(DapperTableError) as error:
+        y.render()
+    assert str(error.value) == 'Row provider returned 5 rows, expected 6'
+    y = VirtualTable(lambda start, count: ['foo'] * count, 2, columns=COLUMNS)
+    with pytest.raises(DapperTableError) as error:
+        y.render()
+    assert str(error.value) == 'Row input must be list if headers were given'